@@ -8,6 +8,7 @@ CREATE TABLE Airport(
   city VARCHAR(200) NOT NULL,
   country VARCHAR(60) NOT NULL,
   airport_type ENUM('domestic','international','both') NOT NULL,
+  timezone VARCHAR(64) NOT NULL,
   PRIMARY KEY (code)
 );
 
@@ -62,10 +63,15 @@ CREATE TABLE Flight(
   arr_datetime DATETIME NOT NULL,
   status ENUM('on-time','delayed') NOT NULL DEFAULT 'on-time',
   base_price DECIMAL(10,2) NOT NULL CHECK (base_price >= 0),
+  dep_utc DATETIME NOT NULL,
+  arr_utc DATETIME NOT NULL,
+  duration_minutes INT NOT NULL,
   CONSTRAINT chk_times_order CHECK (arr_datetime > dep_datetime),
   CONSTRAINT chk_airports_diff CHECK (dep_airport_code <> arr_airport_code),
   UNIQUE KEY uq_plane_depart (airline_name, airplane_id, dep_datetime),
   PRIMARY KEY (flight_no, dep_datetime, airline_name),
+  KEY idx_flight_route_dep (dep_airport_code, arr_airport_code, dep_datetime),
+  KEY idx_flight_airline_dep (airline_name, dep_datetime),
   FOREIGN KEY (airline_name)  
     REFERENCES Airline(airline_name)
     ON UPDATE CASCADE
@@ -118,6 +124,8 @@ CREATE TABLE Ticket(
   CONSTRAINT chk_card_not_expired CHECK (exp_date >= DATE(purchase_datetime)),
   CONSTRAINT chk_purchase_before_dep CHECK (purchase_datetime <= dep_datetime),
   PRIMARY KEY (ticket_id),
+  KEY idx_ticket_airline_purchase (airline_name, purchase_datetime),
+  KEY idx_ticket_customer_dep (customer_email, dep_datetime),
   FOREIGN KEY (flight_no, dep_datetime, airline_name)
     REFERENCES Flight(flight_no, dep_datetime, airline_name)
     ON UPDATE CASCADE
@@ -146,3 +154,192 @@ CREATE TABLE FlightRating(
     ON UPDATE CASCADE
     ON DELETE CASCADE
 );
+
+
+-- Seat counters per flight, kept in step with Ticket and SeatHold by the
+-- app. A sale or a hold is a conditional UPDATE guarded by
+-- seats_sold + seats_held < seat_capacity, so the check and the decrement
+-- are one atomic statement. Rebuild with tools/reconcile_inventory.py.
+CREATE TABLE FlightInventory(
+  flight_no VARCHAR(10) NOT NULL,
+  dep_datetime DATETIME NOT NULL,
+  airline_name VARCHAR (50) NOT NULL,
+  seat_capacity INT NOT NULL,
+  seats_sold INT NOT NULL DEFAULT 0 CHECK (seats_sold >= 0),
+  seats_held INT NOT NULL DEFAULT 0 CHECK (seats_held >= 0),
+  PRIMARY KEY (flight_no, dep_datetime, airline_name),
+  FOREIGN KEY (flight_no, dep_datetime, airline_name)
+    REFERENCES Flight(flight_no, dep_datetime, airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+
+-- Seats reserved for a customer between the purchase review page and
+-- payment. Each live row is counted in FlightInventory.seats_held; the
+-- purchase consumes it and an expiry sweep releases the rest. One hold
+-- per customer per flight; rows cluster by flight.
+CREATE TABLE SeatHold(
+  flight_no VARCHAR(10) NOT NULL,
+  dep_datetime DATETIME NOT NULL,
+  airline_name VARCHAR (50) NOT NULL,
+  customer_email VARCHAR(255) NOT NULL,
+  expires_at DATETIME NOT NULL,
+  PRIMARY KEY (flight_no, dep_datetime, airline_name, customer_email),
+  KEY idx_hold_expires (expires_at),
+  FOREIGN KEY (flight_no, dep_datetime, airline_name)
+    REFERENCES FlightInventory(flight_no, dep_datetime, airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE,
+  FOREIGN KEY (customer_email)
+    REFERENCES Customer(email)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+
+-- Daily ticket sales per airline and route, maintained by the app on every
+-- sale (INSERT ... ON DUPLICATE KEY UPDATE) so staff reports read one row
+-- per day and route instead of scanning Ticket. Rebuild from Ticket with
+-- tools/backfill_sales_rollups.py.
+CREATE TABLE SalesDaily(
+  airline_name VARCHAR (50) NOT NULL,
+  sale_date DATE NOT NULL,
+  dep_airport_code VARCHAR(4) NOT NULL,
+  arr_airport_code VARCHAR(4) NOT NULL,
+  tickets INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (airline_name, sale_date, dep_airport_code, arr_airport_code),
+  FOREIGN KEY (airline_name)
+    REFERENCES Airline(airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+
+-- Running rating sums/counts per flight and per airline route, maintained
+-- by the app when a rating is inserted so staff_ratings never aggregates
+-- FlightRating. Rebuild with tools/backfill_rating_aggregates.py.
+CREATE TABLE FlightRatingStats(
+  flight_no VARCHAR(10) NOT NULL,
+  dep_datetime DATETIME NOT NULL,
+  airline_name VARCHAR (50) NOT NULL,
+  rating_sum INT NOT NULL DEFAULT 0,
+  rating_count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (flight_no, dep_datetime, airline_name),
+  FOREIGN KEY (flight_no, dep_datetime, airline_name)
+    REFERENCES Flight(flight_no, dep_datetime, airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+CREATE TABLE RouteRatingStats(
+  airline_name VARCHAR (50) NOT NULL,
+  dep_airport_code VARCHAR(4) NOT NULL,
+  arr_airport_code VARCHAR(4) NOT NULL,
+  rating_sum INT NOT NULL DEFAULT 0,
+  rating_count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (airline_name, dep_airport_code, arr_airport_code),
+  FOREIGN KEY (airline_name)
+    REFERENCES Airline(airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+
+-- Change counters behind conditional GET (ETags), shared by every app
+-- process: a write bumps the keys of the pages it changes, keyed by the
+-- JSON text of the app's version key, e.g. ["customer", "a@b.com"].
+-- Processes also poll recent bumps (changed_at) to drop their own cached
+-- copies of data another process changed.
+CREATE TABLE DataVersion(
+  version_key VARCHAR(512) NOT NULL,
+  counter BIGINT NOT NULL DEFAULT 0,
+  changed_at DATETIME(6) NOT NULL,
+  PRIMARY KEY (version_key),
+  KEY idx_version_changed (changed_at)
+);
+
+
+-- One-call ticket purchase. Locks the flight's seat counter first, so the
+-- duplicate check, the capacity check, the seat decrement (consuming the
+-- customer's SeatHold if there is one), the Ticket insert and the
+-- SalesDaily bump all happen under that lock in a single round trip.
+-- Runs inside the caller's transaction (no COMMIT here) and returns one
+-- row: outcome is 'ok', 'no_inventory' (no counter row -- reconcile and
+-- call again), 'departed', 'duplicate' or 'sold_out'.
+DELIMITER //
+CREATE PROCEDURE purchase_ticket(
+  IN p_flight_no VARCHAR(10),
+  IN p_dep_datetime DATETIME,
+  IN p_airline_name VARCHAR(50),
+  IN p_customer_email VARCHAR(255),
+  IN p_card_type VARCHAR(10),
+  IN p_card_num VARCHAR(20),
+  IN p_card_name VARCHAR(100),
+  IN p_exp_date DATE)
+proc: BEGIN
+  DECLARE v_capacity INT DEFAULT NULL;
+  DECLARE v_sold INT;
+  DECLARE v_held INT;
+  DECLARE v_mine INT;
+  DECLARE v_dep VARCHAR(4);
+  DECLARE v_arr VARCHAR(4);
+  DECLARE v_price DECIMAL(10,2);
+
+  SELECT seat_capacity, seats_sold, seats_held INTO v_capacity, v_sold, v_held
+  FROM FlightInventory
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name
+  FOR UPDATE;
+  IF v_capacity IS NULL THEN
+    SELECT 'no_inventory' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  IF p_dep_datetime <= NOW() THEN
+    SELECT 'departed' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM Ticket
+             WHERE customer_email = p_customer_email AND dep_datetime = p_dep_datetime
+               AND flight_no = p_flight_no AND airline_name = p_airline_name) THEN
+    SELECT 'duplicate' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  -- A held seat is already counted; otherwise there must be a free one
+  DELETE FROM SeatHold
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name AND customer_email = p_customer_email;
+  SET v_mine = ROW_COUNT();
+  IF v_mine = 0 AND v_sold + v_held >= v_capacity THEN
+    SELECT 'sold_out' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  SELECT dep_airport_code, arr_airport_code, base_price INTO v_dep, v_arr, v_price
+  FROM Flight
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name;
+
+  UPDATE FlightInventory SET seats_sold = seats_sold + 1, seats_held = seats_held - v_mine
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name;
+
+  INSERT INTO Ticket
+    (flight_no, dep_datetime, airline_name, customer_email,
+     card_type, card_num, card_name, exp_date)
+  VALUES (p_flight_no, p_dep_datetime, p_airline_name, p_customer_email,
+          p_card_type, p_card_num, p_card_name, p_exp_date);
+
+  INSERT INTO SalesDaily
+    (airline_name, sale_date, dep_airport_code, arr_airport_code, tickets, revenue)
+  VALUES (p_airline_name, CURDATE(), v_dep, v_arr, 1, v_price)
+  ON DUPLICATE KEY UPDATE tickets = tickets + 1,
+                          revenue = revenue + VALUES(revenue);
+
+  SELECT 'ok' AS outcome, v_dep AS dep_airport_code, v_arr AS arr_airport_code;
+END //
+DELIMITER ;
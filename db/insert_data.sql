@@ -10,15 +10,15 @@ INSERT INTO Airline VALUES ('Air Canada');
 
 
 -- Airports
-INSERT INTO Airport VALUES ('JFK', 'New York City', 'USA', 'international');
-INSERT INTO Airport VALUES ('PVG', 'Shanghai', 'China', 'international');
-INSERT INTO Airport VALUES ('DXB', 'Dubai', 'UAE', 'international');
-INSERT INTO Airport VALUES ('AUH', 'Abu Dhabi', 'UAE', 'international');
-INSERT INTO Airport VALUES ('SYD', 'Sydney', 'Australia', 'international');
-INSERT INTO Airport VALUES ('LHR', 'London Heathrow', 'UK', 'international');
-INSERT INTO Airport VALUES ('LAX','Los Angeles','USA','domestic');
-INSERT INTO Airport VALUES ('BOS','Boston','USA','domestic');
-INSERT INTO Airport VALUES ('ORD','Chicago','USA','domestic');
+INSERT INTO Airport VALUES ('JFK', 'New York City', 'USA', 'international', 'America/New_York');
+INSERT INTO Airport VALUES ('PVG', 'Shanghai', 'China', 'international', 'Asia/Shanghai');
+INSERT INTO Airport VALUES ('DXB', 'Dubai', 'UAE', 'international', 'Asia/Dubai');
+INSERT INTO Airport VALUES ('AUH', 'Abu Dhabi', 'UAE', 'international', 'Asia/Dubai');
+INSERT INTO Airport VALUES ('SYD', 'Sydney', 'Australia', 'international', 'Australia/Sydney');
+INSERT INTO Airport VALUES ('LHR', 'London Heathrow', 'UK', 'international', 'Europe/London');
+INSERT INTO Airport VALUES ('LAX','Los Angeles','USA','domestic','America/Los_Angeles');
+INSERT INTO Airport VALUES ('BOS','Boston','USA','domestic','America/New_York');
+INSERT INTO Airport VALUES ('ORD','Chicago','USA','domestic','America/Chicago');
 
 
 -- Airplane
@@ -65,71 +65,71 @@ INSERT INTO StaffPhoneNo VALUES ('r.singh',  '+1-416-555-0202');
 
 
 -- Flight
-INSERT INTO Flight VALUES ('B61220', '2025-10-10 07:00:00', 'Jet Blue', 'E190-JB1', 'JFK', 'PVG', '2025-10-11 00:10:00', 'delayed', 650.00);
-INSERT INTO Flight VALUES ('BA676', '2025-12-25 20:15:00', 'British Airways', 'A350-BA1', 'JFK', 'LHR', '2025-12-26 08:10:00', 'on-time', 650.00);
-INSERT INTO Flight VALUES ('EK303',  '2025-10-15 23:15:00', 'Emirates', 'B77W-EK2', 'DXB', 'JFK', '2025-10-16 07:30:00', 'on-time', 920.00);
-INSERT INTO Flight VALUES ('B61234', '2025-11-10 09:00:00', 'Jet Blue', 'A321-JB1', 'JFK', 'PVG', '2025-11-11 01:10:00', 'on-time', 750.00);
-INSERT INTO Flight VALUES ('B61235', '2025-11-15 13:30:00', 'Jet Blue', 'A320-JB2', 'PVG', 'JFK', '2025-11-15 20:10:00', 'delayed', 730.00);
-INSERT INTO Flight VALUES ('EY101',  '2025-11-20 02:00:00', 'Etihad Airways', 'B789-EY2', 'AUH', 'JFK', '2025-11-20 09:30:00', 'delayed', 820.00);
-INSERT INTO Flight VALUES ('EK202',  '2025-12-05 22:30:00', 'Emirates', 'A380-EK1',  'DXB', 'SYD', '2025-12-06 17:30:00', 'on-time', 980.00);
-INSERT INTO Flight VALUES ('UA089',  '2025-12-03 12:00:00', 'United Airlines', 'B738-UA1',  'JFK', 'PVG', '2025-12-04 16:00:00', 'on-time', 765.00);
-INSERT INTO Flight VALUES ('AA100',  '2025-11-25 18:00:00', 'American Airlines', 'A321-AA1', 'JFK','DXB', '2025-11-26 15:00:00', 'on-time', 840.00);
-INSERT INTO Flight VALUES ('EY202',  '2025-12-10 01:30:00', 'Etihad Airways', 'A380-EY1',   'AUH', 'SYD', '2025-12-10 18:45:00', 'on-time', 995.00);
-INSERT INTO Flight VALUES ('UA123',  '2025-11-28 10:00:00', 'United Airlines', 'B738-UA1',  'PVG', 'JFK', '2025-11-28 23:40:00', 'on-time', 770.00);
-INSERT INTO Flight VALUES ('B61240','2025-11-25 08:00:00','Jet Blue','E190-JB1','BOS','JFK','2025-11-25 09:30:00','on-time',120.00);
-INSERT INTO Flight VALUES ('B61241','2025-11-25 18:00:00','Jet Blue','A320-JB2','JFK','BOS','2025-11-25 19:30:00','on-time',130.00);
-INSERT INTO Flight VALUES ('B61242','2026-01-06 07:00:00','Jet Blue','A321-JB1','JFK','LAX','2026-01-06 10:15:00','on-time',320.00);
-INSERT INTO Flight VALUES ('B61243','2026-01-07 14:00:00','Jet Blue','A320-JB2','LAX','JFK','2026-01-07 22:00:00','delayed',330.00);
-INSERT INTO Flight VALUES ('B61244','2025-12-02 09:00:00','Jet Blue','E190-JB1','JFK','ORD','2025-12-02 10:30:00','on-time',150.00);
-INSERT INTO Flight VALUES ('B61245','2025-12-02 17:30:00','Jet Blue','E190-JB1','ORD','JFK','2025-12-02 19:00:00','on-time',150.00);
-INSERT INTO Flight VALUES ('UA201','2025-12-03 09:30:00','United Airlines','B738-UA1','ORD','JFK','2025-12-03 11:45:00','on-time',145.00);
-INSERT INTO Flight VALUES ('UA202','2025-12-05 11:00:00','United Airlines','B738-UA1','JFK','ORD','2025-12-05 13:10:00','on-time',150.00);
-INSERT INTO Flight VALUES ('UA203','2026-01-10 08:00:00','United Airlines','B738-UA1','LAX','JFK','2026-01-10 16:00:00','on-time',340.00);
-INSERT INTO Flight VALUES ('UA204','2026-01-12 18:00:00','United Airlines','B738-UA1','JFK','LAX','2026-01-12 21:30:00','delayed',350.00);
-INSERT INTO Flight VALUES ('UA205','2025-12-01 21:00:00','United Airlines','B738-UA1','JFK','SYD','2025-12-03 08:00:00','on-time',980.00);
-INSERT INTO Flight VALUES ('AA205','2025-12-01 08:30:00','American Airlines','A321-AA1','JFK','LAX','2025-12-01 12:10:00','on-time',360.00);
-INSERT INTO Flight VALUES ('AA206','2026-01-15 14:30:00','American Airlines','A321-AA1','LAX','JFK','2026-01-15 22:30:00','on-time',355.00);
-INSERT INTO Flight VALUES ('AA207','2025-11-29 06:30:00','American Airlines','A321-AA1','BOS','JFK','2025-11-29 07:45:00','on-time',110.00);
-INSERT INTO Flight VALUES ('BA150','2025-12-28 10:00:00','British Airways','A350-BA1','LHR','JFK','2025-12-28 14:00:00','on-time',680.00);
-INSERT INTO Flight VALUES ('BA151','2025-12-29 21:00:00','British Airways','A350-BA1','JFK','LHR','2025-12-30 08:30:00','on-time',690.00);
-INSERT INTO Flight VALUES ('EK016','2025-12-06 14:00:00','Emirates','A380-EK1','LHR','DXB','2025-12-06 23:55:00','on-time',520.00);
-INSERT INTO Flight VALUES ('EK204','2025-12-12 23:00:00','Emirates','A380-EK1','JFK','DXB','2025-12-13 20:30:00','on-time',880.00);
-INSERT INTO Flight VALUES ('EK205','2025-12-14 02:00:00','Emirates','B77W-EK2','DXB','JFK','2025-12-14 10:30:00','on-time',880.00);
-INSERT INTO Flight VALUES ('EY018','2025-12-12 02:00:00','Etihad Airways','B789-EY2','AUH','LHR','2025-12-12 07:00:00','on-time',740.00);
-INSERT INTO Flight VALUES ('EY019','2025-12-12 11:00:00','Etihad Airways','A380-EY1','LHR','AUH','2025-12-12 21:00:00','on-time',740.00);
-INSERT INTO Flight VALUES ('EY120','2025-12-18 01:15:00','Etihad Airways','A380-EY1','AUH','SYD','2025-12-18 19:45:00','delayed',1020.00);
-INSERT INTO Flight VALUES ('DL1001','2025-11-26 07:00:00','Delta Air Lines','A220-DL3','JFK','BOS','2025-11-26 08:10:00','on-time',105.00);
-INSERT INTO Flight VALUES ('DL1002','2025-11-26 18:00:00','Delta Air Lines','A220-DL3','BOS','JFK','2025-11-26 19:10:00','on-time',105.00);
-INSERT INTO Flight VALUES ('DL1200','2025-11-29 09:15:00','Delta Air Lines','B738-DL1','JFK','ORD','2025-11-29 11:00:00','on-time',140.00);
-INSERT INTO Flight VALUES ('DL1201','2025-11-29 15:00:00','Delta Air Lines','B738-DL1','ORD','JFK','2025-11-29 17:00:00','on-time',140.00);
-INSERT INTO Flight VALUES ('DL1300','2026-01-04 07:45:00','Delta Air Lines','A321-DL2','LAX','JFK','2026-01-04 15:45:00','on-time',345.00);
-INSERT INTO Flight VALUES ('DL1301','2026-01-04 17:45:00','Delta Air Lines','A321-DL2','JFK','LAX','2026-01-04 21:15:00','on-time',345.00);
-INSERT INTO Flight VALUES ('AC101','2026-01-20 20:00:00','Air Canada','A220-AC1','JFK','LHR','2026-01-21 08:00:00','on-time',610.00);
-INSERT INTO Flight VALUES ('AC102','2026-01-22 10:00:00','Air Canada','B737-AC2','LHR','JFK','2026-01-22 14:00:00','on-time',620.00);
-INSERT INTO Flight VALUES ('AC120','2025-11-26 06:30:00','Air Canada','A220-AC1','JFK','ORD','2025-11-26 08:15:00','on-time',150.00);
-INSERT INTO Flight VALUES ('AC121','2025-11-26 19:00:00','Air Canada','A220-AC1','ORD','JFK','2025-11-26 20:45:00','on-time',150.00);
-INSERT INTO Flight VALUES ('AA208','2025-12-06 09:00:00','American Airlines','A321-AA1', 'JFK','ORD','2025-12-06 10:50:00','on-time',155.00);
-INSERT INTO Flight VALUES ('AA209','2025-12-06 18:30:00','American Airlines','A321-AA1', 'ORD','JFK','2025-12-06 20:20:00','on-time',155.00);
-INSERT INTO Flight VALUES ('AC122','2025-12-07 13:20:00','Air Canada','A220-AC1', 'JFK','ORD','2025-12-07 15:05:00','on-time',152.00);
-INSERT INTO Flight VALUES ('UA206','2025-12-06 06:30:00','United Airlines','B738-UA1','JFK','ORD','2025-12-06 08:15:00','on-time',148.00);
-INSERT INTO Flight VALUES ('DL1210','2025-12-06 07:45:00','Delta Air Lines','B738-DL1','JFK','ORD','2025-12-06 09:30:00','on-time',142.00);
-INSERT INTO Flight VALUES ('AC130','2025-12-06 10:30:00','Air Canada','A220-AC1','JFK','ORD','2025-12-06 12:15:00','on-time',150.00);
-INSERT INTO Flight VALUES ('AA210','2025-12-06 13:45:00','American Airlines','A321-AA1','JFK','ORD','2025-12-06 15:35:00','on-time',159.00);
-INSERT INTO Flight VALUES ('UA207','2025-12-06 18:55:00','United Airlines','B738-UA1','JFK','ORD','2025-12-06 20:40:00','on-time',151.00);
-INSERT INTO Flight VALUES ('DL1003','2025-11-25 12:00:00','Delta Air Lines','A220-DL3','BOS','JFK', '2025-11-25 13:10:00','on-time',115.00);
-INSERT INTO Flight VALUES ('B61248','2025-11-26 20:00:00','Jet Blue','A320-JB2','JFK','BOS', '2025-11-26 21:30:00','on-time',125.00);
-INSERT INTO Flight VALUES ('B61250','2025-12-10 07:30:00','Jet Blue','A320-JB2','JFK','BOS', '2025-12-10 08:50:00','on-time',125.00);
-INSERT INTO Flight VALUES ('DL1010','2025-12-10 17:45:00','Delta Air Lines','A220-DL3','JFK','BOS', '2025-12-10 19:10:00','on-time',128.00);
-INSERT INTO Flight VALUES ('AA211','2025-12-19 09:00:00','American Airlines','A321-AA1','BOS','JFK', '2025-12-19 10:20:00','on-time',119.00);
-INSERT INTO Flight VALUES ('UA208','2025-12-19 19:15:00','United Airlines','B738-UA1','BOS','JFK', '2025-12-19 20:35:00','on-time',121.00);
-INSERT INTO Flight VALUES ('B61251','2025-12-12 06:30:00','Jet Blue','A320-JB2','JFK','BOS','2025-12-12 07:50:00','on-time',129.00);
-INSERT INTO Flight VALUES ('B61252','2025-12-12 09:30:00','Jet Blue','E190-JB1','BOS','JFK','2025-12-12 10:45:00','on-time',119.00);
-INSERT INTO Flight VALUES ('B61253','2025-12-20 08:00:00','Jet Blue','E190-JB1','JFK','ORD','2025-12-20 09:30:00','on-time',155.00);
-INSERT INTO Flight VALUES ('B61254','2025-12-20 17:00:00','Jet Blue','E190-JB1','ORD','JFK','2025-12-20 18:30:00','on-time',155.00);
-INSERT INTO Flight VALUES ('B61255','2025-12-22 16:15:00','Jet Blue','A321-JB1','JFK','LAX','2025-12-22 20:00:00','on-time',340.00);
-INSERT INTO Flight VALUES ('B61256','2025-12-27 11:00:00','Jet Blue','A321-JB1','LAX','JFK','2025-12-27 19:00:00','on-time',345.00);
-INSERT INTO Flight VALUES ('B61257','2026-01-08 07:15:00','Jet Blue','A321-JB1','JFK','PVG','2026-01-09 00:05:00','on-time',780.00);
-INSERT INTO Flight VALUES ('B61258','2026-01-18 13:45:00','Jet Blue','A320-JB2','PVG','JFK','2026-01-18 20:25:00','on-time',770.00);
+INSERT INTO Flight VALUES ('B61220', '2025-10-10 07:00:00', 'Jet Blue', 'E190-JB1', 'JFK', 'PVG', '2025-10-11 00:10:00', 'delayed', 650.00, '2025-10-10 11:00:00', '2025-10-10 16:10:00', 310);
+INSERT INTO Flight VALUES ('BA676', '2025-12-25 20:15:00', 'British Airways', 'A350-BA1', 'JFK', 'LHR', '2025-12-26 08:10:00', 'on-time', 650.00, '2025-12-26 01:15:00', '2025-12-26 08:10:00', 415);
+INSERT INTO Flight VALUES ('EK303',  '2025-10-15 23:15:00', 'Emirates', 'B77W-EK2', 'DXB', 'JFK', '2025-10-16 07:30:00', 'on-time', 920.00, '2025-10-15 19:15:00', '2025-10-16 11:30:00', 975);
+INSERT INTO Flight VALUES ('B61234', '2025-11-10 09:00:00', 'Jet Blue', 'A321-JB1', 'JFK', 'PVG', '2025-11-11 01:10:00', 'on-time', 750.00, '2025-11-10 14:00:00', '2025-11-10 17:10:00', 190);
+INSERT INTO Flight VALUES ('B61235', '2025-11-15 13:30:00', 'Jet Blue', 'A320-JB2', 'PVG', 'JFK', '2025-11-15 20:10:00', 'delayed', 730.00, '2025-11-15 05:30:00', '2025-11-16 01:10:00', 1180);
+INSERT INTO Flight VALUES ('EY101',  '2025-11-20 02:00:00', 'Etihad Airways', 'B789-EY2', 'AUH', 'JFK', '2025-11-20 09:30:00', 'delayed', 820.00, '2025-11-19 22:00:00', '2025-11-20 14:30:00', 990);
+INSERT INTO Flight VALUES ('EK202',  '2025-12-05 22:30:00', 'Emirates', 'A380-EK1',  'DXB', 'SYD', '2025-12-06 17:30:00', 'on-time', 980.00, '2025-12-05 18:30:00', '2025-12-06 06:30:00', 720);
+INSERT INTO Flight VALUES ('UA089',  '2025-12-03 12:00:00', 'United Airlines', 'B738-UA1',  'JFK', 'PVG', '2025-12-04 16:00:00', 'on-time', 765.00, '2025-12-03 17:00:00', '2025-12-04 08:00:00', 900);
+INSERT INTO Flight VALUES ('AA100',  '2025-11-25 18:00:00', 'American Airlines', 'A321-AA1', 'JFK','DXB', '2025-11-26 15:00:00', 'on-time', 840.00, '2025-11-25 23:00:00', '2025-11-26 11:00:00', 720);
+INSERT INTO Flight VALUES ('EY202',  '2025-12-10 01:30:00', 'Etihad Airways', 'A380-EY1',   'AUH', 'SYD', '2025-12-10 18:45:00', 'on-time', 995.00, '2025-12-09 21:30:00', '2025-12-10 07:45:00', 615);
+INSERT INTO Flight VALUES ('UA123',  '2025-11-28 10:00:00', 'United Airlines', 'B738-UA1',  'PVG', 'JFK', '2025-11-28 23:40:00', 'on-time', 770.00, '2025-11-28 02:00:00', '2025-11-29 04:40:00', 1600);
+INSERT INTO Flight VALUES ('B61240','2025-11-25 08:00:00','Jet Blue','E190-JB1','BOS','JFK','2025-11-25 09:30:00','on-time',120.00,'2025-11-25 13:00:00','2025-11-25 14:30:00',90);
+INSERT INTO Flight VALUES ('B61241','2025-11-25 18:00:00','Jet Blue','A320-JB2','JFK','BOS','2025-11-25 19:30:00','on-time',130.00,'2025-11-25 23:00:00','2025-11-26 00:30:00',90);
+INSERT INTO Flight VALUES ('B61242','2026-01-06 07:00:00','Jet Blue','A321-JB1','JFK','LAX','2026-01-06 10:15:00','on-time',320.00,'2026-01-06 12:00:00','2026-01-06 18:15:00',375);
+INSERT INTO Flight VALUES ('B61243','2026-01-07 14:00:00','Jet Blue','A320-JB2','LAX','JFK','2026-01-07 22:00:00','delayed',330.00,'2026-01-07 22:00:00','2026-01-08 03:00:00',300);
+INSERT INTO Flight VALUES ('B61244','2025-12-02 09:00:00','Jet Blue','E190-JB1','JFK','ORD','2025-12-02 10:30:00','on-time',150.00,'2025-12-02 14:00:00','2025-12-02 16:30:00',150);
+INSERT INTO Flight VALUES ('B61245','2025-12-02 17:30:00','Jet Blue','E190-JB1','ORD','JFK','2025-12-02 19:00:00','on-time',150.00,'2025-12-02 23:30:00','2025-12-03 00:00:00',30);
+INSERT INTO Flight VALUES ('UA201','2025-12-03 09:30:00','United Airlines','B738-UA1','ORD','JFK','2025-12-03 11:45:00','on-time',145.00,'2025-12-03 15:30:00','2025-12-03 16:45:00',75);
+INSERT INTO Flight VALUES ('UA202','2025-12-05 11:00:00','United Airlines','B738-UA1','JFK','ORD','2025-12-05 13:10:00','on-time',150.00,'2025-12-05 16:00:00','2025-12-05 19:10:00',190);
+INSERT INTO Flight VALUES ('UA203','2026-01-10 08:00:00','United Airlines','B738-UA1','LAX','JFK','2026-01-10 16:00:00','on-time',340.00,'2026-01-10 16:00:00','2026-01-10 21:00:00',300);
+INSERT INTO Flight VALUES ('UA204','2026-01-12 18:00:00','United Airlines','B738-UA1','JFK','LAX','2026-01-12 21:30:00','delayed',350.00,'2026-01-12 23:00:00','2026-01-13 05:30:00',390);
+INSERT INTO Flight VALUES ('UA205','2025-12-01 21:00:00','United Airlines','B738-UA1','JFK','SYD','2025-12-03 08:00:00','on-time',980.00,'2025-12-02 02:00:00','2025-12-02 21:00:00',1140);
+INSERT INTO Flight VALUES ('AA205','2025-12-01 08:30:00','American Airlines','A321-AA1','JFK','LAX','2025-12-01 12:10:00','on-time',360.00,'2025-12-01 13:30:00','2025-12-01 20:10:00',400);
+INSERT INTO Flight VALUES ('AA206','2026-01-15 14:30:00','American Airlines','A321-AA1','LAX','JFK','2026-01-15 22:30:00','on-time',355.00,'2026-01-15 22:30:00','2026-01-16 03:30:00',300);
+INSERT INTO Flight VALUES ('AA207','2025-11-29 06:30:00','American Airlines','A321-AA1','BOS','JFK','2025-11-29 07:45:00','on-time',110.00,'2025-11-29 11:30:00','2025-11-29 12:45:00',75);
+INSERT INTO Flight VALUES ('BA150','2025-12-28 10:00:00','British Airways','A350-BA1','LHR','JFK','2025-12-28 14:00:00','on-time',680.00,'2025-12-28 10:00:00','2025-12-28 19:00:00',540);
+INSERT INTO Flight VALUES ('BA151','2025-12-29 21:00:00','British Airways','A350-BA1','JFK','LHR','2025-12-30 08:30:00','on-time',690.00,'2025-12-30 02:00:00','2025-12-30 08:30:00',390);
+INSERT INTO Flight VALUES ('EK016','2025-12-06 14:00:00','Emirates','A380-EK1','LHR','DXB','2025-12-06 23:55:00','on-time',520.00,'2025-12-06 14:00:00','2025-12-06 19:55:00',355);
+INSERT INTO Flight VALUES ('EK204','2025-12-12 23:00:00','Emirates','A380-EK1','JFK','DXB','2025-12-13 20:30:00','on-time',880.00,'2025-12-13 04:00:00','2025-12-13 16:30:00',750);
+INSERT INTO Flight VALUES ('EK205','2025-12-14 02:00:00','Emirates','B77W-EK2','DXB','JFK','2025-12-14 10:30:00','on-time',880.00,'2025-12-13 22:00:00','2025-12-14 15:30:00',1050);
+INSERT INTO Flight VALUES ('EY018','2025-12-12 02:00:00','Etihad Airways','B789-EY2','AUH','LHR','2025-12-12 07:00:00','on-time',740.00,'2025-12-11 22:00:00','2025-12-12 07:00:00',540);
+INSERT INTO Flight VALUES ('EY019','2025-12-12 11:00:00','Etihad Airways','A380-EY1','LHR','AUH','2025-12-12 21:00:00','on-time',740.00,'2025-12-12 11:00:00','2025-12-12 17:00:00',360);
+INSERT INTO Flight VALUES ('EY120','2025-12-18 01:15:00','Etihad Airways','A380-EY1','AUH','SYD','2025-12-18 19:45:00','delayed',1020.00,'2025-12-17 21:15:00','2025-12-18 08:45:00',690);
+INSERT INTO Flight VALUES ('DL1001','2025-11-26 07:00:00','Delta Air Lines','A220-DL3','JFK','BOS','2025-11-26 08:10:00','on-time',105.00,'2025-11-26 12:00:00','2025-11-26 13:10:00',70);
+INSERT INTO Flight VALUES ('DL1002','2025-11-26 18:00:00','Delta Air Lines','A220-DL3','BOS','JFK','2025-11-26 19:10:00','on-time',105.00,'2025-11-26 23:00:00','2025-11-27 00:10:00',70);
+INSERT INTO Flight VALUES ('DL1200','2025-11-29 09:15:00','Delta Air Lines','B738-DL1','JFK','ORD','2025-11-29 11:00:00','on-time',140.00,'2025-11-29 14:15:00','2025-11-29 17:00:00',165);
+INSERT INTO Flight VALUES ('DL1201','2025-11-29 15:00:00','Delta Air Lines','B738-DL1','ORD','JFK','2025-11-29 17:00:00','on-time',140.00,'2025-11-29 21:00:00','2025-11-29 22:00:00',60);
+INSERT INTO Flight VALUES ('DL1300','2026-01-04 07:45:00','Delta Air Lines','A321-DL2','LAX','JFK','2026-01-04 15:45:00','on-time',345.00,'2026-01-04 15:45:00','2026-01-04 20:45:00',300);
+INSERT INTO Flight VALUES ('DL1301','2026-01-04 17:45:00','Delta Air Lines','A321-DL2','JFK','LAX','2026-01-04 21:15:00','on-time',345.00,'2026-01-04 22:45:00','2026-01-05 05:15:00',390);
+INSERT INTO Flight VALUES ('AC101','2026-01-20 20:00:00','Air Canada','A220-AC1','JFK','LHR','2026-01-21 08:00:00','on-time',610.00,'2026-01-21 01:00:00','2026-01-21 08:00:00',420);
+INSERT INTO Flight VALUES ('AC102','2026-01-22 10:00:00','Air Canada','B737-AC2','LHR','JFK','2026-01-22 14:00:00','on-time',620.00,'2026-01-22 10:00:00','2026-01-22 19:00:00',540);
+INSERT INTO Flight VALUES ('AC120','2025-11-26 06:30:00','Air Canada','A220-AC1','JFK','ORD','2025-11-26 08:15:00','on-time',150.00,'2025-11-26 11:30:00','2025-11-26 14:15:00',165);
+INSERT INTO Flight VALUES ('AC121','2025-11-26 19:00:00','Air Canada','A220-AC1','ORD','JFK','2025-11-26 20:45:00','on-time',150.00,'2025-11-27 01:00:00','2025-11-27 01:45:00',45);
+INSERT INTO Flight VALUES ('AA208','2025-12-06 09:00:00','American Airlines','A321-AA1', 'JFK','ORD','2025-12-06 10:50:00','on-time',155.00, '2025-12-06 14:00:00', '2025-12-06 16:50:00', 170);
+INSERT INTO Flight VALUES ('AA209','2025-12-06 18:30:00','American Airlines','A321-AA1', 'ORD','JFK','2025-12-06 20:20:00','on-time',155.00, '2025-12-07 00:30:00', '2025-12-07 01:20:00', 50);
+INSERT INTO Flight VALUES ('AC122','2025-12-07 13:20:00','Air Canada','A220-AC1', 'JFK','ORD','2025-12-07 15:05:00','on-time',152.00, '2025-12-07 18:20:00', '2025-12-07 21:05:00', 165);
+INSERT INTO Flight VALUES ('UA206','2025-12-06 06:30:00','United Airlines','B738-UA1','JFK','ORD','2025-12-06 08:15:00','on-time',148.00,'2025-12-06 11:30:00','2025-12-06 14:15:00',165);
+INSERT INTO Flight VALUES ('DL1210','2025-12-06 07:45:00','Delta Air Lines','B738-DL1','JFK','ORD','2025-12-06 09:30:00','on-time',142.00,'2025-12-06 12:45:00','2025-12-06 15:30:00',165);
+INSERT INTO Flight VALUES ('AC130','2025-12-06 10:30:00','Air Canada','A220-AC1','JFK','ORD','2025-12-06 12:15:00','on-time',150.00,'2025-12-06 15:30:00','2025-12-06 18:15:00',165);
+INSERT INTO Flight VALUES ('AA210','2025-12-06 13:45:00','American Airlines','A321-AA1','JFK','ORD','2025-12-06 15:35:00','on-time',159.00,'2025-12-06 18:45:00','2025-12-06 21:35:00',170);
+INSERT INTO Flight VALUES ('UA207','2025-12-06 18:55:00','United Airlines','B738-UA1','JFK','ORD','2025-12-06 20:40:00','on-time',151.00,'2025-12-06 23:55:00','2025-12-07 02:40:00',165);
+INSERT INTO Flight VALUES ('DL1003','2025-11-25 12:00:00','Delta Air Lines','A220-DL3','BOS','JFK', '2025-11-25 13:10:00','on-time',115.00, '2025-11-25 17:00:00', '2025-11-25 18:10:00', 70);
+INSERT INTO Flight VALUES ('B61248','2025-11-26 20:00:00','Jet Blue','A320-JB2','JFK','BOS', '2025-11-26 21:30:00','on-time',125.00, '2025-11-27 01:00:00', '2025-11-27 02:30:00', 90);
+INSERT INTO Flight VALUES ('B61250','2025-12-10 07:30:00','Jet Blue','A320-JB2','JFK','BOS', '2025-12-10 08:50:00','on-time',125.00, '2025-12-10 12:30:00', '2025-12-10 13:50:00', 80);
+INSERT INTO Flight VALUES ('DL1010','2025-12-10 17:45:00','Delta Air Lines','A220-DL3','JFK','BOS', '2025-12-10 19:10:00','on-time',128.00, '2025-12-10 22:45:00', '2025-12-11 00:10:00', 85);
+INSERT INTO Flight VALUES ('AA211','2025-12-19 09:00:00','American Airlines','A321-AA1','BOS','JFK', '2025-12-19 10:20:00','on-time',119.00, '2025-12-19 14:00:00', '2025-12-19 15:20:00', 80);
+INSERT INTO Flight VALUES ('UA208','2025-12-19 19:15:00','United Airlines','B738-UA1','BOS','JFK', '2025-12-19 20:35:00','on-time',121.00, '2025-12-20 00:15:00', '2025-12-20 01:35:00', 80);
+INSERT INTO Flight VALUES ('B61251','2025-12-12 06:30:00','Jet Blue','A320-JB2','JFK','BOS','2025-12-12 07:50:00','on-time',129.00,'2025-12-12 11:30:00','2025-12-12 12:50:00',80);
+INSERT INTO Flight VALUES ('B61252','2025-12-12 09:30:00','Jet Blue','E190-JB1','BOS','JFK','2025-12-12 10:45:00','on-time',119.00,'2025-12-12 14:30:00','2025-12-12 15:45:00',75);
+INSERT INTO Flight VALUES ('B61253','2025-12-20 08:00:00','Jet Blue','E190-JB1','JFK','ORD','2025-12-20 09:30:00','on-time',155.00,'2025-12-20 13:00:00','2025-12-20 15:30:00',150);
+INSERT INTO Flight VALUES ('B61254','2025-12-20 17:00:00','Jet Blue','E190-JB1','ORD','JFK','2025-12-20 18:30:00','on-time',155.00,'2025-12-20 23:00:00','2025-12-20 23:30:00',30);
+INSERT INTO Flight VALUES ('B61255','2025-12-22 16:15:00','Jet Blue','A321-JB1','JFK','LAX','2025-12-22 20:00:00','on-time',340.00,'2025-12-22 21:15:00','2025-12-23 04:00:00',405);
+INSERT INTO Flight VALUES ('B61256','2025-12-27 11:00:00','Jet Blue','A321-JB1','LAX','JFK','2025-12-27 19:00:00','on-time',345.00,'2025-12-27 19:00:00','2025-12-28 00:00:00',300);
+INSERT INTO Flight VALUES ('B61257','2026-01-08 07:15:00','Jet Blue','A321-JB1','JFK','PVG','2026-01-09 00:05:00','on-time',780.00,'2026-01-08 12:15:00','2026-01-08 16:05:00',230);
+INSERT INTO Flight VALUES ('B61258','2026-01-18 13:45:00','Jet Blue','A320-JB2','PVG','JFK','2026-01-18 20:25:00','on-time',770.00,'2026-01-18 05:45:00','2026-01-19 01:25:00',1180);
 
 
 
@@ -178,3 +178,48 @@ INSERT INTO FlightRating VALUES ('maria.garcia@yahoo.com', 'EY101', '2025-11-20
 INSERT INTO FlightRating VALUES ('li.wei@outlook.com', 'EK202', '2025-12-05 22:30:00', 'Emirates', 5, 'Excellent A380 experience.');
 INSERT INTO FlightRating VALUES ('fatima.tamimi@outlook.com', 'AA100', '2025-11-25 18:00:00', 'American Airlines', 4, 'Comfortable seats and helpful crew.');
 INSERT INTO FlightRating VALUES ('ad6647@nyu.edu', 'BA676', '2025-12-25 20:15:00', 'British Airways', 5, 'Great food, cabin, and special crew.');
+
+-- FlightInventory (seat counters derived from the rows above)
+INSERT INTO FlightInventory
+    (flight_no, dep_datetime, airline_name, seat_capacity, seats_sold)
+SELECT f.flight_no, f.dep_datetime, f.airline_name, a.seat_capacity,
+       COUNT(t.ticket_id)
+FROM Flight f
+JOIN Airplane a
+  ON a.airplane_id = f.airplane_id
+ AND a.airline_name = f.airline_name
+LEFT JOIN Ticket t
+  ON t.flight_no = f.flight_no
+ AND t.dep_datetime = f.dep_datetime
+ AND t.airline_name = f.airline_name
+GROUP BY f.flight_no, f.dep_datetime, f.airline_name, a.seat_capacity;
+
+-- SalesDaily (rollups derived from Ticket)
+INSERT INTO SalesDaily
+    (airline_name, sale_date, dep_airport_code, arr_airport_code, tickets, revenue)
+SELECT t.airline_name, DATE(t.purchase_datetime), f.dep_airport_code, f.arr_airport_code,
+       COUNT(*), SUM(f.base_price)
+FROM Ticket t
+JOIN Flight f
+  ON f.flight_no = t.flight_no
+ AND f.dep_datetime = t.dep_datetime
+ AND f.airline_name = t.airline_name
+GROUP BY t.airline_name, DATE(t.purchase_datetime), f.dep_airport_code, f.arr_airport_code;
+
+-- FlightRatingStats / RouteRatingStats (aggregates derived from FlightRating)
+INSERT INTO FlightRatingStats
+    (flight_no, dep_datetime, airline_name, rating_sum, rating_count)
+SELECT flight_no, dep_datetime, airline_name, SUM(rating), COUNT(*)
+FROM FlightRating
+GROUP BY flight_no, dep_datetime, airline_name;
+
+INSERT INTO RouteRatingStats
+    (airline_name, dep_airport_code, arr_airport_code, rating_sum, rating_count)
+SELECT f.airline_name, f.dep_airport_code, f.arr_airport_code,
+       SUM(s.rating_sum), SUM(s.rating_count)
+FROM FlightRatingStats s
+JOIN Flight f
+  ON f.flight_no = s.flight_no
+ AND f.dep_datetime = s.dep_datetime
+ AND f.airline_name = s.airline_name
+GROUP BY f.airline_name, f.dep_airport_code, f.arr_airport_code;
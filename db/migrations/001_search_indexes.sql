@@ -0,0 +1,23 @@
+-- Secondary indexes for the hot read paths in main.py.
+-- Apply to an existing database with:
+--   mysql -u <user> -p airline_reservation < db/migrations/001_search_indexes.sql
+-- (db/create_tables.sql already includes them for fresh installs.)
+
+-- search_flights: dep = ? AND arr = ? AND dep_datetime in [day, day+1)
+ALTER TABLE Flight
+  ADD INDEX idx_flight_route_dep (dep_airport_code, arr_airport_code, dep_datetime);
+
+-- staff_home / staff_view_flights / staff_manage_status / staff_ratings:
+-- airline_name = ? AND dep_datetime range, ordered by dep_datetime
+ALTER TABLE Flight
+  ADD INDEX idx_flight_airline_dep (airline_name, dep_datetime);
+
+-- staff_reports: airline_name = ? AND purchase_datetime range
+ALTER TABLE Ticket
+  ADD INDEX idx_ticket_airline_purchase (airline_name, purchase_datetime);
+
+-- customer upcoming/past flights and rating page:
+-- customer_email = ? AND dep_datetime range, joined to Flight on its PK.
+-- (Ticket -> Flight joins by flight key already use the foreign-key index.)
+ALTER TABLE Ticket
+  ADD INDEX idx_ticket_customer_dep (customer_email, dep_datetime);
@@ -0,0 +1,31 @@
+-- Per-flight seat counters for O(1), oversell-safe purchases.
+-- Apply with:
+--   mysql -u <user> -p airline_reservation < db/migrations/002_flight_inventory.sql
+
+CREATE TABLE FlightInventory(
+  flight_no VARCHAR(10) NOT NULL,
+  dep_datetime DATETIME NOT NULL,
+  airline_name VARCHAR (50) NOT NULL,
+  seat_capacity INT NOT NULL,
+  seats_sold INT NOT NULL DEFAULT 0 CHECK (seats_sold >= 0),
+  PRIMARY KEY (flight_no, dep_datetime, airline_name),
+  FOREIGN KEY (flight_no, dep_datetime, airline_name)
+    REFERENCES Flight(flight_no, dep_datetime, airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- Backfill counters for existing flights from Ticket
+INSERT INTO FlightInventory
+    (flight_no, dep_datetime, airline_name, seat_capacity, seats_sold)
+SELECT f.flight_no, f.dep_datetime, f.airline_name, a.seat_capacity,
+       COUNT(t.ticket_id)
+FROM Flight f
+JOIN Airplane a
+  ON a.airplane_id = f.airplane_id
+ AND a.airline_name = f.airline_name
+LEFT JOIN Ticket t
+  ON t.flight_no = f.flight_no
+ AND t.dep_datetime = f.dep_datetime
+ AND t.airline_name = f.airline_name
+GROUP BY f.flight_no, f.dep_datetime, f.airline_name, a.seat_capacity;
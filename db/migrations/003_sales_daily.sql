@@ -0,0 +1,29 @@
+-- Daily per-airline, per-route sales rollups for staff_reports.
+-- Apply with:
+--   mysql -u <user> -p airline_reservation < db/migrations/003_sales_daily.sql
+
+CREATE TABLE SalesDaily(
+  airline_name VARCHAR (50) NOT NULL,
+  sale_date DATE NOT NULL,
+  dep_airport_code VARCHAR(4) NOT NULL,
+  arr_airport_code VARCHAR(4) NOT NULL,
+  tickets INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (airline_name, sale_date, dep_airport_code, arr_airport_code),
+  FOREIGN KEY (airline_name)
+    REFERENCES Airline(airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- Backfill from existing tickets
+INSERT INTO SalesDaily
+    (airline_name, sale_date, dep_airport_code, arr_airport_code, tickets, revenue)
+SELECT t.airline_name, DATE(t.purchase_datetime), f.dep_airport_code, f.arr_airport_code,
+       COUNT(*), SUM(f.base_price)
+FROM Ticket t
+JOIN Flight f
+  ON f.flight_no = t.flight_no
+ AND f.dep_datetime = t.dep_datetime
+ AND f.airline_name = t.airline_name
+GROUP BY t.airline_name, DATE(t.purchase_datetime), f.dep_airport_code, f.arr_airport_code;
@@ -0,0 +1,47 @@
+-- Per-flight and per-route rating aggregates for staff_ratings.
+-- Apply with:
+--   mysql -u <user> -p airline_reservation < db/migrations/004_rating_aggregates.sql
+
+CREATE TABLE FlightRatingStats(
+  flight_no VARCHAR(10) NOT NULL,
+  dep_datetime DATETIME NOT NULL,
+  airline_name VARCHAR (50) NOT NULL,
+  rating_sum INT NOT NULL DEFAULT 0,
+  rating_count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (flight_no, dep_datetime, airline_name),
+  FOREIGN KEY (flight_no, dep_datetime, airline_name)
+    REFERENCES Flight(flight_no, dep_datetime, airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+CREATE TABLE RouteRatingStats(
+  airline_name VARCHAR (50) NOT NULL,
+  dep_airport_code VARCHAR(4) NOT NULL,
+  arr_airport_code VARCHAR(4) NOT NULL,
+  rating_sum INT NOT NULL DEFAULT 0,
+  rating_count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (airline_name, dep_airport_code, arr_airport_code),
+  FOREIGN KEY (airline_name)
+    REFERENCES Airline(airline_name)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+-- Backfill from existing ratings
+INSERT INTO FlightRatingStats
+    (flight_no, dep_datetime, airline_name, rating_sum, rating_count)
+SELECT flight_no, dep_datetime, airline_name, SUM(rating), COUNT(*)
+FROM FlightRating
+GROUP BY flight_no, dep_datetime, airline_name;
+
+INSERT INTO RouteRatingStats
+    (airline_name, dep_airport_code, arr_airport_code, rating_sum, rating_count)
+SELECT f.airline_name, f.dep_airport_code, f.arr_airport_code,
+       SUM(s.rating_sum), SUM(s.rating_count)
+FROM FlightRatingStats s
+JOIN Flight f
+  ON f.flight_no = s.flight_no
+ AND f.dep_datetime = s.dep_datetime
+ AND f.airline_name = s.airline_name
+GROUP BY f.airline_name, f.dep_airport_code, f.arr_airport_code;
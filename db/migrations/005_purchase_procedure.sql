@@ -0,0 +1,72 @@
+-- Single-call purchase path used by customer_confirm_purchase.
+-- Apply with:
+--   mysql -u <user> -p airline_reservation < db/migrations/005_purchase_procedure.sql
+
+DELIMITER //
+CREATE PROCEDURE purchase_ticket(
+  IN p_flight_no VARCHAR(10),
+  IN p_dep_datetime DATETIME,
+  IN p_airline_name VARCHAR(50),
+  IN p_customer_email VARCHAR(255),
+  IN p_card_type VARCHAR(10),
+  IN p_card_num VARCHAR(20),
+  IN p_card_name VARCHAR(100),
+  IN p_exp_date DATE)
+proc: BEGIN
+  DECLARE v_capacity INT DEFAULT NULL;
+  DECLARE v_sold INT;
+  DECLARE v_dep VARCHAR(4);
+  DECLARE v_arr VARCHAR(4);
+  DECLARE v_price DECIMAL(10,2);
+
+  SELECT seat_capacity, seats_sold INTO v_capacity, v_sold
+  FROM FlightInventory
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name
+  FOR UPDATE;
+  IF v_capacity IS NULL THEN
+    SELECT 'no_inventory' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  IF p_dep_datetime <= NOW() THEN
+    SELECT 'departed' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM Ticket
+             WHERE customer_email = p_customer_email AND dep_datetime = p_dep_datetime
+               AND flight_no = p_flight_no AND airline_name = p_airline_name) THEN
+    SELECT 'duplicate' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  IF v_sold >= v_capacity THEN
+    SELECT 'sold_out' AS outcome, NULL AS dep_airport_code, NULL AS arr_airport_code;
+    LEAVE proc;
+  END IF;
+
+  SELECT dep_airport_code, arr_airport_code, base_price INTO v_dep, v_arr, v_price
+  FROM Flight
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name;
+
+  UPDATE FlightInventory SET seats_sold = seats_sold + 1
+  WHERE flight_no = p_flight_no AND dep_datetime = p_dep_datetime
+    AND airline_name = p_airline_name;
+
+  INSERT INTO Ticket
+    (flight_no, dep_datetime, airline_name, customer_email,
+     card_type, card_num, card_name, exp_date)
+  VALUES (p_flight_no, p_dep_datetime, p_airline_name, p_customer_email,
+          p_card_type, p_card_num, p_card_name, p_exp_date);
+
+  INSERT INTO SalesDaily
+    (airline_name, sale_date, dep_airport_code, arr_airport_code, tickets, revenue)
+  VALUES (p_airline_name, CURDATE(), v_dep, v_arr, 1, v_price)
+  ON DUPLICATE KEY UPDATE tickets = tickets + 1,
+                          revenue = revenue + VALUES(revenue);
+
+  SELECT 'ok' AS outcome, v_dep AS dep_airport_code, v_arr AS arr_airport_code;
+END //
+DELIMITER ;
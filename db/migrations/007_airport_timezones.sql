@@ -0,0 +1,32 @@
+-- Airport timezones in the database, and each flight's real (UTC) times
+-- and duration stored at write time instead of recomputed per search.
+-- Apply with:
+--   mysql -u <user> -p airline_reservation < db/migrations/007_airport_timezones.sql
+--   python tools/backfill_flight_utc.py
+-- The backfill fills the new Flight columns for existing rows and then
+-- makes them NOT NULL. Give any airport not listed below a timezone first;
+-- the backfill refuses to run while one is missing.
+
+ALTER TABLE Airport
+  ADD COLUMN timezone VARCHAR(64) NULL;
+
+UPDATE Airport SET timezone = CASE code
+  WHEN 'JFK' THEN 'America/New_York'
+  WHEN 'BOS' THEN 'America/New_York'
+  WHEN 'ORD' THEN 'America/Chicago'
+  WHEN 'LAX' THEN 'America/Los_Angeles'
+  WHEN 'SFO' THEN 'America/Los_Angeles'
+  WHEN 'LHR' THEN 'Europe/London'
+  WHEN 'PVG' THEN 'Asia/Shanghai'
+  WHEN 'BEI' THEN 'Asia/Shanghai'
+  WHEN 'HKA' THEN 'Asia/Hong_Kong'
+  WHEN 'SHEN' THEN 'Asia/Shanghai'
+  WHEN 'DXB' THEN 'Asia/Dubai'
+  WHEN 'AUH' THEN 'Asia/Dubai'
+  WHEN 'SYD' THEN 'Australia/Sydney'
+END;
+
+ALTER TABLE Flight
+  ADD COLUMN dep_utc DATETIME NULL,
+  ADD COLUMN arr_utc DATETIME NULL,
+  ADD COLUMN duration_minutes INT NULL;
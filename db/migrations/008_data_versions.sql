@@ -0,0 +1,14 @@
+-- Change counters for conditional GET, shared by all app processes
+-- (previously each process kept its own, so one worker could answer 304
+-- for a page another worker had just changed). Processes also poll
+-- recent bumps by changed_at to evict their own caches.
+-- Apply with:
+--   mysql -u <user> -p airline_reservation < db/migrations/008_data_versions.sql
+
+CREATE TABLE DataVersion(
+  version_key VARCHAR(512) NOT NULL,
+  counter BIGINT NOT NULL DEFAULT 0,
+  changed_at DATETIME(6) NOT NULL,
+  PRIMARY KEY (version_key),
+  KEY idx_version_changed (changed_at)
+);
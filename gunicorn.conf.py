@@ -0,0 +1,48 @@
+"""
+Production server settings:
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) -- importing main
+opens no connections -- and each forked worker then opens its own MySQL
+connections and warms its caches before it accepts requests. Workers and
+threads scale with the CPU count; override with WEB_CONCURRENCY and
+GUNICORN_THREADS. Each worker holds up to DB_POOL_MAX_SIZE connections,
+so keep workers * DB_POOL_MAX_SIZE under MySQL's max_connections.
+Caches are per worker; each one picks up the others' invalidations from
+the DataVersion table (see CacheSync in main.py).
+"""
+import multiprocessing
+import os
+
+# Sessions must be shared by every worker, so not the per-process "memory" store
+wsgi_app = "main:create_app(session_backend='sqlite')"
+preload_app = True
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Processes sidestep the GIL for template rendering and itinerary search;
+# threads overlap MySQL round trips within each process.
+cores = multiprocessing.cpu_count()
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, cores)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't accumulate; the jitter
+# keeps them from all restarting at once.
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    # After fork, before this worker's first request
+    from main import warm_up
+    warm_up()
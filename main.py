@@ -1,80 +1,690 @@
+import io
+import os
 import re
+import csv
+import sys
+import json
+import time
+import gzip
+import base64
+import sqlite3
+import hashlib
+import hmac
+import secrets
+import threading
+from functools import wraps
 from flask import *
 import pymysql.cursors
-from datetime import datetime, timedelta   
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from werkzeug.local import LocalProxy
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from types import SimpleNamespace
 from calendar import monthrange
+from decimal import Decimal, InvalidOperation
+from collections import namedtuple, defaultdict, OrderedDict
+from bisect import bisect_left
+from heapq import heappush, heapreplace
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only
+    brotli = None
 
 
 # Initialize the app from Flask
 app = Flask(__name__)
 
 # Configure MySQL
-conn = pymysql.connect(host='127.0.0.1',
-                       user='root',
-                       password='',
-                       db='airline_reservation',
-                       charset='utf8mb4',
-                       cursorclass=pymysql.cursors.DictCursor)
-
-# Mapping of airport IATA codes to their respective IANA timezone names.
-# This is used to assign the correct timezone to departure and arrival datetimes.
-AIRPORT_TZ = {
-    'JFK': 'America/New_York',
-    'BOS': 'America/New_York',
-    'ORD': 'America/Chicago',
-    'LAX': 'America/Los_Angeles',
-    'SFO':  'America/Los_Angeles',
-    'LHR': 'Europe/London',
-    'PVG': 'Asia/Shanghai',
-    'BEI':  'Asia/Shanghai',         
-    'HKA':  'Asia/Hong_Kong',     
-    'SHEN': 'Asia/Shanghai', 
-    'DXB': 'Asia/Dubai',
-    'AUH': 'Asia/Dubai',
-    'SYD': 'Australia/Sydney',
-}
-
-def _recompute_durations(rows):
+DB_CONFIG = dict(host='127.0.0.1',
+                 user='root',
+                 password='',
+                 db='airline_reservation',
+                 charset='utf8mb4',
+                 cursorclass=pymysql.cursors.DictCursor)
+
+# Connection pool sizing. MIN connections are opened by warm_up() (nothing
+# connects at import), the pool grows on demand up to MAX, and a request
+# waits at most CHECKOUT_TIMEOUT seconds for a free connection before failing.
+DB_POOL_MIN_SIZE = 2
+DB_POOL_MAX_SIZE = 10
+DB_POOL_CHECKOUT_TIMEOUT = 10
+# Idle connections older than this are pinged before being handed out.
+DB_POOL_PING_INTERVAL = 30
+
+# Read replicas, as DB_CONFIG overrides (usually host/port), e.g.
+#   [dict(host='127.0.0.1', port=3307)]
+# Empty: every query goes to the primary. Read-only queries use
+# `read_conn`, which routes to a replica lagging at most
+# REPLICA_MAX_LAG_SECONDS; a session that wrote within the last
+# REPLICA_READ_YOUR_WRITES_SECONDS, and any request after its first
+# write, reads from the primary instead. Replicas that fail, stop
+# replicating or fall behind are skipped for REPLICA_RETRY_SECONDS.
+DB_REPLICAS = []
+REPLICA_MAX_LAG_SECONDS = 5
+REPLICA_LAG_CHECK_SECONDS = 2
+REPLICA_RETRY_SECONDS = 10
+REPLICA_READ_YOUR_WRITES_SECONDS = REPLICA_MAX_LAG_SECONDS
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of pymysql connections.
+    Connections are checked out once per request (see get_db) and returned
+    in teardown, so concurrent requests never share a socket. Nothing is
+    opened until the first acquire() or fill(), and a forked child starts
+    with an empty pool (reset_after_fork), so workers never share sockets.
     """
-    Post-processes flight data rows by recomputing flight durations across time zones.
-    This ensures accurate and consistent durations for routes crossing time zones,
-    instead of relying on DB-stored duration strings (which may be incorrect).
-	"""
-    if not rows:
-        return
 
-    for r in rows:
+    def __init__(self, config, min_size, max_size, timeout, ping_interval):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._idle = []          # [(connection, last_used_monotonic)]
+        self._size = 0           # idle + checked out
+        self._cond = threading.Condition()
+
+        # wait-time stats (seconds)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _connect(self):
+        return pymysql.connect(**self.config)
+
+    def fill(self):
+        """Open connections until the pool holds min_size."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                c = self._connect()
+            except Exception:
+                self._discard()
+                raise
+            with self._cond:
+                self._idle.append((c, time.monotonic()))
+                self._cond.notify()
+
+    def reset_after_fork(self):
+        """
+        In a freshly forked child: drop the parent's connections without
+        closing them (a clean close would end the parent's MySQL sessions
+        on the shared sockets) and start empty.
+        """
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self.checkouts = self.timeouts = self.reconnects = 0
+        self.wait_total = self.wait_max = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    c, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # reserve the slot, open the socket outside the lock
+                    self._size += 1
+                    c, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise RuntimeError("Timed out waiting for a database connection.")
+                self._cond.wait(remaining)
+
         try:
-            # Create departure datetime with timezone
-            dep_date_str = r['d_date'] + " " + r['d_time']
-            dep_dt = datetime.strptime(dep_date_str, "%B %d, %Y %I:%M %p")
-            dep_tz = AIRPORT_TZ.get(r['dep_airport_code'], 'UTC')
-            dep_dt = dep_dt.replace(tzinfo=ZoneInfo(dep_tz))
-
-            # Create arrival datetime with timezone
-            arr_date_str = r['a_date'] + " " + r['a_time']
-            arr_dt = datetime.strptime(arr_date_str, "%B %d, %Y %I:%M %p")
-            arr_tz = AIRPORT_TZ.get(r['arr_airport_code'], 'UTC')
-            arr_dt = arr_dt.replace(tzinfo=ZoneInfo(arr_tz))
-
-            # Convert both datetimes to UTC
-            dep_utc = dep_dt.astimezone(ZoneInfo('UTC'))
-            arr_utc = arr_dt.astimezone(ZoneInfo('UTC'))
-
-            # Calculate difference in minutes
-            total_seconds = (arr_utc - dep_utc).total_seconds()
-            minutes = int(total_seconds // 60)
-
-            # Format as "HHh MMm"
-            hours = minutes // 60
-            mins = minutes % 60
-            r['flight_duration'] = f"{hours:02d}h {mins:02d}m"
+            if c is None:
+                c = self._connect()
+            elif time.monotonic() - last_used > self.ping_interval:
+                # Health check: replace stale sockets (server restarts,
+                # wait_timeout expiry) before the request sees them.
+                try:
+                    c.ping(reconnect=False)
+                except Exception:
+                    try:
+                        c.close()
+                    except Exception:
+                        pass
+                    c = self._connect()
+                    with self._cond:
+                        self.reconnects += 1
+        except Exception:
+            self._discard()
+            raise
 
+        waited = time.monotonic() - start
+        with self._cond:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return c
+
+    def release(self, c):
+        try:
+            # End whatever transaction the request left open so the next
+            # borrower starts clean (and sees fresh data).
+            c.rollback()
         except Exception:
-            # If anything goes wrong, skip and keep existing value
-            continue
+            try:
+                c.close()
+            except Exception:
+                pass
+            self._discard()
+            return
+
+        with self._cond:
+            self._idle.append((c, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+                "wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+# ============================ Instrumentation ================================
+
+# Requests slower than this are logged with their per-query SQL breakdown
+SLOW_REQUEST_MS = 500
+# Latency histogram bucket upper bounds, in seconds (Prometheus convention)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Per-request cap on queries kept for the slow-request log
+SLOW_LOG_MAX_QUERIES = 100
+# /metrics answers scrapes from loopback that were not forwarded by a
+# proxy (no X-Forwarded-For), or any request carrying
+# "Authorization: Bearer <METRICS_TOKEN>" when a token is set; everyone
+# else gets a 404.
+METRICS_TOKEN = None
+METRICS_LOCAL_ADDRS = ("127.0.0.1", "::1")
+
+
+class RouteMetrics:
+    """Process-wide per-endpoint latency histograms and SQL totals."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (endpoint, method) -> [bucket counts..., +Inf count], sum, count
+        self._latency = {}
+        # endpoint -> [queries, sql_seconds, rows]
+        self._sql = {}
+
+    def observe(self, endpoint, method, seconds, sql):
+        with self._lock:
+            h = self._latency.get((endpoint, method))
+            if h is None:
+                h = self._latency[(endpoint, method)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    h[0][i] += 1
+            h[0][-1] += 1
+            h[1] += seconds
+            h[2] += 1
+
+            totals = self._sql.setdefault(endpoint, [0, 0.0, 0])
+            totals[0] += sql.queries
+            totals[1] += sql.seconds
+            totals[2] += sql.rows
+
+    def snapshot(self):
+        with self._lock:
+            latency = {k: ([*v[0]], v[1], v[2]) for k, v in self._latency.items()}
+            sql = {k: tuple(v) for k, v in self._sql.items()}
+        return latency, sql
+
+
+route_metrics = RouteMetrics(LATENCY_BUCKETS)
+
+
+class RequestSQLStats:
+    """SQL work done on behalf of one request (kept on flask.g)."""
+
+    __slots__ = ("queries", "seconds", "rows", "detail")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.detail = []
+
+    def merge(self, other):
+        """Fold in the stats of work done for this request on another thread."""
+        self.queries += other.queries
+        self.seconds += other.seconds
+        self.rows += other.rows
+        room = SLOW_LOG_MAX_QUERIES - len(self.detail)
+        self.detail.extend(other.detail[:max(room, 0)])
+
+    def record(self, query, seconds, rows):
+        self.queries += 1
+        self.seconds += seconds
+        self.rows += max(rows, 0)
+        if len(self.detail) < SLOW_LOG_MAX_QUERIES:
+            self.detail.append((" ".join(str(query).split())[:160], seconds, rows))
+
+
+_READ_STATEMENTS = ("SELECT", "SHOW", "EXPLAIN", "DESCRIBE")
+
+class InstrumentedCursor(pymysql.cursors.DictCursor):
+    """
+    DictCursor that charges each statement's time and row count to the
+    current request, and flags the request as a writer (g.db_wrote) on its
+    first non-read statement so later reads stay on the primary.
+    """
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            if has_app_context():
+                stats = g.get("sql_stats")
+                if stats is not None:
+                    stats.record(query, time.perf_counter() - start, self.rowcount)
+                if not str(query).lstrip().upper().startswith(_READ_STATEMENTS):
+                    g.db_wrote = True
+
+
+@app.before_request
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_stats = RequestSQLStats()
+
+@app.after_request
+def _finish_request_metrics(response):
+    started = g.pop("request_started", None)
+    stats = g.pop("sql_stats", None)
+    if started is None or stats is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or "unmatched"
+    route_metrics.observe(endpoint, request.method, elapsed, stats)
+
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        lines = [f"  {ms * 1000:8.1f} ms {rows:>7} rows  {sql}" for sql, ms, rows in stats.detail]
+        app.logger.warning(
+            "Slow request %s %s -> %s in %.1f ms: %d queries, %.1f ms SQL, %d rows\n%s",
+            request.method, request.path, response.status_code, elapsed * 1000,
+            stats.queries, stats.seconds * 1000, stats.rows, "\n".join(lines))
+    return response
+
+
+def _prom_labels(**labels):
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels.items()) + "}"
+
+def _metrics_allowed():
+    if METRICS_TOKEN:
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer ") and hmac.compare_digest(
+                auth[len("Bearer "):].encode(), METRICS_TOKEN.encode()):
+            return True
+    return (request.remote_addr in METRICS_LOCAL_ADDRS
+            and "X-Forwarded-For" not in request.headers)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of route latency, SQL, pool and cache stats."""
+    if not _metrics_allowed():
+        abort(404)
+    latency, sql = route_metrics.snapshot()
+    out = []
+
+    out.append("# HELP http_request_duration_seconds Request latency by endpoint.")
+    out.append("# TYPE http_request_duration_seconds histogram")
+    for (endpoint, method), (counts, total, n) in sorted(latency.items()):
+        for bound, c in zip([*LATENCY_BUCKETS, "+Inf"], counts):
+            out.append("http_request_duration_seconds_bucket"
+                       f"{_prom_labels(endpoint=endpoint, method=method, le=bound)} {c}")
+        out.append(f"http_request_duration_seconds_sum{_prom_labels(endpoint=endpoint, method=method)} {total}")
+        out.append(f"http_request_duration_seconds_count{_prom_labels(endpoint=endpoint, method=method)} {n}")
+
+    for name, idx, help_text in (("db_queries_total", 0, "SQL statements executed."),
+                                 ("db_query_seconds_total", 1, "Time spent executing SQL."),
+                                 ("db_rows_total", 2, "Rows returned or affected by SQL.")):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} counter")
+        for endpoint, totals in sorted(sql.items()):
+            out.append(f"{name}{_prom_labels(endpoint=endpoint)} {totals[idx]}")
+
+    pool = db_pool.stats()
+    out.append("# TYPE db_pool_connections gauge")
+    for state in ("size", "idle", "in_use"):
+        out.append(f"db_pool_connections{_prom_labels(state=state)} {pool[state]}")
+    for key in ("checkouts", "timeouts", "reconnects"):
+        out.append(f"# TYPE db_pool_{key}_total counter")
+        out.append(f"db_pool_{key}_total {pool[key]}")
+    out.append("# TYPE db_pool_wait_ms gauge")
+    out.append(f"db_pool_wait_ms{_prom_labels(stat='avg')} {pool['wait_avg_ms']}")
+    out.append(f"db_pool_wait_ms{_prom_labels(stat='max')} {pool['wait_max_ms']}")
+
+    if replica_set is not None:
+        rs = replica_set.stats()
+        out.append("# TYPE db_reads_total counter")
+        out.append(f"db_reads_total{_prom_labels(target='replica')} {rs['replica_reads']}")
+        out.append(f"db_reads_total{_prom_labels(target='primary_fallback')} {rs['fallback_reads']}")
+        out.append("# TYPE db_replica_up gauge")
+        out.append("# TYPE db_replica_lag_seconds gauge")
+        for r in rs["replicas"]:
+            out.append(f"db_replica_up{_prom_labels(replica=r['name'])} {int(r['up'])}")
+            if r["lag"] is not None:
+                out.append(f"db_replica_lag_seconds{_prom_labels(replica=r['name'])} {r['lag']}")
+
+    out.append("# TYPE cache_requests_total counter")
+    out.append("# TYPE cache_entries gauge")
+    out.append("# TYPE cache_bytes gauge")
+    for name, cache in (("reference", reference_cache), ("search", search_cache),
+                        ("fare_calendar", fare_calendar_cache), ("session", session_store)):
+        st = cache.stats()
+        out.append(f"cache_requests_total{_prom_labels(cache=name, result='hit')} {st['hits']}")
+        out.append(f"cache_requests_total{_prom_labels(cache=name, result='miss')} {st['misses']}")
+        out.append(f"cache_entries{_prom_labels(cache=name)} {st['entries']}")
+        if "bytes" in st:
+            out.append(f"cache_bytes{_prom_labels(cache=name)} {st['bytes']}")
+
+    sync = cache_sync.stats()
+    out.append("# TYPE cache_sync_polls_total counter")
+    out.append(f"cache_sync_polls_total {sync['polls']}")
+    out.append("# TYPE cache_sync_invalidations_total counter")
+    out.append(f"cache_sync_invalidations_total {sync['evictions']}")
+
+    return Response("\n".join(out) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+# Pooled connections use InstrumentedCursor so /metrics sees every query
+db_pool = ConnectionPool({**DB_CONFIG, 'cursorclass': InstrumentedCursor},
+                         DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+                         DB_POOL_CHECKOUT_TIMEOUT, DB_POOL_PING_INTERVAL)
+
+def get_db():
+    """Return this request's pooled connection, checking one out on first use."""
+    if 'db_conn' not in g:
+        g.db_conn = db_pool.acquire()
+    return g.db_conn
+
+# Warm-up hooks run once per worker process, after fork and before it
+# takes traffic (see warm_up and gunicorn.conf.py): open the pool's
+# minimum connections, preload in-process caches.
+_warmup_hooks = []
+
+def on_warmup(fn):
+    """Register fn to run in warm_up()."""
+    _warmup_hooks.append(fn)
+    return fn
+
+def warm_up():
+    """Run every warm-up hook in this process. A failing hook is logged, not fatal."""
+    with app.app_context():
+        for hook in _warmup_hooks:
+            started = time.perf_counter()
+            try:
+                hook()
+            except Exception:
+                app.logger.exception("Warm-up hook %s failed", hook.__name__)
+                continue
+            app.logger.info("Warm-up %s took %.1f ms", hook.__name__,
+                            (time.perf_counter() - started) * 1000)
+
+@on_warmup
+def _warm_db_pool():
+    db_pool.fill()
+
+class ReplicaSet:
+    """
+    Read replicas, one ConnectionPool each. acquire() hands out a
+    connection from the next replica (round robin) that is up and whose
+    replication lag was within max_lag at its last check, or None when no
+    replica qualifies -- the caller then reads from the primary. Lag is
+    re-checked at most every check_interval seconds per replica.
+    """
+
+    def __init__(self, configs, max_lag, check_interval, retry_after):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.replicas = [{
+            "name": f"{cfg.get('host', DB_CONFIG['host'])}:{cfg.get('port', 3306)}",
+            "pool": ConnectionPool({**DB_CONFIG, 'cursorclass': InstrumentedCursor, **cfg},
+                                   0, DB_POOL_MAX_SIZE,
+                                   DB_POOL_CHECKOUT_TIMEOUT, DB_POOL_PING_INTERVAL),
+            "down_until": 0.0,
+            "lag": None,
+            "checked": 0.0,
+        } for cfg in configs]
+        self._next = 0
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.fallback_reads = 0
+
+    def acquire(self):
+        """(replica, connection) from a usable replica, or None."""
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if replica["down_until"] > time.monotonic():
+                continue
+            try:
+                c = replica["pool"].acquire()
+            except Exception:
+                self._mark_down(replica, "connect failed")
+                continue
+            if time.monotonic() - replica["checked"] >= self.check_interval:
+                try:
+                    replica["lag"] = self._lag(c)
+                except Exception:
+                    replica["lag"] = None
+                replica["checked"] = time.monotonic()
+            if replica["lag"] is None or replica["lag"] > self.max_lag:
+                replica["pool"].release(c)
+                self._mark_down(replica, "not replicating" if replica["lag"] is None
+                                else f"{replica['lag']}s behind")
+                continue
+            with self._lock:
+                self.replica_reads += 1
+            return replica, c
+        with self._lock:
+            self.fallback_reads += 1
+        return None
+
+    def release(self, replica, c):
+        replica["pool"].release(c)
+
+    def _lag(self, c):
+        """Seconds behind the source, or None when replication isn't running."""
+        cur = c.cursor()
+        try:
+            try:
+                cur.execute("SHOW REPLICA STATUS")
+                row, key = cur.fetchone(), "Seconds_Behind_Source"
+            except pymysql.MySQLError:
+                # MySQL < 8.0.22 / MariaDB
+                cur.execute("SHOW SLAVE STATUS")
+                row, key = cur.fetchone(), "Seconds_Behind_Master"
+        finally:
+            cur.close()
+        return row.get(key) if row else None
+
+    def _mark_down(self, replica, reason):
+        if replica["down_until"] <= time.monotonic():
+            app.logger.warning("Read replica %s unavailable (%s); reading from the primary for %ds",
+                               replica["name"], reason, self.retry_after)
+        replica["down_until"] = time.monotonic() + self.retry_after
+        replica["checked"] = 0.0
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replica_reads": self.replica_reads,
+                "fallback_reads": self.fallback_reads,
+                "replicas": [{"name": r["name"], "up": r["down_until"] <= now, "lag": r["lag"]}
+                             for r in self.replicas],
+            }
+
+
+replica_set = ReplicaSet(DB_REPLICAS, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_SECONDS,
+                         REPLICA_RETRY_SECONDS) if DB_REPLICAS else None
+
+def reads_use_primary():
+    """
+    True when this context's reads must go to the primary: no replicas,
+    the request has already written, the caller pinned it (g.db_primary_reads,
+    e.g. search legs of a pinned request), or the session wrote recently.
+    """
+    if replica_set is None or g.get('db_wrote') or g.get('db_primary_reads'):
+        return True
+    if 'db_sticky' not in g:
+        # Only a request carrying a session cookie can have written before;
+        # checking that first keeps anonymous traffic from loading a session.
+        last_write = None
+        if has_request_context() and request.cookies.get(app.session_interface.get_cookie_name(app)):
+            last_write = session.get('_last_write')
+        g.db_sticky = (last_write is not None
+                       and time.time() - last_write < REPLICA_READ_YOUR_WRITES_SECONDS)
+    return g.db_sticky
+
+def get_read_db():
+    """Connection for read-only queries: a replica when allowed, else the primary."""
+    if reads_use_primary():
+        return get_db()
+    if 'db_read' not in g:
+        g.db_read = replica_set.acquire()
+    if g.db_read is None:
+        return get_db()
+    return g.db_read[1]
+
+@app.teardown_appcontext
+def _release_db(exc):
+    c = g.pop('db_conn', None)
+    if c is not None:
+        db_pool.release(c)
+    read = g.pop('db_read', None)
+    if read is not None:
+        replica_set.release(*read)
+
+@app.after_request
+def _remember_write(response):
+    # Keep this session's reads on the primary until replicas catch up
+    if replica_set is not None and g.get('db_wrote'):
+        session['_last_write'] = time.time()
+    return response
+
+# Every route uses `conn` as before; it now resolves to the connection
+# bound to the current app context instead of one shared global socket.
+# It always points at the primary: use it for writes and for reads that
+# must see them. `read_conn` is for read-only queries (see DB_REPLICAS).
+conn = LocalProxy(get_db)
+read_conn = LocalProxy(get_read_db)
+
+# Process caches are shared by every user, so an entry refilled from a
+# replica that has not yet replayed the write that emptied it would serve
+# the old rows for its whole TTL, to the writer too. For a while after a
+# cache key is invalidated (here or, via CacheSync, elsewhere) its refill
+# reads the primary. Keys are the DataVersion keys, e.g. ("route", dep, arr).
+CACHE_FILL_PRIMARY_SECONDS = REPLICA_MAX_LAG_SECONDS + REPLICA_LAG_CHECK_SECONDS
+
+_primary_fills = {}          # key -> monotonic deadline
+_primary_fills_lock = threading.Lock()
+
+def note_invalidated(*keys):
+    """Refill these cache keys from the primary for CACHE_FILL_PRIMARY_SECONDS."""
+    if replica_set is None:
+        return
+    now = time.monotonic()
+    with _primary_fills_lock:
+        for key in keys:
+            _primary_fills[key] = now + CACHE_FILL_PRIMARY_SECONDS
+        if len(_primary_fills) > 1024:
+            for k in [k for k, deadline in _primary_fills.items() if deadline <= now]:
+                del _primary_fills[k]
+
+def fill_conn(key):
+    """Connection to refill the cache entry for key: the primary right after an invalidation, else read_conn."""
+    if replica_set is not None:
+        with _primary_fills_lock:
+            deadline = _primary_fills.get(key)
+        if deadline is not None and deadline > time.monotonic():
+            return conn
+    return read_conn
+
+def _airport_tz(code):
+    """
+    ZoneInfo for an airport, from Airport.timezone (see the
+    "airport_timezones" reference entry). A code missing from the table
+    is logged and treated as UTC.
+    """
+    sync_caches()
+    tz = reference_cache.get("airport_timezones").get(code)
+    if tz is None:
+        app.logger.warning("No timezone for airport %s; treating it as UTC.", code)
+        tz = timezone.utc
+    return tz
+
+def flight_utc_times(dep_local, arr_local, dep_tz, arr_tz):
+    """
+    (dep_utc, arr_utc, duration_minutes) for a flight whose departure and
+    arrival are local wall-clock times at airports in dep_tz / arr_tz.
+    The UTC values are naive, as stored in Flight.dep_utc / arr_utc.
+    """
+    dep_utc = dep_local.replace(tzinfo=dep_tz).astimezone(timezone.utc).replace(tzinfo=None)
+    arr_utc = arr_local.replace(tzinfo=arr_tz).astimezone(timezone.utc).replace(tzinfo=None)
+    return dep_utc, arr_utc, int((arr_utc - dep_utc).total_seconds() // 60)
+
+_MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June", "July",
+                "August", "September", "October", "November", "December")
+
+def _fmt_date(dt):
+    """Python twin of DATE_FORMAT(dt, '%M %e, %Y') -> 'November 5, 2025'."""
+    return f"{_MONTH_NAMES[dt.month]} {dt.day}, {dt.year}"
+
+def _fmt_time(dt):
+    """Python twin of DATE_FORMAT(dt, '%l:%i %p') -> '6:00 PM'."""
+    return f"{dt.hour % 12 or 12}:{dt.minute:02d} {'AM' if dt.hour < 12 else 'PM'}"
+
+def _fmt_minutes(minutes):
+    return f"{minutes // 60:02d}h {minutes % 60:02d}m"
+
+def _format_flight_rows(rows):
+    """
+    Presentation step: add the d_date/d_time/a_date/a_time/flight_duration
+    strings templates show, plus dep_key -- the canonical departure
+    ('YYYY-MM-DD HH:MM:SS') purchase forms send back.
+    """
+    for r in rows:
+        r['dep_key'] = r['dep_datetime'].isoformat(sep=' ')
+        r['d_date'] = _fmt_date(r['dep_datetime'])
+        r['d_time'] = _fmt_time(r['dep_datetime'])
+        r['a_date'] = _fmt_date(r['arr_datetime'])
+        r['a_time'] = _fmt_time(r['arr_datetime'])
+        r['flight_duration'] = _fmt_minutes(r['duration_minutes'])
 
 def _normalize_staff_phone(raw: str) -> str:
      """
@@ -94,12 +704,441 @@ def _normalize_staff_phone(raw: str) -> str:
          return raw
      return f"+{digits}"
 
+class ReferenceCache:
+    """
+    In-process TTL cache for small, rarely-changing lookup tables
+    (airport codes, airline names). Each entry is loaded by a registered
+    function on first use or after it expires; writers call invalidate()
+    so the next read reloads. Cached values are shared -- don't mutate them.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._loaders = {}
+        self._load_locks = {}    # name -> lock held while that entry loads
+        self._entries = {}       # name -> (value, expires_at)
+        self._generations = defaultdict(int)   # name -> invalidation count
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._load_locks[name] = threading.Lock()
+
+    def _fresh(self, name):
+        entry = self._entries.get(name)
+        return entry if entry and entry[1] > time.monotonic() else None
+
+    def get(self, name):
+        with self._lock:
+            entry = self._fresh(name)
+            if entry:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # One lock per entry: concurrent misses on it share one load, and a
+        # slow load (the route graph) doesn't hold up the other entries.
+        with self._load_locks[name]:
+            with self._lock:
+                entry = self._fresh(name)
+                generation = self._generations[name]
+            if entry:
+                return entry[0]
+            value = self._loaders[name]()
+            with self._lock:
+                # Invalidated mid-load: the value may predate the write, so don't keep it
+                if self._generations[name] == generation:
+                    self._entries[name] = (value, time.monotonic() + self.ttl)
+            return value
+
+    def invalidate(self, name=None):
+        """Drop one entry (or all of them when name is None)."""
+        with self._lock:
+            names = list(self._loaders) if name is None else [name]
+            for n in names:
+                self._entries.pop(n, None)
+                self._generations[n] += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+def _approx_size(obj):
+    """Rough deep size in bytes of a cached value (lists/dicts of scalars)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(v) for v in obj)
+    return size
+
+
+class ResultCache:
+    """
+    Keyed LRU cache with a per-entry TTL and entry/byte limits, for query
+    results that depend on request parameters (fare calendars, searches).
+    invalidate_where() drops every entry whose key matches a predicate,
+    so writers can evict exactly the routes they touched.
+    """
+
+    def __init__(self, ttl, max_entries, max_bytes=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (value, expires_at, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value for key, or None on a miss / expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        nbytes = _approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, nbytes)
+            self._bytes += nbytes
+            while self._entries and (
+                    len(self._entries) > self.max_entries
+                    or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        # caller holds the lock
+        self._bytes -= self._entries.pop(key)[2]
+
+    def invalidate_where(self, predicate):
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+                "bytes": self._bytes,
+            }
+
+
+# Every worker process has its own caches, but an invalidation hook only
+# runs in the process that handled the write. Each hook therefore also
+# bumps a DataVersion key (see bump_versions), and sync_caches() asks the
+# primary, at most once every CACHE_SYNC_INTERVAL seconds per process,
+# which keys changed since this process last looked and runs the matching
+# local eviction. Rows bumped within CACHE_SYNC_OVERLAP_SECONDS of the last
+# poll are read again, so a bump committed just after its changed_at was
+# stamped is not missed.
+CACHE_SYNC_INTERVAL = 2
+CACHE_SYNC_OVERLAP_SECONDS = 2
+
+class CacheSync:
+    """
+    Applies other processes' invalidations to this process's caches.
+    on_change(kind) registers a handler called with the rest of each
+    changed key whose first element is kind, e.g. ("route", dep, arr).
+    Polls at most once per interval, on a pooled primary connection; in
+    between, sync() is a clock check. Counters this process bumped itself
+    (see note_bumped) are not applied again. The latest counter and bump
+    time seen for each key are kept for DataVersions.snapshot().
+    """
+
+    def __init__(self, interval, overlap):
+        self.interval = interval
+        self.overlap = overlap
+        self._handlers = defaultdict(list)
+        self._since = None       # primary's clock at the last poll
+        self._next_poll = 0.0    # monotonic
+        self._counters = {}      # version_key -> latest counter applied here
+        self._seen = {}          # version_key -> (counter, changed_at epoch), latest known
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self.polls = 0
+        self.evictions = 0
+
+    def on_change(self, kind):
+        def decorator(fn):
+            self._handlers[kind].append(fn)
+            return fn
+        return decorator
+
+    @staticmethod
+    def _primary_now(cursor):
+        cursor.execute("SELECT NOW(6) AS now")
+        return cursor.fetchone()["now"]
+
+    def start(self):
+        """Start watching from now; call before this process fills any cache."""
+        c = db_pool.acquire()
+        try:
+            cursor = c.cursor()
+            now = self._primary_now(cursor)
+            cursor.close()
+        finally:
+            db_pool.release(c)
+        with self._lock:
+            if self._since is None:
+                self._since = now
+                self._next_poll = time.monotonic() + self.interval
+
+    def sync(self):
+        if time.monotonic() < self._next_poll:
+            return
+        # One thread polls; the others go on with what they have
+        if not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_poll:
+                return
+            if self._since is None:
+                self.start()
+                return
+            c = db_pool.acquire()
+            try:
+                cursor = c.cursor()
+                now = self._primary_now(cursor)
+                cursor.execute("""SELECT version_key, counter,
+                                         UNIX_TIMESTAMP(changed_at) AS changed_at
+                                  FROM DataVersion WHERE changed_at >= %s""",
+                               (self._since - timedelta(seconds=self.overlap),))
+                rows = cursor.fetchall()
+                cursor.close()
+            finally:
+                db_pool.release(c)
+
+            changed = []
+            with self._lock:
+                self.polls += 1
+                self._learn({r["version_key"]: (r["counter"], float(r["changed_at"])) for r in rows})
+                for r in rows:
+                    if r["counter"] > self._counters.get(r["version_key"], 0):
+                        self._counters[r["version_key"]] = r["counter"]
+                        changed.append(json.loads(r["version_key"]))
+                self._since = max(self._since, now)
+                self._next_poll = time.monotonic() + self.interval
+                self.evictions += len(changed)
+        finally:
+            self._poll_lock.release()
+        for key in changed:
+            for handler in self._handlers.get(key[0], ()):
+                handler(*key[1:])
+
+    def note_bumped(self, versions):
+        """
+        Record versions (version_key -> (counter, changed_at)) this process
+        produced after running the eviction itself. Only a bump directly
+        after the last counter applied here counts as applied; if another
+        process bumped in between, the poll still applies it.
+        """
+        with self._lock:
+            self._learn(versions)
+            for name, (counter, _changed_at) in versions.items():
+                if self._counters.get(name, 0) == counter - 1:
+                    self._counters[name] = counter
+
+    def learn(self, versions):
+        """Remember versions read elsewhere; counters only move forward."""
+        with self._lock:
+            self._learn(versions)
+
+    def _learn(self, versions):
+        # caller holds the lock
+        for name, version in versions.items():
+            if name not in self._seen or version[0] > self._seen[name][0]:
+                self._seen[name] = version
+
+    def versions(self, names):
+        """{version_key: (counter, changed_at)} for the names known here."""
+        with self._lock:
+            return {n: self._seen[n] for n in names if n in self._seen}
+
+    def stats(self):
+        with self._lock:
+            return {"polls": self.polls, "evictions": self.evictions}
+
+
+cache_sync = CacheSync(CACHE_SYNC_INTERVAL, CACHE_SYNC_OVERLAP_SECONDS)
+
+def sync_caches():
+    """Apply other workers' invalidations before reading a shared cache."""
+    cache_sync.sync()
+
+@on_warmup
+def _warm_cache_sync():
+    # Before the caches below are filled, so no invalidation falls in between
+    cache_sync.start()
+
+
+# Reference data is reloaded at most every REFERENCE_CACHE_TTL seconds
+REFERENCE_CACHE_TTL = 300
+reference_cache = ReferenceCache(REFERENCE_CACHE_TTL)
+
+def _load_airport_codes():
+    cursor = fill_conn(("airports",)).cursor()
+    cursor.execute("SELECT code FROM airport ORDER BY code")
+    rows = cursor.fetchall()
+    cursor.close()
+    return [row["code"] for row in rows]
+
+def _load_airline_names():
+    cursor = fill_conn(("airlines",)).cursor()
+    cursor.execute("SELECT airline_name FROM Airline ORDER BY airline_name")
+    rows = cursor.fetchall()
+    cursor.close()
+    return [row["airline_name"] for row in rows]
+
+def _load_airport_timezones():
+    cursor = fill_conn(("airports",)).cursor()
+    cursor.execute("SELECT code, timezone FROM Airport")
+    rows = cursor.fetchall()
+    cursor.close()
+    zones = {}
+    for row in rows:
+        try:
+            zones[row["code"]] = ZoneInfo(row["timezone"])
+        except Exception:
+            app.logger.warning("Airport %s has unknown timezone %r; treating it as UTC.",
+                               row["code"], row["timezone"])
+            zones[row["code"]] = timezone.utc
+    return zones
+
+reference_cache.register("airport_codes", _load_airport_codes)
+reference_cache.register("airport_timezones", _load_airport_timezones)
+reference_cache.register("airline_names", _load_airline_names)
+
 def get_airport_codes():
-	cursor = conn.cursor()
-	cursor.execute("SELECT code FROM airport ORDER BY code")
-	rows = cursor.fetchall()
-	cursor.close()
-	return [row["code"] for row in rows]
+    sync_caches()
+    return reference_cache.get("airport_codes")
+
+def get_airline_names():
+    sync_caches()
+    return reference_cache.get("airline_names")
+
+# Invalidation hooks: call after any write to Airport / Airline
+@cache_sync.on_change("airports")
+def _evict_airports():
+    note_invalidated(("airports",))
+    reference_cache.invalidate("airport_codes")
+    reference_cache.invalidate("airport_timezones")
+    reference_cache.invalidate("airport_index")
+
+def invalidate_airports():
+    _evict_airports()
+    bump_versions(("airports",))
+
+@cache_sync.on_change("airlines")
+def _evict_airlines():
+    note_invalidated(("airlines",))
+    reference_cache.invalidate("airline_names")
+
+def invalidate_airlines():
+    _evict_airlines()
+    bump_versions(("airlines",))
+
+# Airport autocomplete: most suggestions a lookup returns
+AIRPORT_LOOKUP_DEFAULT = 8
+AIRPORT_LOOKUP_MAX = 25
+
+class AirportIndex:
+    """
+    Prefix index over airport code, city and country for autocomplete.
+    Each field keeps a sorted list of (word, code) keys -- the whole value
+    and each word in it, case-folded -- so a lookup is one bisect per field
+    plus a scan that stops after `limit` airports. Code matches rank
+    first, then city, then country. Immutable once built.
+    """
+
+    FIELDS = ("code", "city", "country")
+
+    def __init__(self, rows):
+        self.airports = {r["code"]: {f: r[f] for f in self.FIELDS} for r in rows}
+        self._keys = []
+        for field in self.FIELDS:
+            keys = set()
+            for r in rows:
+                text = r[field].casefold()
+                keys.add((text, r["code"]))
+                keys.update((word, r["code"]) for word in text.split())
+            self._keys.append(sorted(keys))
+
+    def __len__(self):
+        return len(self.airports)
+
+    def lookup(self, prefix, limit=AIRPORT_LOOKUP_DEFAULT):
+        """Airports with a code, city or country (or a word of one) starting with prefix."""
+        prefix = " ".join(prefix.casefold().split())
+        if not prefix:
+            return []
+        found = {}
+        for keys in self._keys:
+            i = bisect_left(keys, (prefix,))
+            while i < len(keys) and len(found) < limit and keys[i][0].startswith(prefix):
+                code = keys[i][1]
+                if code not in found:
+                    found[code] = self.airports[code]
+                i += 1
+            if len(found) >= limit:
+                break
+        return list(found.values())
+
+def _load_airport_index():
+    cursor = fill_conn(("airports",)).cursor()
+    cursor.execute("SELECT code, city, country FROM Airport")
+    rows = cursor.fetchall()
+    cursor.close()
+    return AirportIndex(rows)
+
+reference_cache.register("airport_index", _load_airport_index)
+
+# Autocomplete stays off sync_caches(): the index picks up airport changes
+# from the polls other requests run, or at its REFERENCE_CACHE_TTL expiry.
+def lookup_airports(prefix, limit=AIRPORT_LOOKUP_DEFAULT):
+    return reference_cache.get("airport_index").lookup(prefix, limit)
+
+def resolve_airport(text):
+    """
+    Airport code for a free-text airport field: the code itself, or the
+    only airport whose code, city or country starts with text. None when
+    nothing or more than one airport matches.
+    """
+    code = text.strip().upper()
+    if code in reference_cache.get("airport_index").airports:
+        return code
+    matches = lookup_airports(text, 2)
+    return matches[0]["code"] if len(matches) == 1 else None
 
 def _require_staff():
     """Redirect to login unless the session is a staff user with an airline."""
@@ -118,18 +1157,141 @@ def _parse_date(s):
         return datetime.strptime(s, "%Y-%m-%d").date()
     except Exception:
         return None
+
+def _day_range(first, last=None):
+    """
+    Half-open [first 00:00, day after last 00:00) datetime bounds.
+    Comparing the raw column against these (instead of DATE(col)) keeps
+    the predicate sargable so MySQL can range-scan the datetime indexes.
+    """
+    last = last or first
+    start = datetime.combine(first, datetime.min.time())
+    end = datetime.combine(last + timedelta(days=1), datetime.min.time())
+    return start, end
+
+# Direct-flight search for one leg: (source, destination, day_start, day_end).
+# Returns raw DATETIMEs and the stored duration; see _format_flight_rows.
+# Served by idx_flight_route_dep (see db/migrations/001_search_indexes.sql).
+FLIGHT_SEARCH_SQL = """SELECT flight_no, airline_name, dep_airport_code, arr_airport_code, 
+                            dep_datetime, arr_datetime, duration_minutes, base_price
+                    FROM Flight
+                    WHERE dep_airport_code = %s AND arr_airport_code = %s AND 
+                            dep_datetime >= %s AND dep_datetime < %s AND dep_datetime > NOW()
+                    ORDER BY dep_datetime ASC
+                """
+
+# Per-leg search results, keyed by (source, destination, day). Entries are
+# evicted for exactly the (route, day) touched by flight creation, status
+# changes and ticket sales; the short TTL covers flights departing (NOW()).
+SEARCH_CACHE_TTL = 60
+SEARCH_CACHE_MAX_ENTRIES = 5000
+SEARCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+search_cache = ResultCache(SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_MAX_BYTES)
+
+def search_leg(source, destination, day):
+    """
+    Direct flights source -> destination departing on `day`, with durations
+    and display strings filled in. Served from search_cache when possible;
+    the returned rows are shared, so callers must not mutate them.
+    """
+    key = (source, destination, day)
+    sync_caches()
+    rows = search_cache.get(key)
+    if rows is None:
+        cursor = fill_conn(("route", source, destination)).cursor()
+        cursor.execute(FLIGHT_SEARCH_SQL, (source, destination, *_day_range(day)))
+        rows = cursor.fetchall()
+        cursor.close()
+        _format_flight_rows(rows)
+        search_cache.put(key, rows)
+    return rows
+
+def invalidate_search(dep_airport_code, arr_airport_code, dep_datetime):
+    """Evict the cached search for the route and departure day of one flight."""
+    key = (dep_airport_code, arr_airport_code, dep_datetime.date())
+    note_invalidated(("route", dep_airport_code, arr_airport_code))
+    search_cache.invalidate_where(lambda k: k == key)
+    bump_versions(("route", dep_airport_code, arr_airport_code))
+
+@cache_sync.on_change("route")
+def _evict_route(dep_airport_code, arr_airport_code):
+    # Another process changed the route; which days is not recorded
+    note_invalidated(("route", dep_airport_code, arr_airport_code))
+    search_cache.invalidate_where(lambda k: k[0] == dep_airport_code and k[1] == arr_airport_code)
+
+def invalidate_search_many(flights):
+    """Evict every cached search touched by (dep_code, arr_code, dep_datetime) triples, in one pass."""
+    keys = {(dep, arr, dep_dt.date()) for dep, arr, dep_dt in flights}
+    if keys:
+        note_invalidated(*{("route", dep, arr) for dep, arr, _day in keys})
+        search_cache.invalidate_where(lambda k: k in keys)
+        bump_versions(*{("route", dep, arr) for dep, arr, _day in keys})
+
+# Independent search legs (outbound/inbound, fare calendars) run at the
+# same time, each on its own pooled connection. A leg that is not back
+# within LEG_TIMEOUT_SECONDS is dropped so the page renders what it has.
+PARALLEL_LEG_SEARCH = True
+LEG_EXECUTOR_WORKERS = 8
+LEG_TIMEOUT_SECONDS = 3.0
+_leg_executor = None
+_leg_executor_lock = threading.Lock()
+
+def _get_leg_executor():
+    # Created on first use, so a forked worker never inherits one whose threads it doesn't have
+    global _leg_executor
+    if _leg_executor is None:
+        with _leg_executor_lock:
+            if _leg_executor is None:
+                _leg_executor = ThreadPoolExecutor(max_workers=LEG_EXECUTOR_WORKERS,
+                                                   thread_name_prefix="search-leg")
+    return _leg_executor
+
+def _run_leg(fn, args, primary_reads):
+    # Own app context -> own g -> own pooled connection, released on exit
+    with app.app_context():
+        g.sql_stats = RequestSQLStats()
+        g.db_primary_reads = primary_reads
+        return fn(*args), g.sql_stats
+
+def run_legs(calls, timeout=LEG_TIMEOUT_SECONDS):
+    """
+    Run [(fn, args), ...] concurrently and return their results in order,
+    with None for any call that timed out. Their SQL work is added to the
+    current request's stats. With PARALLEL_LEG_SEARCH off, calls run inline.
+    """
+    if not PARALLEL_LEG_SEARCH:
+        return [fn(*args) for fn, args in calls]
+
+    # Leg threads have no request, so they rely on this poll
+    sync_caches()
+
+    primary_reads = reads_use_primary()
+    futures = [_get_leg_executor().submit(_run_leg, fn, args, primary_reads) for fn, args in calls]
+    deadline = time.monotonic() + timeout
+    results = []
+    for fut in futures:
+        try:
+            value, stats = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            # keeps running in the background; its result still warms the cache
+            app.logger.warning("Search leg timed out after %.1fs", timeout)
+            results.append(None)
+            continue
+        request_stats = g.get("sql_stats")
+        if request_stats is not None:
+            request_stats.merge(stats)
+        results.append(value)
+    return results
     
 
 # Landing page: main public search view
 @app.route("/")
 @app.route("/home")
 def home():
-    airports = get_airport_codes()
     return render_template(
         "home.html",
         username=session.get("email"),
         role=session.get("role"),
-        airports=airports,
     )
 
 @app.route('/customer_home')
@@ -138,8 +1300,7 @@ def customer_home():
     if guard:
         return guard
 
-    airports = get_airport_codes()
-    return render_template('customer_home.html', airports=airports)
+    return render_template('customer_home.html')
 
 @app.route('/staff_home')
 def staff_home():
@@ -149,7 +1310,7 @@ def staff_home():
         return guard
 
     airline = session.get('airline_name')
-    c = conn.cursor()
+    c = read_conn.cursor()
     c.execute("""
         SELECT
             flight_no,
@@ -171,6 +1332,471 @@ def staff_home():
 
 
 
+# ============================== Sessions =====================================
+
+# Session data (login identity, flashes, purchase_context) lives server-side;
+# the cookie carries only a random session id. "memory" keeps sessions in a
+# per-process LRU -- fine for one process, but every worker has its own.
+# "sqlite" keeps them in a local key-value file shared by all processes on
+# the host.
+SESSION_BACKEND = "memory"
+SESSION_IDLE_TIMEOUT = 2 * 60 * 60        # seconds without a request
+SESSION_MAX_ENTRIES = 20000               # memory backend only
+SESSION_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.sqlite3")
+
+
+class MemorySessionStore:
+    """
+    In-process LRU of serialized sessions with an idle timeout. Reads
+    slide the expiry; the least recently used session is evicted once
+    max_entries is exceeded.
+    """
+
+    def __init__(self, idle_timeout, max_entries):
+        self.idle_timeout = idle_timeout
+        self.max_entries = max_entries
+        self._entries = OrderedDict()    # sid -> (payload, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[sid]
+                self.misses += 1
+                return None
+            self._entries[sid] = (entry[0], time.monotonic() + self.idle_timeout)
+            self._entries.move_to_end(sid)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, sid, payload):
+        with self._lock:
+            self._entries[sid] = (payload, time.monotonic() + self.idle_timeout)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+            }
+
+
+class SqliteSessionStore:
+    """
+    Serialized sessions in a local SQLite key-value table, shared by every
+    worker process on the host. Each thread gets its own connection; WAL
+    mode lets readers run alongside the writer. Reads slide the expiry only
+    once half the idle timeout has passed, so most reads stay read-only.
+    Expired rows are purged every PURGE_EVERY writes.
+    """
+
+    PURGE_EVERY = 500
+
+    def __init__(self, path, idle_timeout):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("""CREATE TABLE IF NOT EXISTS session
+                      (sid TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)""")
+
+    def _db(self):
+        if self._pid != os.getpid():
+            # Forked: SQLite handles must not cross processes
+            self._local = threading.local()
+            self._pid = os.getpid()
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, sid):
+        now = time.time()
+        row = self._db().execute("SELECT payload, expires_at FROM session WHERE sid = ?",
+                                 (sid,)).fetchone()
+        with self._lock:
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self.hits += 1
+        if row[1] - now < self.idle_timeout / 2:
+            self._db().execute("UPDATE session SET expires_at = ? WHERE sid = ?",
+                               (now + self.idle_timeout, sid))
+        return row[0]
+
+    def set(self, sid, payload):
+        now = time.time()
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO session (sid, payload, expires_at) VALUES (?, ?, ?)",
+                   (sid, payload, now + self.idle_timeout))
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            db.execute("DELETE FROM session WHERE expires_at <= ?", (now,))
+
+    def delete(self, sid):
+        self._db().execute("DELETE FROM session WHERE sid = ?", (sid,))
+
+    def stats(self):
+        entries = self._db().execute("SELECT COUNT(*) FROM session").fetchone()[0]
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "entries": entries,
+            }
+
+
+class ServerSideSession(SessionMixin):
+    """
+    Session whose data is fetched from the store and deserialized on first
+    access, so requests that never read the session never hit the store.
+    A cookie id the store doesn't know (expired, evicted, or never issued)
+    is dropped on load and a fresh id is issued on the next write.
+    """
+
+    def __init__(self, store, serializer, sid=None):
+        self.sid = sid
+        self._store = store
+        self._serializer = serializer
+        self._data = None if sid else {}
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            payload = self._store.get(self.sid)
+            if payload is None:
+                self.sid = None
+                self.new = True
+                self._data = {}
+            else:
+                self._data = self._serializer.loads(payload)
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def clear(self):
+        self._data = {}
+        self.accessed = self.modified = True
+
+    def regenerate(self):
+        """
+        Drop this session's data and id; the next save issues a new id.
+        Call before a login or role change so an id planted in the
+        browser beforehand (session fixation) never carries the login.
+        """
+        if self.sid is not None:
+            self._store.delete(self.sid)
+        self.sid = None
+        self.new = True
+        self.clear()
+
+    def payload(self):
+        return self._serializer.dumps(self._data)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data in a store and only the session id in the cookie."""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app)) or None
+        return ServerSideSession(self.store, self.serializer, sid)
+
+    def save_session(self, app, session, response):
+        if not session.loaded:
+            return
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.accessed:
+            response.vary.add("Cookie")
+        if not session.modified:
+            return
+
+        if not session:
+            if session.sid is not None:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       httponly=self.get_cookie_httponly(app),
+                                       samesite=self.get_cookie_samesite(app))
+            return
+
+        new_sid = session.sid is None
+        if new_sid:
+            session.sid = secrets.token_urlsafe(32)
+        self.store.set(session.sid, session.payload())
+        if new_sid or session.permanent:
+            response.set_cookie(name, session.sid,
+                                expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app),
+                                domain=domain, path=path,
+                                secure=self.get_cookie_secure(app),
+                                samesite=self.get_cookie_samesite(app))
+
+
+def make_session_store(backend=SESSION_BACKEND):
+    if backend == "memory":
+        return MemorySessionStore(SESSION_IDLE_TIMEOUT, SESSION_MAX_ENTRIES)
+    if backend == "sqlite":
+        return SqliteSessionStore(SESSION_SQLITE_PATH, SESSION_IDLE_TIMEOUT)
+    raise ValueError(f"Unknown session backend: {backend!r}")
+
+session_store = make_session_store()
+app.session_interface = ServerSideSessionInterface(session_store)
+
+def configure_sessions(backend):
+    """Switch the session backend (see SESSION_BACKEND); existing sessions are not carried over."""
+    global session_store
+    session_store = make_session_store(backend)
+    app.session_interface = ServerSideSessionInterface(session_store)
+
+
+# ========================= Conditional GET ===================================
+
+# Pages that only change when someone writes are served with a weak ETag
+# and Last-Modified built from change counters in the DataVersion table,
+# shared by every worker process and mirrored in memory by CacheSync, so
+# a browser revalidating an unchanged page gets a 304 without a query.
+# Another worker's change shows within CACHE_SYNC_INTERVAL seconds. Keys:
+#   ("route", dep, arr)    flights, statuses or seats on one route
+#   ("route_graph",)       flights that feed connecting itineraries
+#   ("airline", name)      an airline's flights, statuses or airplanes
+#   ("customer", email)    a customer's tickets
+#   ("flight_status",)     any status change
+#   ("airports",)          the airport list
+# Validators also roll over every CONDITIONAL_GET_WINDOW seconds, which
+# covers content that moves with NOW() (flights departing, holds expiring).
+CONDITIONAL_GET_WINDOW = SEARCH_CACHE_TTL
+
+# Responses larger than this are gzip- or brotli-compressed when the
+# client accepts it.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MIMETYPES = ("text/html", "application/json")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class DataVersions:
+    """
+    Change counters in the DataVersion table on the primary, each with the
+    time of its last bump, so every worker process agrees on them. A key
+    is a tuple, stored as its JSON text. bump() commits on a connection of
+    its own, so it never touches the caller's transaction. snapshot()
+    answers from the copy CacheSync keeps in memory, refreshed every
+    CACHE_SYNC_INTERVAL seconds; only a key this process has not seen yet
+    is read from the primary, once.
+    """
+
+    @staticmethod
+    def _name(key):
+        return json.dumps(list(key), separators=(",", ":"))
+
+    def bump(self, *keys):
+        if not keys:
+            return
+        names = [self._name(key) for key in keys]
+        c = db_pool.acquire()
+        try:
+            cursor = c.cursor()
+            cursor.executemany("""INSERT INTO DataVersion (version_key, counter, changed_at)
+                                  VALUES (%s, 1, NOW(6))
+                                  ON DUPLICATE KEY UPDATE counter = counter + 1, changed_at = NOW(6)""",
+                               names)
+            # Still locked by this transaction, so these are our own counters
+            cursor.execute(f"""SELECT version_key, counter, UNIX_TIMESTAMP(changed_at) AS changed_at
+                               FROM DataVersion
+                               WHERE version_key IN ({', '.join(['%s'] * len(names))})""", names)
+            versions = {r["version_key"]: (r["counter"], float(r["changed_at"]))
+                        for r in cursor.fetchall()}
+            cursor.close()
+            c.commit()
+            cache_sync.note_bumped(versions)
+        except Exception:
+            # The write itself is committed; its pages just keep their old
+            # validators until the next bump or window rollover.
+            app.logger.exception("Could not bump data versions %s", keys)
+        finally:
+            db_pool.release(c)
+
+    def snapshot(self, keys):
+        """([counter per key], latest bump time as epoch seconds) for a set of keys."""
+        names = [self._name(key) for key in keys]
+        if not names:
+            return [], 0.0
+        cache_sync.sync()
+        known = cache_sync.versions(names)
+        missing = [n for n in names if n not in known]
+        if missing:
+            # First time this process sees these keys; the polls keep them current after this
+            c = db_pool.acquire()
+            try:
+                cursor = c.cursor()
+                cursor.execute(f"""SELECT version_key, counter, UNIX_TIMESTAMP(changed_at) AS changed_at
+                                   FROM DataVersion
+                                   WHERE version_key IN ({', '.join(['%s'] * len(missing))})""",
+                               missing)
+                found = {r["version_key"]: (r["counter"], float(r["changed_at"]))
+                         for r in cursor.fetchall()}
+                cursor.close()
+            finally:
+                db_pool.release(c)
+            cache_sync.learn({n: found.get(n, (0, 0.0)) for n in missing})
+            known = cache_sync.versions(names)
+        return ([known[n][0] for n in names],
+                max(known[n][1] for n in names))
+
+
+data_versions = DataVersions()
+
+def bump_versions(*keys):
+    """Call after committing a write that changes what the keyed pages show."""
+    data_versions.bump(*keys)
+
+def _templates_stamp():
+    # Same for every worker of one deploy, different after a code or template change
+    paths = [os.path.abspath(__file__)]
+    for root, _dirs, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        paths.extend(os.path.join(root, f) for f in files)
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0)
+
+_ETAG_SALT = str(_templates_stamp())
+
+def conditional_get(version_keys):
+    """
+    Serve the view with validators derived from version_keys(), a function
+    of the request returning the data-version keys the page depends on (or
+    None to skip, e.g. when the user isn't signed in). A matching
+    If-None-Match / If-Modified-Since is answered with a 304 without
+    calling the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = version_keys()
+            # Pending flashes are rendered (and consumed) by the page itself
+            if keys is None or session.get("_flashes"):
+                return view(*args, **kwargs)
+
+            window = int(time.time() // CONDITIONAL_GET_WINDOW)
+            counters, changed_at = data_versions.snapshot(keys)
+            identity = (session.get("role"), session.get("email"), session.get("airline_name"))
+            etag = hashlib.sha1(json.dumps(
+                [_ETAG_SALT, request.full_path, identity, keys, counters, window], default=str
+            ).encode()).hexdigest()[:20]
+            last_modified = datetime.fromtimestamp(
+                max(changed_at, window * CONDITIONAL_GET_WINDOW), timezone.utc).replace(microsecond=0)
+
+            not_modified = (request.if_none_match.contains_weak(etag) if request.if_none_match
+                            else request.if_modified_since is not None
+                            and last_modified <= request.if_modified_since)
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add("Cookie")
+            return response
+        return wrapper
+    return decorator
+
+@app.after_request
+def _compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+# version_keys functions for conditional_get
+def _search_page_versions():
+    source = resolve_airport(request.args.get('source', ''))
+    destination = resolve_airport(request.args.get('destination', ''))
+    return [("route", source, destination), ("route", destination, source),
+            ("route_graph",)]
+
+def _customer_flights_versions():
+    if session.get("role") != "customer" or not session.get("email"):
+        return None
+    return [("customer", session["email"]), ("flight_status",)]
+
+def _staff_airline_versions():
+    if session.get('role') != 'staff' or not session.get('airline_name'):
+        return None
+    return [("airline", session['airline_name'])]
+
+
 # =========================== Authentication ================================
 
 #Define route for login
@@ -181,15 +1807,7 @@ def login():
 #Define route for register
 @app.route('/register')
 def register():
-    cursor = conn.cursor()
-    cursor.execute("SELECT airline_name FROM Airline ORDER BY airline_name")
-
-    airlines = []
-    rows = cursor.fetchall()
-    for row in rows:
-        airlines.append(row["airline_name"])
-
-    cursor.close()
+    airlines = get_airline_names()
     return render_template('register.html', airlines=airlines)
 
 #Authenticates the login
@@ -228,7 +1846,8 @@ def loginAuth():
     error = None
 
     if (data):
-        # creates a session for the user
+        # creates a session for the user, under a fresh session id
+        session.regenerate()
         session['email'] = email                
         session['role'] = data['role']   # 'customer' or 'staff'
         session['display_name'] = data.get('display_name')
@@ -546,16 +2165,771 @@ def registerAuth():
     return redirect(url_for('login'))
 
 
+# ======================= Connecting-Flight Search ============================
+
+# Layover rules and search limits for 1- and 2-stop itineraries
+CONNECTION_MIN_MINUTES = 45
+CONNECTION_MAX_MINUTES = 8 * 60
+CONNECTION_MAX_STOPS = 2
+CONNECTION_TOP_K = 10
+# Stop expanding once a search has used this much wall time
+CONNECTION_SEARCH_BUDGET_MS = 150
+# The route graph covers flights departing within this many days from now
+CONNECTION_GRAPH_DAYS = 60
+
+Leg = namedtuple("Leg", "flight_no airline_name dep_airport_code arr_airport_code "
+                        "dep_local arr_local dep_utc arr_utc base_price")
+
+
+class RouteGraph:
+    """
+    Upcoming flights indexed by departure airport, each list sorted by UTC
+    departure time, so the onward flights that fit a layover window are a
+    bisect away instead of a query.
+    """
+
+    def __init__(self, rows):
+        by_airport = defaultdict(list)
+        for r in rows:
+            dep, arr = r['dep_airport_code'], r['arr_airport_code']
+            by_airport[dep].append(Leg(
+                r['flight_no'], r['airline_name'], dep, arr,
+                r['dep_datetime'], r['arr_datetime'],
+                r['dep_utc'].replace(tzinfo=timezone.utc),
+                r['arr_utc'].replace(tzinfo=timezone.utc),
+                float(r['base_price']),
+            ))
+        self.departures = {}
+        self._dep_times = {}
+        for code, legs in by_airport.items():
+            legs.sort(key=lambda l: l.dep_utc)
+            self.departures[code] = legs
+            self._dep_times[code] = [l.dep_utc for l in legs]
+
+    def departing(self, airport, start_utc, end_utc):
+        """Legs leaving `airport` with start_utc <= dep_utc < end_utc."""
+        times = self._dep_times.get(airport)
+        if not times:
+            return []
+        lo = bisect_left(times, start_utc)
+        hi = bisect_left(times, end_utc, lo)
+        return self.departures[airport][lo:hi]
+
+    def itineraries(self, source, destination, day, sort="duration",
+                    top_k=CONNECTION_TOP_K, max_stops=CONNECTION_MAX_STOPS,
+                    budget_ms=CONNECTION_SEARCH_BUDGET_MS):
+        """
+        Best connecting itineraries (1..max_stops stops) from source to
+        destination whose first leg departs on local `day` at the source.
+        Returns (itineraries, complete) where complete is False if the
+        latency budget cut the search short.
+        """
+        deadline = time.monotonic() + budget_ms / 1000.0
+        min_conn = timedelta(minutes=CONNECTION_MIN_MINUTES)
+        max_conn = timedelta(minutes=CONNECTION_MAX_MINUTES)
+        src_tz = _airport_tz(source)
+        day_start, day_end = _day_range(day)
+        first_legs = self.departing(source,
+                                    day_start.replace(tzinfo=src_tz).astimezone(timezone.utc),
+                                    day_end.replace(tzinfo=src_tz).astimezone(timezone.utc))
+
+        def score(legs):
+            if sort == "price":
+                return sum(l.base_price for l in legs)
+            return (legs[-1].arr_utc - legs[0].dep_utc).total_seconds()
+
+        # max-heap (negated score) holding the current best top_k
+        best = []
+        counter = 0
+        complete = True
+
+        def expand(path, visited):
+            nonlocal counter, complete
+            if time.monotonic() > deadline:
+                complete = False
+                return
+            last = path[-1]
+            # prune: this path already scores worse than everything kept
+            if len(best) == top_k and score(path) >= -best[0][0]:
+                return
+            for leg in self.departing(last.arr_airport_code,
+                                      last.arr_utc + min_conn, last.arr_utc + max_conn):
+                if leg.arr_airport_code in visited:
+                    continue
+                nxt = path + [leg]
+                if leg.arr_airport_code == destination:
+                    s = score(nxt)
+                    counter += 1
+                    if len(best) < top_k:
+                        heappush(best, (-s, counter, nxt))
+                    elif s < -best[0][0]:
+                        heapreplace(best, (-s, counter, nxt))
+                elif len(nxt) <= max_stops:
+                    expand(nxt, visited | {leg.arr_airport_code})
+
+        for leg in first_legs:
+            if leg.arr_airport_code == destination:
+                continue   # direct flights come from FLIGHT_SEARCH_SQL
+            expand([leg], {source, leg.arr_airport_code})
+            if not complete:
+                break
+
+        ranked = sorted(best, key=lambda e: (-e[0], e[1]))
+        return [_itinerary_row(legs) for _, _, legs in ranked], complete
+
+
+def _itinerary_row(legs):
+    """Shape an itinerary like a search_flights row so templates can show it."""
+    first, last = legs[0], legs[-1]
+    total_minutes = int((last.arr_utc - first.dep_utc).total_seconds() // 60)
+    via = ", ".join(l.arr_airport_code for l in legs[:-1])
+    stops = len(legs) - 1
+    return {
+        "flight_no": " + ".join(l.flight_no for l in legs),
+        "airline_name": first.airline_name,
+        "dep_airport_code": first.dep_airport_code,
+        "arr_airport_code": last.arr_airport_code,
+        "d_date": _fmt_date(first.dep_local),
+        "d_time": _fmt_time(first.dep_local),
+        "a_date": _fmt_date(last.arr_local),
+        "a_time": _fmt_time(last.arr_local),
+        "flight_duration": _fmt_minutes(total_minutes),
+        "duration_minutes": total_minutes,
+        "base_price": sum(l.base_price for l in legs),
+        "stops_text": f"{stops} stop{'s' if stops > 1 else ''} via {via}",
+        "legs": [
+            {
+                "flight_no": l.flight_no,
+                "airline_name": l.airline_name,
+                "dep_airport_code": l.dep_airport_code,
+                "arr_airport_code": l.arr_airport_code,
+                "d_date": _fmt_date(l.dep_local),
+                "d_time": _fmt_time(l.dep_local),
+                "a_date": _fmt_date(l.arr_local),
+                "a_time": _fmt_time(l.arr_local),
+                "base_price": l.base_price,
+            }
+            for l in legs
+        ],
+    }
+
+
+def _load_route_graph():
+    cursor = fill_conn(("route_graph",)).cursor()
+    cursor.execute("""SELECT flight_no, airline_name, dep_airport_code, arr_airport_code,
+                             dep_datetime, arr_datetime, dep_utc, arr_utc, base_price
+                      FROM Flight
+                      WHERE dep_datetime > NOW()
+                        AND dep_datetime < DATE_ADD(NOW(), INTERVAL %s DAY)""",
+                   (CONNECTION_GRAPH_DAYS,))
+    rows = cursor.fetchall()
+    cursor.close()
+    return RouteGraph(rows)
+
+reference_cache.register("route_graph", _load_route_graph)
+
+@on_warmup
+def _warm_reference_data():
+    get_airport_codes()
+    reference_cache.get("airport_index")
+    get_airline_names()
+    reference_cache.get("route_graph")
+
+@cache_sync.on_change("route_graph")
+def _evict_route_graph():
+    note_invalidated(("route_graph",))
+    reference_cache.invalidate("route_graph")
+
+def invalidate_route_graph():
+    _evict_route_graph()
+    bump_versions(("route_graph",))
+
+def find_connections(source, destination, day, sort="duration"):
+    """Top connecting itineraries for one search leg (see RouteGraph.itineraries)."""
+    if sort not in ("duration", "price"):
+        sort = "duration"
+    sync_caches()
+    graph = reference_cache.get("route_graph")
+    itineraries, _complete = graph.itineraries(source, destination, day, sort=sort)
+    return itineraries
+
+
+# ============================ Fare Calendar ==================================
+
+# Largest +/- window (in days) a fare calendar may cover
+FARE_CALENDAR_MAX_DAYS = 7
+FARE_CALENDAR_TTL = 120
+fare_calendar_cache = ResultCache(FARE_CALENDAR_TTL, max_entries=2048)
+
+def get_fare_calendar(source, destination, center, days):
+    """
+    Cheapest base_price and flight count for each day in
+    [center - days, center + days] on one route, from a single grouped
+    range query over idx_flight_route_dep. Days without flights are
+    included with price None so the calendar has no gaps.
+    """
+    days = max(0, min(days, FARE_CALENDAR_MAX_DAYS))
+    key = (source, destination, center, days)
+    sync_caches()
+    cached = fare_calendar_cache.get(key)
+    if cached is not None:
+        return cached
+
+    first, last = center - timedelta(days=days), center + timedelta(days=days)
+    cursor = fill_conn(("route", source, destination)).cursor()
+    cursor.execute("""SELECT DATE(dep_datetime) AS day,
+                             MIN(base_price) AS min_price,
+                             COUNT(*) AS num_flights
+                      FROM Flight
+                      WHERE dep_airport_code = %s AND arr_airport_code = %s
+                        AND dep_datetime >= %s AND dep_datetime < %s
+                        AND dep_datetime > NOW()
+                      GROUP BY day""",
+                   (source, destination, *_day_range(first, last)))
+    by_day = {r['day']: r for r in cursor.fetchall()}
+    cursor.close()
+
+    calendar = []
+    for offset in range(-days, days + 1):
+        day = center + timedelta(days=offset)
+        r = by_day.get(day)
+        calendar.append({
+            "date": day.isoformat(),
+            "min_price": float(r['min_price']) if r else None,
+            "num_flights": r['num_flights'] if r else 0,
+        })
+    fare_calendar_cache.put(key, calendar)
+    return calendar
+
+@cache_sync.on_change("route")
+def _evict_fare_calendar(source, destination):
+    note_invalidated(("route", source, destination))
+    fare_calendar_cache.invalidate_where(lambda k: k[0] == source and k[1] == destination)
+
+def invalidate_fare_calendar(source, destination):
+    _evict_fare_calendar(source, destination)
+    bump_versions(("route", source, destination))
+
+
+# ============================ Seat Inventory =================================
+
+# Recompute FlightInventory rows from Airplane.seat_capacity, Ticket and
+# SeatHold. Restrict to one flight by filling {where}.
+_RECONCILE_INVENTORY_SQL = """
+    INSERT INTO FlightInventory
+        (flight_no, dep_datetime, airline_name, seat_capacity, seats_sold, seats_held)
+    SELECT f.flight_no, f.dep_datetime, f.airline_name, a.seat_capacity,
+           COUNT(t.ticket_id),
+           (SELECT COUNT(*) FROM SeatHold h
+            WHERE h.flight_no = f.flight_no AND h.dep_datetime = f.dep_datetime
+              AND h.airline_name = f.airline_name)
+    FROM Flight f
+    JOIN Airplane a
+      ON a.airplane_id = f.airplane_id
+     AND a.airline_name = f.airline_name
+    LEFT JOIN Ticket t
+      ON t.flight_no = f.flight_no
+     AND t.dep_datetime = f.dep_datetime
+     AND t.airline_name = f.airline_name
+    {where}
+    GROUP BY f.flight_no, f.dep_datetime, f.airline_name, a.seat_capacity
+    ON DUPLICATE KEY UPDATE seat_capacity = VALUES(seat_capacity),
+                            seats_sold = VALUES(seats_sold),
+                            seats_held = VALUES(seats_held)
+"""
+
+def reconcile_seat_inventory(cursor, flight_no=None, dep_datetime=None, airline_name=None):
+    """
+    Rebuild seat counters from Ticket and SeatHold -- for every flight, or for one
+    flight when its key is given. Returns the affected-row count.
+    The caller owns the transaction.
+    """
+    if flight_no is None:
+        return cursor.execute(_RECONCILE_INVENTORY_SQL.format(where=""))
+    return cursor.execute(
+        _RECONCILE_INVENTORY_SQL.format(
+            where="WHERE f.flight_no = %s AND f.dep_datetime = %s AND f.airline_name = %s"),
+        (flight_no, dep_datetime, airline_name))
+
+def purchase_ticket(cursor, flight_no, dep_datetime, airline_name, email,
+                    card_type, card_num, card_name, exp_date):
+    """
+    Buy one seat through the purchase_ticket procedure: duplicate check,
+    capacity check, seat decrement, Ticket insert and sales rollup in one
+    round trip, serialized on the flight's FlightInventory row. Nothing is
+    committed; the seat stays held until the caller commits or rolls back.
+    Returns the procedure's row: outcome ('ok', 'departed', 'duplicate',
+    'sold_out', 'no_inventory') plus the route codes when 'ok'.
+    """
+    args = (flight_no, dep_datetime, airline_name, email, card_type, card_num, card_name, exp_date)
+    cursor.execute("CALL purchase_ticket(%s, %s, %s, %s, %s, %s, %s, %s)", args)
+    row = cursor.fetchone()
+    if row["outcome"] == "no_inventory":
+        # Flight created outside the app: build its counter from Ticket once and retry
+        reconcile_seat_inventory(cursor, flight_no, dep_datetime, airline_name)
+        cursor.execute("CALL purchase_ticket(%s, %s, %s, %s, %s, %s, %s, %s)", args)
+        row = cursor.fetchone()
+    cursor.nextset()
+    return row
+
+
+# Seat holds: rendering the purchase review reserves the seat for
+# SEAT_HOLD_TTL_SECONDS. A hold is one SeatHold row plus one unit of
+# FlightInventory.seats_held, so capacity checks stay a single-row
+# compare however many holds a flight has. purchase_ticket consumes the
+# buyer's hold; release_expired_holds returns the rest.
+SEAT_HOLD_TTL_SECONDS = 600
+SEAT_HOLD_SWEEP_SECONDS = 30
+SEAT_HOLD_SWEEP_BATCH = 500     # flights per sweep transaction
+
+def place_seat_hold(cursor, flight_no, dep_datetime, airline_name, email):
+    """
+    Hold one seat for this customer, or extend the hold they already
+    have. Call in its own transaction and commit straight after.
+    Returns False when the flight has no free seat.
+    """
+    key = (flight_no, dep_datetime, airline_name)
+    # Counter row first, as in release_seat_holds and the sweeper, so the
+    # FlightInventory -> SeatHold lock order never inverts
+    cursor.execute("""SELECT 1 FROM FlightInventory
+                      WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                      FOR UPDATE""", key)
+    if not cursor.fetchone():
+        # No counter row yet (flight created outside the app)
+        reconcile_seat_inventory(cursor, *key)
+
+    if cursor.execute("""UPDATE SeatHold SET expires_at = NOW() + INTERVAL %s SECOND
+                         WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                           AND customer_email = %s""",
+                      (SEAT_HOLD_TTL_SECONDS, *key, email)):
+        return True
+
+    if not cursor.execute("""UPDATE FlightInventory
+                             SET seats_held = seats_held + 1
+                             WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                               AND seats_sold + seats_held < seat_capacity""", key):
+        return False
+    try:
+        cursor.execute("""INSERT INTO SeatHold
+                            (flight_no, dep_datetime, airline_name, customer_email, expires_at)
+                          VALUES (%s, %s, %s, %s, NOW() + INTERVAL %s SECOND)""",
+                       (*key, email, SEAT_HOLD_TTL_SECONDS))
+    except pymysql.IntegrityError:
+        # A concurrent request from the same customer created the hold first
+        cursor.execute("""UPDATE FlightInventory SET seats_held = seats_held - 1
+                          WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s""", key)
+    return True
+
+def release_seat_holds(cursor, email, keys):
+    """Give back this customer's holds on the given flight keys (e.g. an abandoned review)."""
+    for key in keys:
+        # counter row first, as everywhere else, so lock order never inverts
+        cursor.execute("""SELECT 1 FROM FlightInventory
+                          WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                          FOR UPDATE""", key)
+        if cursor.execute("""DELETE FROM SeatHold
+                             WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                               AND customer_email = %s""", (*key, email)):
+            cursor.execute("""UPDATE FlightInventory SET seats_held = seats_held - 1
+                              WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s""", key)
+
+def release_expired_holds(cursor, batch=SEAT_HOLD_SWEEP_BATCH):
+    """
+    Release expired holds for up to `batch` flights: lock their counter
+    rows, count and delete the expired holds with locking reads, and take
+    the counts off seats_held -- a fixed number of statements per batch.
+    Returns the number of holds released; the caller commits and calls
+    again while it returns non-zero.
+    """
+    cursor.execute("SELECT NOW() AS now")
+    cutoff = cursor.fetchone()["now"]
+    cursor.execute("""SELECT DISTINCT flight_no, dep_datetime, airline_name
+                      FROM SeatHold WHERE expires_at <= %s LIMIT %s""", (cutoff, batch))
+    keys = [(r["flight_no"], r["dep_datetime"], r["airline_name"]) for r in cursor.fetchall()]
+    if not keys:
+        return 0
+    in_keys = "(flight_no, dep_datetime, airline_name) IN (" + ",".join(["(%s,%s,%s)"] * len(keys)) + ")"
+    params = [v for key in keys for v in key]
+
+    cursor.execute(f"SELECT 1 FROM FlightInventory WHERE {in_keys} FOR UPDATE", params)
+    cursor.execute(f"""SELECT flight_no, dep_datetime, airline_name, COUNT(*) AS n
+                       FROM SeatHold WHERE {in_keys} AND expires_at <= %s
+                       GROUP BY flight_no, dep_datetime, airline_name
+                       FOR UPDATE""", params + [cutoff])
+    counts = cursor.fetchall()
+    if not counts:
+        return 0
+    cursor.execute(f"DELETE FROM SeatHold WHERE {in_keys} AND expires_at <= %s", params + [cutoff])
+    released = " UNION ALL ".join(
+        ["SELECT %s AS flight_no, %s AS dep_datetime, %s AS airline_name, %s AS n"] * len(counts))
+    cursor.execute(f"""UPDATE FlightInventory i
+                       JOIN ({released}) h
+                         ON h.flight_no = i.flight_no AND h.dep_datetime = i.dep_datetime
+                        AND h.airline_name = i.airline_name
+                       SET i.seats_held = GREATEST(i.seats_held - h.n, 0)""",
+                   [v for r in counts for v in (r["flight_no"], r["dep_datetime"], r["airline_name"], r["n"])])
+    return sum(r["n"] for r in counts)
+
+def sweep_expired_holds():
+    """Run release_expired_holds batch by batch until nothing has expired."""
+    total = 0
+    c = conn.cursor()
+    try:
+        while True:
+            n = release_expired_holds(c)
+            conn.commit()
+            if not n:
+                return total
+            total += n
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        c.close()
+
+_hold_sweeper = None
+_hold_sweeper_lock = threading.Lock()
+
+def _hold_sweeper_loop():
+    while True:
+        time.sleep(SEAT_HOLD_SWEEP_SECONDS)
+        try:
+            with app.app_context():
+                sweep_expired_holds()
+        except Exception:
+            app.logger.exception("Seat hold sweep failed")
+
+def ensure_hold_sweeper():
+    """Start this process's background sweeper thread (once, on first hold)."""
+    global _hold_sweeper
+    if _hold_sweeper is None:
+        with _hold_sweeper_lock:
+            if _hold_sweeper is None:
+                _hold_sweeper = threading.Thread(target=_hold_sweeper_loop, name="seat-hold-sweeper",
+                                                 daemon=True)
+                _hold_sweeper.start()
+
+
+# ============================= Sales Rollups ==================================
+
+# SalesDaily holds one row per (airline, sale day, route). Every sale bumps
+# its row in the purchase transaction (inside the purchase_ticket
+# procedure), so staff_reports reads at most days x routes rows instead
+# of scanning Ticket.
+
+_REBUILD_SALES_SQL = """
+    INSERT INTO SalesDaily
+        (airline_name, sale_date, dep_airport_code, arr_airport_code, tickets, revenue)
+    SELECT t.airline_name, DATE(t.purchase_datetime), f.dep_airport_code,
+           f.arr_airport_code, COUNT(*), SUM(f.base_price)
+    FROM Ticket t
+    JOIN Flight f
+      ON f.flight_no = t.flight_no
+     AND f.dep_datetime = t.dep_datetime
+     AND f.airline_name = t.airline_name
+    {where}
+    GROUP BY t.airline_name, DATE(t.purchase_datetime),
+             f.dep_airport_code, f.arr_airport_code
+"""
+
+def rebuild_sales_rollups(cursor, airline_name=None):
+    """
+    Recompute SalesDaily from Ticket -- for every airline, or just one.
+    Returns the number of rollup rows written. The caller owns the
+    transaction.
+    """
+    if airline_name is None:
+        cursor.execute("DELETE FROM SalesDaily")
+        return cursor.execute(_REBUILD_SALES_SQL.format(where=""))
+    cursor.execute("DELETE FROM SalesDaily WHERE airline_name = %s", (airline_name,))
+    return cursor.execute(_REBUILD_SALES_SQL.format(where="WHERE t.airline_name = %s"),
+                          (airline_name,))
+
+
+# =========================== Rating Aggregates ================================
+
+# Running rating sums/counts: FlightRatingStats per flight, RouteRatingStats
+# per airline route (airline totals are the sum of its route rows). Both
+# are bumped in the same transaction as the FlightRating insert.
+_RECORD_FLIGHT_RATING_SQL = """
+    INSERT INTO FlightRatingStats
+        (flight_no, dep_datetime, airline_name, rating_sum, rating_count)
+    VALUES (%s, %s, %s, %s, 1)
+    ON DUPLICATE KEY UPDATE rating_sum = rating_sum + VALUES(rating_sum),
+                            rating_count = rating_count + 1
+"""
+
+_RECORD_ROUTE_RATING_SQL = """
+    INSERT INTO RouteRatingStats
+        (airline_name, dep_airport_code, arr_airport_code, rating_sum, rating_count)
+    VALUES (%s, %s, %s, %s, 1)
+    ON DUPLICATE KEY UPDATE rating_sum = rating_sum + VALUES(rating_sum),
+                            rating_count = rating_count + 1
+"""
+
+_REBUILD_FLIGHT_RATINGS_SQL = """
+    INSERT INTO FlightRatingStats
+        (flight_no, dep_datetime, airline_name, rating_sum, rating_count)
+    SELECT flight_no, dep_datetime, airline_name, SUM(rating), COUNT(*)
+    FROM FlightRating
+    {where}
+    GROUP BY flight_no, dep_datetime, airline_name
+"""
+
+_REBUILD_ROUTE_RATINGS_SQL = """
+    INSERT INTO RouteRatingStats
+        (airline_name, dep_airport_code, arr_airport_code, rating_sum, rating_count)
+    SELECT f.airline_name, f.dep_airport_code, f.arr_airport_code,
+           SUM(s.rating_sum), SUM(s.rating_count)
+    FROM FlightRatingStats s
+    JOIN Flight f
+      ON f.flight_no = s.flight_no
+     AND f.dep_datetime = s.dep_datetime
+     AND f.airline_name = s.airline_name
+    {where}
+    GROUP BY f.airline_name, f.dep_airport_code, f.arr_airport_code
+"""
+
+def record_rating(cursor, flight_no, dep_datetime, airline_name, dep_code, arr_code, rating):
+    """Add one rating to the flight and route aggregates. Runs inside the rating transaction."""
+    cursor.execute(_RECORD_FLIGHT_RATING_SQL, (flight_no, dep_datetime, airline_name, rating))
+    cursor.execute(_RECORD_ROUTE_RATING_SQL, (airline_name, dep_code, arr_code, rating))
+
+def rebuild_rating_aggregates(cursor, airline_name=None):
+    """
+    Recompute FlightRatingStats and RouteRatingStats from FlightRating --
+    for every airline, or just one. Returns the number of flight rows
+    written. The caller owns the transaction.
+    """
+    if airline_name is None:
+        cursor.execute("DELETE FROM FlightRatingStats")
+        cursor.execute("DELETE FROM RouteRatingStats")
+        rows = cursor.execute(_REBUILD_FLIGHT_RATINGS_SQL.format(where=""))
+        cursor.execute(_REBUILD_ROUTE_RATINGS_SQL.format(where=""))
+        return rows
+    params = (airline_name,)
+    cursor.execute("DELETE FROM FlightRatingStats WHERE airline_name = %s", params)
+    cursor.execute("DELETE FROM RouteRatingStats WHERE airline_name = %s", params)
+    rows = cursor.execute(_REBUILD_FLIGHT_RATINGS_SQL.format(where="WHERE airline_name = %s"), params)
+    cursor.execute(_REBUILD_ROUTE_RATINGS_SQL.format(where="WHERE s.airline_name = %s"), params)
+    return rows
+
+
+# ========================== Bulk Flight Import ===============================
+
+# Staff can load a whole schedule at once, from CSV or a weekly recurrence.
+# Every row is validated in memory against one snapshot of the airline's
+# planes, the airport list and the existing departures in the covered
+# window; valid rows are then written IMPORT_CHUNK_SIZE at a time with
+# multi-row INSERTs, one transaction per chunk.
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ROWS = 20000
+IMPORT_COLUMNS = ("flight_no", "airplane_id", "dep_airport_code", "arr_airport_code",
+                  "dep_datetime", "arr_datetime", "base_price")
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+ImportRow = namedtuple("ImportRow", "line flight_no airplane_id dep arr dep_dt arr_dt price seats "
+                                    "dep_utc arr_utc duration")
+
+def _import_datetime(raw):
+    raw = (raw or "").strip()
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M"):
+        try:
+            return datetime.strptime(raw, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"bad date/time '{raw}' (use YYYY-MM-DD HH:MM)")
+
+def parse_flight_csv(text):
+    """
+    Parse CSV text with an IMPORT_COLUMNS header into raw row dicts.
+    Returns (rows, errors); each row carries its 1-based line number.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [col for col in IMPORT_COLUMNS if col not in (reader.fieldnames or ())]
+    if missing:
+        return [], [(1, "Missing column(s): " + ", ".join(missing))]
+    rows = []
+    for rec in reader:
+        rows.append(dict(rec, line=reader.line_num))
+        if len(rows) > IMPORT_MAX_ROWS:
+            return [], [(reader.line_num, f"More than {IMPORT_MAX_ROWS} rows; split the file.")]
+    return rows, []
+
+def expand_recurrence(flight_no, airplane_id, dep, arr, dep_time, arr_time,
+                      arr_day_offset, first_day, last_day, weekdays, price):
+    """
+    One raw row per matching day in [first_day, last_day]: the same flight
+    leaving at dep_time and landing arr_day_offset days later at arr_time.
+    weekdays is a set of 0 (Monday) .. 6 (Sunday).
+    """
+    rows = []
+    day = first_day
+    while day <= last_day and len(rows) <= IMPORT_MAX_ROWS:
+        if day.weekday() in weekdays:
+            arr_day = day + timedelta(days=arr_day_offset)
+            rows.append({
+                "line": len(rows) + 1, "flight_no": flight_no, "airplane_id": airplane_id,
+                "dep_airport_code": dep, "arr_airport_code": arr,
+                "dep_datetime": f"{day:%Y-%m-%d} {dep_time}",
+                "arr_datetime": f"{arr_day:%Y-%m-%d} {arr_time}",
+                "base_price": price,
+            })
+        day += timedelta(days=1)
+    return rows
+
+def validate_flight_rows(cursor, airline_name, raw_rows):
+    """
+    Check every row -- field formats, airport codes, plane ownership, time
+    order, and primary-key / uq_plane_depart clashes with each other and
+    with flights already stored. Three queries regardless of row count.
+    Returns (valid ImportRows, [(line, message), ...]).
+    """
+    airports = set(get_airport_codes())
+    cursor.execute("SELECT airplane_id, seat_capacity FROM airplane WHERE airline_name=%s",
+                   (airline_name,))
+    planes = {r['airplane_id']: r['seat_capacity'] for r in cursor.fetchall()}
+
+    parsed, errors = [], []
+    for raw in raw_rows:
+        line = raw['line']
+        fno = (raw.get('flight_no') or '').strip().upper()
+        plane = (raw.get('airplane_id') or '').strip()
+        dep = (raw.get('dep_airport_code') or '').strip().upper()
+        arr = (raw.get('arr_airport_code') or '').strip().upper()
+        try:
+            dep_dt = _import_datetime(raw.get('dep_datetime'))
+            arr_dt = _import_datetime(raw.get('arr_datetime'))
+        except ValueError as e:
+            errors.append((line, str(e))); continue
+        try:
+            price = Decimal((raw.get('base_price') or '').strip())
+        except InvalidOperation:
+            errors.append((line, f"bad base_price '{raw.get('base_price')}'")); continue
+
+        if not fno or len(fno) > 10:
+            errors.append((line, "flight_no must be 1-10 characters."))
+        elif plane not in planes:
+            errors.append((line, f"Airplane {plane or '(blank)'} not owned by your airline."))
+        elif dep not in airports or arr not in airports:
+            errors.append((line, f"Unknown airport code {dep if dep not in airports else arr}."))
+        elif dep == arr:
+            errors.append((line, "Departure and arrival airports must differ."))
+        elif arr_dt <= dep_dt:
+            errors.append((line, "Arrival time must be after departure time."))
+        elif not price.is_finite() or price < 0:
+            errors.append((line, "base_price must be 0 or more."))
+        else:
+            utc = flight_utc_times(dep_dt, arr_dt, _airport_tz(dep), _airport_tz(arr))
+            if utc[2] <= 0:
+                errors.append((line, "Arrival time must be after departure time "
+                                     "(in the airports' local times)."))
+                continue
+            parsed.append(ImportRow(line, fno, plane, dep, arr, dep_dt, arr_dt, price,
+                                    planes[plane], *utc))
+    if not parsed:
+        return [], errors
+
+    # Existing departures in the covered window (idx_flight_airline_dep)
+    cursor.execute("""SELECT flight_no, airplane_id, dep_datetime FROM Flight
+                      WHERE airline_name=%s AND dep_datetime >= %s AND dep_datetime <= %s""",
+                   (airline_name, min(r.dep_dt for r in parsed), max(r.dep_dt for r in parsed)))
+    taken_keys, taken_slots = set(), set()
+    for r in cursor.fetchall():
+        taken_keys.add((r['flight_no'], r['dep_datetime']))
+        taken_slots.add((r['airplane_id'], r['dep_datetime']))
+
+    valid = []
+    for r in parsed:
+        if (r.flight_no, r.dep_dt) in taken_keys:
+            errors.append((r.line, f"Flight {r.flight_no} already departs at {r.dep_dt}."))
+        elif (r.airplane_id, r.dep_dt) in taken_slots:
+            errors.append((r.line, f"Airplane {r.airplane_id} already departs at {r.dep_dt}."))
+        else:
+            taken_keys.add((r.flight_no, r.dep_dt))
+            taken_slots.add((r.airplane_id, r.dep_dt))
+            valid.append(r)
+    errors.sort()
+    return valid, errors
+
+def insert_flight_rows(airline_name, rows):
+    """
+    Write validated rows (and their seat counters) in chunked transactions.
+    A chunk that fails -- e.g. a concurrent insert took a slot -- is rolled
+    back and reported; the others are kept. Returns (inserted, errors).
+    """
+    inserted, errors = 0, []
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+            chunk = rows[start:start + IMPORT_CHUNK_SIZE]
+            try:
+                # executemany folds these into multi-row INSERT statements (only
+                # while VALUES holds nothing but placeholders)
+                cursor.executemany("""
+                  INSERT INTO flight
+                    (flight_no,dep_datetime,airline_name,airplane_id,
+                     dep_airport_code,arr_airport_code,arr_datetime,status,base_price,
+                     dep_utc,arr_utc,duration_minutes)
+                  VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                """, [(r.flight_no, r.dep_dt, airline_name, r.airplane_id,
+                       r.dep, r.arr, r.arr_dt, 'on-time', r.price,
+                       r.dep_utc, r.arr_utc, r.duration) for r in chunk])
+                cursor.executemany("""
+                  INSERT INTO FlightInventory
+                    (flight_no, dep_datetime, airline_name, seat_capacity, seats_sold)
+                  VALUES (%s,%s,%s,%s,%s)
+                """, [(r.flight_no, r.dep_dt, airline_name, r.seats, 0) for r in chunk])
+                conn.commit()
+                inserted += len(chunk)
+            except pymysql.MySQLError as e:
+                conn.rollback()
+                errors.append((chunk[0].line,
+                               f"Rows {chunk[0].line}-{chunk[-1].line} not imported: {e.args[-1]}"))
+    finally:
+        cursor.close()
+    return inserted, errors
+
+def import_flights(airline_name, raw_rows, dry_run=False):
+    """
+    Validate raw rows and, when every row is valid and dry_run is False,
+    insert them. Returns a summary dict for the import page.
+    """
+    cursor = conn.cursor()
+    try:
+        valid, errors = validate_flight_rows(cursor, airline_name, raw_rows)
+    finally:
+        cursor.close()
+    result = {"rows": len(raw_rows), "valid": len(valid), "inserted": 0,
+              "errors": errors, "dry_run": dry_run}
+    if errors or dry_run or not valid:
+        return result
+
+    result["inserted"], result["errors"] = insert_flight_rows(airline_name, valid)
+    if result["inserted"]:
+        bump_versions(("airline", airline_name))
+        invalidate_route_graph()
+        for dep, arr in {(r.dep, r.arr) for r in valid}:
+            invalidate_fare_calendar(dep, arr)
+        invalidate_search_many((r.dep, r.arr, r.dep_dt) for r in valid)
+    return result
+
+
 # =========================== Customer Features ================================
 
 @app.route('/search_flights', methods=['GET'])
+@conditional_get(_search_page_versions)
 def search_flights():
     # Grabs information from the forms
     trip_type = request.args.get('trip', 'oneway')
-    source = request.args.get('source', '').strip().upper()
-    destination = request.args.get('destination', '').strip().upper()
+    source_text = request.args.get('source', '').strip()
+    destination_text = request.args.get('destination', '').strip()
     depart_date = request.args.get('depart_date')
     return_date = request.args.get('return_date')
+    # connecting itineraries are ranked by 'duration' (default) or 'price'
+    connections_sort = request.args.get('sort', 'duration')
+    # optional fare calendar: cheapest fare per day within +/- flex_days
+    flex_days = request.args.get('flex_days', default=0, type=int)
 
     # If a customer is logged in, keep them on their dashboard template
     # otherwise use the public home page template.
@@ -565,90 +2939,85 @@ def search_flights():
         template = 'home.html'      
 
     # basic validation
-    if not (source and destination and depart_date):
-        airports = get_airport_codes()
-        return render_template(template, error="Please fill all required fields.", airports=airports)
+    if not (source_text and destination_text and depart_date):
+        return render_template(template, error="Please fill all required fields.")
+
+    # The fields are free text: accept a code or anything naming exactly one airport
+    source = resolve_airport(source_text)
+    destination = resolve_airport(destination_text)
+    if not source or not destination:
+        unknown = source_text if not source else destination_text
+        return render_template(template, error=f'No single airport matches "{unknown}". '
+                                               'Pick one from the suggestions or enter its code.')
 
     # disallow same-airport searches
     if source == destination:
-        airports = get_airport_codes()
-        return render_template(template, error="From and To cannot be the same airport.", airports=airports)
+        return render_template(template, error="From and To cannot be the same airport.")
 
-    if (trip_type == "oneway"):
-        query =  """SELECT flight_no, airline_name, dep_airport_code, arr_airport_code, 
-                            DATE_FORMAT(dep_datetime, '%%M %%e, %%Y') AS d_date,
-                            DATE_FORMAT(dep_datetime, '%%l:%%i %%p') AS d_time,
-                            DATE_FORMAT(arr_datetime, '%%M %%e, %%Y') AS a_date,
-                            DATE_FORMAT(arr_datetime, '%%l:%%i %%p') AS a_time,
-                            TIME_FORMAT(TIMEDIFF(arr_datetime, dep_datetime), '%%Hh %%im') AS flight_duration,
-                            base_price
-                    FROM Flight
-                    WHERE dep_airport_code = %s AND arr_airport_code = %s AND 
-                            DATE(dep_datetime) = %s AND dep_datetime > NOW()
-                    ORDER BY dep_datetime ASC; 
-                """
-        # cursor used to send queries
-        cursor = conn.cursor()
-        cursor.execute(query, (source, destination, depart_date))
+    # Half-open [day, next day) range so the route index on
+    # (dep_airport_code, arr_airport_code, dep_datetime) can be used.
+    depart_day = _parse_date(depart_date)
+    if not depart_day:
+        return render_template(template, error="Please enter a valid departure date.")
 
-        #stores the results in a variable
-        data = cursor.fetchall()
-        _recompute_durations(data)
-        airports = get_airport_codes()
-        cursor.close()
+    if (trip_type == "oneway"):
+        data = search_leg(source, destination, depart_day)
 
+        # 1- and 2-stop itineraries from the in-memory route graph
+        outbound_connections = find_connections(source, destination, depart_day, connections_sort)
+        fare_calendar = get_fare_calendar(source, destination, depart_day, flex_days) if flex_days else None
 
         return render_template(
             template,
             outbound=data,          
+            outbound_connections=outbound_connections,
+            fare_calendar=fare_calendar,
             trip=trip_type,
             source=source,
             destination=destination,
             depart_date=depart_date,
-            airports=airports,
         )
 
     elif (trip_type == "round"):
         if not return_date:
-            airports = get_airport_codes()
-            return render_template(template, error="Please pick a return date for round trips.", airports=airports)
+            return render_template(template, error="Please pick a return date for round trips.")
         
-        # ensure chronological round-trip dates
-        if return_date < depart_date:
-            airports = get_airport_codes()
-            return render_template(template, error="Return date must be on or after the departure date.", airports=airports)
-
-        query =  """SELECT flight_no, airline_name, dep_airport_code, arr_airport_code, 
-                            DATE_FORMAT(dep_datetime, '%%M %%e, %%Y') AS d_date,
-                            DATE_FORMAT(dep_datetime, '%%l:%%i %%p') AS d_time,
-                            DATE_FORMAT(arr_datetime, '%%M %%e, %%Y') AS a_date,
-                            DATE_FORMAT(arr_datetime, '%%l:%%i %%p') AS a_time,
-                            TIME_FORMAT(TIMEDIFF(arr_datetime, dep_datetime), '%%Hh %%im') AS flight_duration,
-                            base_price
-                    FROM Flight
-                    WHERE dep_airport_code = %s AND arr_airport_code = %s AND 
-                            DATE(dep_datetime) = %s AND dep_datetime > NOW()
-                    ORDER BY dep_datetime ASC; 
-                """
-        
-        cursor = conn.cursor()
-
-        # source -> destination flights on depart_date
-        cursor.execute(query, (source, destination, depart_date))
-        outbound = cursor.fetchall()
-
-        # destination -> source flights on return_date
-        cursor.execute(query, (destination, source, return_date))
-        inbound = cursor.fetchall()
-        cursor.close()
-
-        _recompute_durations(outbound)
-        _recompute_durations(inbound)
+        return_day = _parse_date(return_date)
+        if not return_day:
+            return render_template(template, error="Please enter a valid return date.")
 
-        airports = get_airport_codes()
+        # ensure chronological round-trip dates
+        if return_day < depart_day:
+            return render_template(template, error="Return date must be on or after the departure date.")
+
+        # Outbound (source -> destination on depart_date) and inbound
+        # (destination -> source on return_date) legs are independent, so
+        # they run concurrently; so do the two fare calendars if requested.
+        calls = [(search_leg, (source, destination, depart_day)),
+                 (search_leg, (destination, source, return_day))]
+        if flex_days:
+            calls += [(get_fare_calendar, (source, destination, depart_day, flex_days)),
+                      (get_fare_calendar, (destination, source, return_day, flex_days))]
+        results = run_legs(calls)
+        outbound, inbound = results[0], results[1]
+        fare_calendar, return_fare_calendar = (results[2], results[3]) if flex_days else (None, None)
+
+        # A timed-out leg renders as empty with a note instead of hanging the page
+        error = None
+        if outbound is None or inbound is None:
+            missing = "outbound" if outbound is None else "return"
+            if outbound is None and inbound is None:
+                missing = "outbound and return"
+            error = f"Some {missing} flights could not be loaded in time. Please try again."
+        outbound = outbound if outbound is not None else []
+        inbound = inbound if inbound is not None else []
+
+        outbound_connections = find_connections(source, destination, depart_day, connections_sort)
+        inbound_connections = find_connections(destination, source, return_day, connections_sort)
 
         return render_template(
             template,
+            error=error,
             trip=trip_type,
             source=source,
             destination=destination,
@@ -656,11 +3025,226 @@ def search_flights():
             return_date=return_date,
             outbound=outbound,
             inbound=inbound,
-            airports=airports,
+            outbound_connections=outbound_connections,
+            inbound_connections=inbound_connections,
+            fare_calendar=fare_calendar,
+            return_fare_calendar=return_fare_calendar,
         )
 
 
+@app.get("/api/fare_calendar")
+def fare_calendar_json():
+    """JSON fare calendar: ?source=JFK&destination=DXB&date=YYYY-MM-DD&days=3"""
+    source = request.args.get('source', '').strip().upper()
+    destination = request.args.get('destination', '').strip().upper()
+    center = _parse_date(request.args.get('date', ''))
+    days = request.args.get('days', default=3, type=int)
+
+    if not (source and destination and center):
+        return jsonify(error="source, destination and date (YYYY-MM-DD) are required."), 400
+    if source == destination:
+        return jsonify(error="source and destination must differ."), 400
+
+    return jsonify(
+        source=source,
+        destination=destination,
+        date=center.isoformat(),
+        days=max(0, min(days, FARE_CALENDAR_MAX_DAYS)),
+        calendar=get_fare_calendar(source, destination, center, days),
+    )
+
+
+# --------------------------- JSON search API (v1) ---------------------------
+
+API_PAGE_DEFAULT = 20
+API_PAGE_MAX = 100
+# Longest departure-date range one API search may cover
+API_MAX_RANGE_DAYS = 31
+
+# Sort key expressions for keyset pagination. Each ends with the Flight
+# primary key so the ordering is total and a cursor names an exact row.
+# Durations are ranked by Flight.duration_minutes, the stored
+# arr_utc - dep_utc, so the order is the true flight time across time
+# zones and DST switches.
+_API_SORTS = {
+    "departure": ("dep_datetime", "flight_no", "airline_name"),
+    "price": ("base_price", "dep_datetime", "flight_no", "airline_name"),
+    "duration": ("duration_minutes", "dep_datetime", "flight_no", "airline_name"),
+}
+
+class ApiError(Exception):
+    """Bad API input; rendered as a 400 JSON error."""
+
+@app.errorhandler(ApiError)
+def _api_error(e):
+    return jsonify(error=str(e)), 400
+
+def _encode_cursor(sort, fingerprint, values):
+    raw = json.dumps({"s": sort, "f": fingerprint, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(token, sort, fingerprint):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        values = data["k"]
+    except Exception:
+        raise ApiError("Invalid cursor.")
+    if data.get("s") != sort or data.get("f") != fingerprint or len(values) != len(_API_SORTS[sort]):
+        raise ApiError("Cursor does not belong to this search; start again without it.")
+    try:
+        _cursor_params(sort, values)
+    except Exception:
+        raise ApiError("Invalid cursor.")
+    return values
+
+def _cursor_params(sort, values):
+    """Cursor values back to SQL parameter types (exact DECIMAL / DATETIME compares)."""
+    params = list(values)
+    if sort == "price":
+        params[0] = Decimal(params[0])
+    i = 0 if sort == "departure" else 1
+    params[i] = datetime.fromisoformat(params[i])
+    return params
+
+def _sort_values(sort, r):
+    """The row's keyset values, in _API_SORTS order, as JSON-safe strings/numbers."""
+    head = {
+        "departure": [],
+        "price": [str(r['base_price'])],
+        "duration": [r['duration_minutes']],
+    }[sort]
+    return head + [r['dep_datetime'].isoformat(sep=" "), r['flight_no'], r['airline_name']]
+
+def _api_time(raw, name):
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(raw, "%H:%M").time()
+    except ValueError:
+        raise ApiError(f"{name} must be HH:MM.")
+
+def _api_number(raw, name, cast):
+    if raw in (None, ""):
+        return None
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise ApiError(f"{name} must be a number.")
+    if value < 0:
+        raise ApiError(f"{name} must not be negative.")
+    return value
+
+@app.get("/api/v1/flights/search")
+def api_search_flights():
+    """
+    Direct flights as JSON, filtered and sorted server-side, paged with
+    opaque keyset cursors (no OFFSET, so every page costs the same).
+
+    Query: source, destination, date_from (YYYY-MM-DD), [date_to],
+           [airline], [dep_after/dep_before HH:MM], [max_price],
+           [max_duration minutes], [sort=departure|price|duration],
+           [limit], [cursor from the previous page's next_cursor]
+    """
+    args = request.args
+    source = args.get('source', '').strip().upper()
+    destination = args.get('destination', '').strip().upper()
+    date_from = _parse_date(args.get('date_from', ''))
+    date_to = _parse_date(args.get('date_to', '')) if args.get('date_to') else date_from
+    if not (source and destination and date_from and date_to):
+        raise ApiError("source, destination and date_from (YYYY-MM-DD) are required.")
+    if source == destination:
+        raise ApiError("source and destination must differ.")
+    if date_to < date_from or (date_to - date_from).days >= API_MAX_RANGE_DAYS:
+        raise ApiError(f"date_to must be on or after date_from and within {API_MAX_RANGE_DAYS} days.")
+
+    sort = args.get('sort', 'departure')
+    if sort not in _API_SORTS:
+        raise ApiError("sort must be one of: " + ", ".join(_API_SORTS))
+    airline = args.get('airline', '').strip() or None
+    dep_after = _api_time(args.get('dep_after'), "dep_after")
+    dep_before = _api_time(args.get('dep_before'), "dep_before")
+    max_price = _api_number(args.get('max_price'), "max_price", float)
+    max_duration = _api_number(args.get('max_duration'), "max_duration", int)
+    limit = max(1, min(args.get('limit', default=API_PAGE_DEFAULT, type=int) or API_PAGE_DEFAULT, API_PAGE_MAX))
+
+    conds = ["dep_airport_code = %s", "arr_airport_code = %s",
+             "dep_datetime >= %s", "dep_datetime < %s", "dep_datetime > NOW()"]
+    params = [source, destination, *_day_range(date_from, date_to)]
+    if airline:
+        conds.append("airline_name = %s"); params.append(airline)
+    if dep_after:
+        conds.append("TIME(dep_datetime) >= %s"); params.append(dep_after)
+    if dep_before:
+        conds.append("TIME(dep_datetime) <= %s"); params.append(dep_before)
+    if max_price is not None:
+        conds.append("base_price <= %s"); params.append(max_price)
+    if max_duration is not None:
+        conds.append("duration_minutes <= %s"); params.append(max_duration)
+
+    # Cursors are only valid for the exact search they came from
+    fingerprint = hashlib.sha1(json.dumps(
+        [source, destination, date_from.isoformat(), date_to.isoformat(), airline,
+         str(dep_after), str(dep_before), max_price, max_duration], default=str
+    ).encode()).hexdigest()[:12]
+
+    sort_cols = _API_SORTS[sort]
+    order_by = ", ".join(sort_cols)
+    after = _decode_cursor(args['cursor'], sort, fingerprint) if args.get('cursor') else None
+
+    if after is not None:
+        conds.append(f"({', '.join(sort_cols)}) > ({', '.join(['%s'] * len(sort_cols))})")
+        params += _cursor_params(sort, after)
+    cursor = read_conn.cursor()
+    cursor.execute(f"""SELECT flight_no, airline_name, dep_airport_code, arr_airport_code,
+                              dep_datetime, arr_datetime, duration_minutes, status, base_price
+                       FROM Flight
+                       WHERE {' AND '.join(conds)}
+                       ORDER BY {order_by}
+                       LIMIT %s""", (*params, limit + 1))
+    rows = cursor.fetchall()
+    cursor.close()
+    more = len(rows) > limit
+    page = rows[:limit]
+
+    next_cursor = _encode_cursor(sort, fingerprint, _sort_values(sort, page[-1])) if more else None
+
+    return jsonify(
+        data=[{
+            "flight_no": r['flight_no'],
+            "airline_name": r['airline_name'],
+            "dep_airport_code": r['dep_airport_code'],
+            "arr_airport_code": r['arr_airport_code'],
+            "dep_datetime": r['dep_datetime'].isoformat(),
+            "arr_datetime": r['arr_datetime'].isoformat(),
+            "duration_minutes": r['duration_minutes'],
+            "status": r['status'],
+            "base_price": float(r['base_price']),
+        } for r in page],
+        count=len(page),
+        sort=sort,
+        next_cursor=next_cursor,
+    )
+
+@app.get("/api/v1/airports")
+def api_airports():
+    """
+    Airport autocomplete: airports whose code, city or country starts with
+    q, answered from the in-process AirportIndex (no Airport query per keystroke).
+
+    Query: q, [limit]
+    """
+    q = request.args.get('q', '')[:64]
+    limit = max(1, min(request.args.get('limit', default=AIRPORT_LOOKUP_DEFAULT, type=int)
+                       or AIRPORT_LOOKUP_DEFAULT, AIRPORT_LOOKUP_MAX))
+    response = jsonify(data=lookup_airports(q, limit))
+    # Suggestions go stale no faster than the index itself
+    response.cache_control.public = True
+    response.cache_control.max_age = REFERENCE_CACHE_TTL
+    return response
+
+
 @app.get("/customer/upcoming_flights")
+@conditional_get(_customer_flights_versions)
 def customer_view_upcoming_flights():
     guard = _require_customer()
     if guard:
@@ -684,7 +3268,7 @@ def customer_view_upcoming_flights():
             """
 
     # cursor used to send queries
-    cursor = conn.cursor()
+    cursor = read_conn.cursor()
     cursor.execute(query, (email, ))
 
     # stores the result in a variable
@@ -697,6 +3281,7 @@ def customer_view_upcoming_flights():
     )
 
 @app.get("/customer/past_flights")
+@conditional_get(_customer_flights_versions)
 def customer_view_past_flights():
     guard = _require_customer()
     if guard:
@@ -720,7 +3305,7 @@ def customer_view_past_flights():
             """
 
     # cursor used to send queries
-    cursor = conn.cursor()
+    cursor = read_conn.cursor()
     cursor.execute(query, (email, ))
 
     # stores the result in a variable
@@ -763,7 +3348,7 @@ def customer_rate_flights_page():
         ORDER BY T.dep_datetime DESC
     """
 
-    cursor = conn.cursor()
+    cursor = read_conn.cursor()
     cursor.execute(query, (email,))
     flights = cursor.fetchall()
     cursor.close()
@@ -804,7 +3389,7 @@ def customer_rate_flights():
 
     # check that this exact flight exists, is in the past,
     # and is actually booked by this customer
-    query_flight = """SELECT 1 
+    query_flight = """SELECT F.dep_airport_code, F.arr_airport_code
                       FROM Ticket T 
                       JOIN Flight F
                         ON F.flight_no     = T.flight_no
@@ -848,12 +3433,58 @@ def customer_rate_flights():
                     """
 
     cursor.execute(query_insert, (email, flight_no, dep_datetime, airline_name, rating, comment))
+    record_rating(cursor, flight_no, dep_datetime, airline_name,
+                  valid_flight["dep_airport_code"], valid_flight["arr_airport_code"], rating)
     conn.commit()
     cursor.close()
 
     flash("Thank you for rating this flight!", "success")
     return redirect(url_for("customer_rate_flights_page"))
 
+def _purchase_legs(ctx):
+    """(flight_no, dep_datetime, airline_name) of every leg in a purchase context."""
+    if not ctx or ctx.get("purchased"):
+        return []
+    flights = [ctx["flight"]] if ctx.get("trip") == "oneway" else [ctx["outbound"], ctx["inbound"]]
+    try:
+        return [(f["flight_no"], datetime.strptime(f["dep_key"], "%Y-%m-%d %H:%M:%S"), f["airline_name"])
+                for f in flights]
+    except (KeyError, ValueError):
+        return []
+
+def _hold_purchase_seats(ctx, previous=None):
+    """
+    Hold (or re-hold) a seat on every leg of the purchase being reviewed,
+    releasing holds left over from a previous, different review. Each
+    hold is its own short transaction. If any leg is full, the legs held
+    so far are released and False is returned.
+    """
+    email = session.get("email")
+    legs = _purchase_legs(ctx)
+    stale = [key for key in _purchase_legs(previous) if key not in legs]
+    held = []
+    c = conn.cursor()
+    try:
+        if stale:
+            release_seat_holds(c, email, stale)
+            conn.commit()
+        for key in legs:
+            ok = place_seat_hold(c, *key, email)
+            conn.commit()
+            if not ok:
+                release_seat_holds(c, email, held)
+                conn.commit()
+                return False
+            held.append(key)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        c.close()
+    if held:
+        ensure_hold_sweeper()
+    return True
+
 @app.route("/customer/purchase_review", methods=["GET", "POST"])
 def customer_purchase_review():
     guard = _require_customer()
@@ -867,6 +3498,13 @@ def customer_purchase_review():
             flash("No purchase in progress.", "error")
             return redirect(url_for("customer_home"))
 
+        # Keep the seats held while the customer is still on this page
+        if not _hold_purchase_seats(ctx):
+            session.pop("purchase_context", None)
+            flash("Sorry, this flight is now fully booked.", "error")
+            return redirect(url_for("customer_home"))
+        hold_minutes = SEAT_HOLD_TTL_SECONDS // 60 if _purchase_legs(ctx) else None
+
         trip = ctx.get("trip", "oneway")
 
         if trip == "oneway":
@@ -876,6 +3514,7 @@ def customer_purchase_review():
                 trip="oneway",
                 flight=flight,
                 total_price=ctx["total_price"],
+                hold_minutes=hold_minutes,
             )
         
         elif trip == "round":
@@ -887,6 +3526,7 @@ def customer_purchase_review():
                 outbound=outbound,
                 inbound=inbound,
                 total_price=ctx["total_price"],
+                hold_minutes=hold_minutes,
             )
         
         else:
@@ -895,6 +3535,7 @@ def customer_purchase_review():
     
     # POST: coming from search_flights page after choosing flights
     trip = request.form.get("trip", "oneway")
+    previous = session.get("purchase_context")
 
     if trip == "oneway":
         # Extract flight details from the form
@@ -904,6 +3545,7 @@ def customer_purchase_review():
         arr_airport_code = request.form["arr_airport_code"]
         d_date = request.form["depart_date"]
         d_time = request.form["dep_time"]
+        dep_key = request.form["dep_key"]
         a_date = request.form["arrival_date"]
         a_time = request.form["arrival_time"]
         base_price = float(request.form["base_price"])
@@ -919,6 +3561,7 @@ def customer_purchase_review():
                 "arr_airport_code": arr_airport_code,
                 "d_date": d_date,
                 "d_time": d_time,
+                "dep_key": dep_key,
                 "a_date": a_date,
                 "a_time": a_time,
                 "base_price": base_price,
@@ -927,6 +3570,11 @@ def customer_purchase_review():
             "total_price": base_price,
         }
 
+        if not _hold_purchase_seats(session["purchase_context"], previous):
+            session.pop("purchase_context", None)
+            flash("Sorry, this flight is fully booked.", "error")
+            return redirect(url_for("customer_home"))
+
         flight = SimpleNamespace(**session["purchase_context"]["flight"])
         total_price = base_price
 
@@ -936,6 +3584,7 @@ def customer_purchase_review():
             trip="oneway",
             flight=flight,
             total_price=total_price,
+            hold_minutes=SEAT_HOLD_TTL_SECONDS // 60,
         )
 
     elif trip == "round":
@@ -959,6 +3608,7 @@ def customer_purchase_review():
                 a_time,
                 base_price,
                 flight_duration,
+                dep_key,
             ) = raw.split("|")
 
             return {
@@ -968,6 +3618,7 @@ def customer_purchase_review():
                 "arr_airport_code": arr_airport_code,
                 "d_date": d_date,
                 "d_time": d_time,
+                "dep_key": dep_key,
                 "a_date": a_date,
                 "a_time": a_time,
                 "base_price": float(base_price),
@@ -989,6 +3640,11 @@ def customer_purchase_review():
             "total_price": total_price,
         }
 
+        if not _hold_purchase_seats(session["purchase_context"], previous):
+            session.pop("purchase_context", None)
+            flash("Sorry, this flight is fully booked.", "error")
+            return redirect(url_for("customer_home"))
+
         outbound = SimpleNamespace(**outbound_dict)
         inbound  = SimpleNamespace(**inbound_dict)
         
@@ -998,6 +3654,7 @@ def customer_purchase_review():
             outbound=outbound,
             inbound=inbound,
             total_price=total_price,
+            hold_minutes=SEAT_HOLD_TTL_SECONDS // 60,
         )
          
     # Fallback – should never hit if trip is valid
@@ -1063,91 +3720,42 @@ def customer_confirm_purchase():
         return redirect(url_for("customer_purchase_review"))
     
     cursor = conn.cursor()
+    # (dep, arr, dep_datetime) of each leg sold, for cache invalidation after commit
+    sold = []
 
-    def _insert_ticket_for_flight(flight_no, airline_name, dep_date_str, dep_time_str):
-        # Get canonical dep_datetime from Flight using same format as search_flights
-        lookup_sql = """SELECT dep_datetime
-                        FROM Flight
-                        WHERE flight_no = %s AND airline_name = %s
-                            AND DATE(dep_datetime) = %s
-                            AND DATE_FORMAT(dep_datetime,'%%l:%%i %%p') = %s
-                        LIMIT 1
-                     """
-    
-        # dep_date_str is like "November 21, 2025" (same as r.d_date),
-        # so parse it back to a real date before passing to MySQL.
+    def _insert_ticket_for_flight(flight_no, airline_name, dep_key):
+        # dep_key is the flight's canonical 'YYYY-MM-DD HH:MM:SS' departure,
+        # carried from the search results through the review page
         try:
-            dep_date_obj = datetime.strptime(dep_date_str, "%B %d, %Y").date()
+            dep_datetime = datetime.strptime(dep_key, "%Y-%m-%d %H:%M:%S")
         except ValueError:
             flash("Could not parse departure date.", "error")
             return False
 
-        cursor.execute(lookup_sql, (flight_no, airline_name, dep_date_obj, dep_time_str))
-        row = cursor.fetchone()
-
-        if not row:
-            # Should be impossible in normal use, but avoids a crash if
-            # something gets out of sync.
-            flash("Could not locate the selected flight in the database.", "error")
-            return False
-
-        dep_datetime = row["dep_datetime"]
-
-        # Check for duplicate ticket
-        check_query = """SELECT 1 FROM Ticket
-                         WHERE flight_no = %s AND dep_datetime = %s 
-                               AND airline_name = %s AND customer_email = %s
-                         LIMIT 1
-                      """
-        
-        cursor.execute(check_query, (flight_no, dep_datetime, airline_name, email))
-        exists = cursor.fetchone()
-
-        if exists:
+        row = purchase_ticket(cursor, flight_no, dep_datetime, airline_name, email,
+                              card_type, card_num, card_name, exp_date)
+        outcome = row["outcome"]
+        if outcome == "duplicate":
             flash(f"You’ve already purchased a ticket for flight {flight_no} that departs on {dep_datetime}.", "error")
             return False
-
-        # Capacity Check: Block if sold >= seat_capacity
-        cap_query = """SELECT a.seat_capacity AS capacity, COUNT(t.ticket_id) AS sold
-                       FROM Flight f
-                       JOIN Airplane a
-                         ON a.airplane_id = f.airplane_id
-                        AND a.airline_name = f.airline_name
-                       LEFT JOIN Ticket t
-                         ON t.flight_no = f.flight_no
-                        AND t.dep_datetime = f.dep_datetime
-                        AND t.airline_name = f.airline_name
-                       WHERE f.flight_no = %s
-                         AND f.dep_datetime = %s
-                         AND f.airline_name = %s
-                       GROUP BY a.seat_capacity
-                    """
-        cursor.execute(cap_query, (flight_no, dep_datetime, airline_name))
-        cap_row = cursor.fetchone()
-
-        if not cap_row:
-            flash("Could not verify seat capacity for this flight.", "error")
-            return False
-
-        if cap_row["sold"] >= cap_row["capacity"]:
+        if outcome == "sold_out":
             flash("Sorry, this flight is fully booked.", "error")
             return False
-					   
-        # Insert ticket
-        insert_query = """INSERT INTO Ticket 
-                          (flight_no, dep_datetime, airline_name, customer_email,
-                          card_type, card_num, card_name, exp_date) 
-                          VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                       """
-        
-        cursor.execute(insert_query, (flight_no, dep_datetime, airline_name, email,
-                       card_type, card_num, card_name, exp_date))
+        if outcome == "departed":
+            flash(f"Flight {flight_no} has already departed.", "error")
+            return False
+        if outcome != "ok":
+            # Should be impossible in normal use, but avoids a crash if
+            # something gets out of sync.
+            flash("Could not locate the selected flight in the database.", "error")
+            return False
 
+        sold.append((row["dep_airport_code"], row["arr_airport_code"], dep_datetime))
         return True
 
     if trip == "oneway":
         ok = _insert_ticket_for_flight(request.form["flight_no"], request.form["airline_name"],
-                                       request.form["dep_date"], request.form["dep_time"])
+                                       request.form["dep_key"])
         if not ok:
             conn.rollback()
             cursor.close()
@@ -1155,11 +3763,12 @@ def customer_confirm_purchase():
 
     elif trip == "round":
         ok_out = _insert_ticket_for_flight(request.form["out_flight_no"], request.form["out_airline_name"],
-                                           request.form["out_dep_date"], request.form["out_dep_time"])
-        
-        ok_ret = _insert_ticket_for_flight(request.form["ret_flight_no"], request.form["ret_airline_name"],
-                                           request.form["ret_dep_date"], request.form["ret_dep_time"])
-        
+                                           request.form["out_dep_key"])
+        # No point booking the return leg once the outbound failed
+        ok_ret = ok_out and _insert_ticket_for_flight(request.form["ret_flight_no"],
+                                                      request.form["ret_airline_name"],
+                                                      request.form["ret_dep_key"])
+
         if not (ok_out and ok_ret):
             conn.rollback()
             cursor.close()
@@ -1173,6 +3782,12 @@ def customer_confirm_purchase():
 
     conn.commit()
     cursor.close()
+    # The holds were consumed; don't re-hold these seats when the page reloads
+    if session.get("purchase_context"):
+        session["purchase_context"] = dict(session["purchase_context"], purchased=True)
+    bump_versions(("customer", email))
+    for dep_code, arr_code, dep_dt in sold:
+        invalidate_search(dep_code, arr_code, dep_dt)
     flash("Thank you, your purchase has been recorded.", "success")
     return redirect(url_for("customer_purchase_review"))
 
@@ -1184,6 +3799,7 @@ def customer_confirm_purchase():
 
 # 1) View flights (filters; default next 30 days)
 @app.get("/staff/view_flights")
+@conditional_get(_staff_airline_versions)
 def staff_view_flights():
     guard = _require_staff()
     if guard: return guard
@@ -1198,8 +3814,8 @@ def staff_view_flights():
     fd = _parse_date(from_date) or today
     td = _parse_date(to_date) or (today + timedelta(days=30))
 
-    conds = ["airline_name=%s", "DATE(dep_datetime) BETWEEN %s AND %s"]
-    params = [airline, fd, td]
+    conds = ["airline_name=%s", "dep_datetime >= %s", "dep_datetime < %s"]
+    params = [airline, *_day_range(fd, td)]
     if dep_code:
         conds.append("dep_airport_code=%s"); params.append(dep_code)
     if arr_code:
@@ -1217,10 +3833,9 @@ def staff_view_flights():
         ORDER BY dep_datetime ASC
         LIMIT 500
     """
-    c = conn.cursor(); c.execute(sql, params); flights = c.fetchall(); c.close()
-    airports = get_airport_codes()
+    c = read_conn.cursor(); c.execute(sql, params); flights = c.fetchall(); c.close()
     return render_template("staff_view_flights.html",
-        flights=flights, airports=airports,
+        flights=flights,
         current_filters={'from_date':fd.isoformat(),'to_date':td.isoformat(),
                          'dep_code':dep_code,'arr_code':arr_code})
 
@@ -1234,7 +3849,7 @@ def staff_flight_customers():
     dep_dt_key = request.args['dep_dt_key']  # 'YYYY-MM-DD HH:MM:SS'
     dep_dt = datetime.strptime(dep_dt_key, "%Y-%m-%d %H:%M:%S")
 
-    c = conn.cursor()
+    c = read_conn.cursor()
     # safety: verify the flight belongs to this airline
     c.execute("""SELECT 1 FROM Flight
                  WHERE flight_no=%s AND dep_datetime=%s AND airline_name=%s""",
@@ -1252,7 +3867,87 @@ def staff_flight_customers():
     rows = c.fetchall(); c.close()
     return render_template("staff_flight_customers.html",
                            customers=rows, flight_no=flight_no, dep_dt_key=dep_dt_key)
-                           
+
+# Exports stream rows from an unbuffered (server-side) cursor through a
+# generator response, EXPORT_BATCH_ROWS at a time, so memory stays flat
+# however many rows there are. The request's pooled connection is busy
+# until the stream ends.
+EXPORT_BATCH_ROWS = 1000
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _export_rows(sql, params, columns, fmt):
+    cursor = read_conn.cursor(pymysql.cursors.SSDictCursor)
+    finished = False
+    try:
+        cursor.execute(sql, params)
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if fmt == "csv":
+            writer.writerow(columns)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                break
+            if fmt == "csv":
+                writer.writerows([r[col] for col in columns] for r in rows)
+            else:
+                for r in rows:
+                    buf.write(json.dumps({col: r[col] for col in columns}, default=str))
+                    buf.write("\n")
+            yield buf.getvalue()
+            buf.seek(0); buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+        finished = True
+    finally:
+        if finished:
+            cursor.close()
+        else:
+            # Client went away (or the query failed) mid-stream: dropping
+            # the socket beats draining the rest of the result set; the
+            # pool discards the closed connection on release.
+            read_conn.close()
+
+def _export_response(sql, params, columns, fmt, filename):
+    return Response(stream_with_context(_export_rows(sql, params, columns, fmt)),
+                    mimetype=EXPORT_FORMATS[fmt],
+                    headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'})
+
+MANIFEST_COLUMNS = ("ticket_id", "name", "email", "purchase_datetime")
+
+@app.get("/staff/flight_customers/export")
+def staff_flight_customers_export():
+    guard = _require_staff()
+    if guard: return guard
+    airline = session['airline_name']
+    fmt = request.args.get('format', 'csv')
+    flight_no = request.args.get('flight_no', '')
+    dep_dt_key = request.args.get('dep_dt_key', '')
+    try:
+        dep_dt = datetime.strptime(dep_dt_key, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        dep_dt = None
+    if fmt not in EXPORT_FORMATS or not dep_dt:
+        flash("Invalid export request.", "error")
+        return redirect(url_for("staff_view_flights"))
+
+    c = read_conn.cursor()
+    c.execute("""SELECT 1 FROM Flight
+                 WHERE flight_no=%s AND dep_datetime=%s AND airline_name=%s""",
+              (flight_no, dep_dt, airline))
+    found = c.fetchone(); c.close()
+    if not found:
+        flash("Flight not found for your airline.", "error")
+        return redirect(url_for("staff_view_flights"))
+
+    return _export_response("""
+      SELECT t.ticket_id, c.name, c.email, t.purchase_datetime
+      FROM Ticket t JOIN Customer c ON c.email=t.customer_email
+      WHERE t.flight_no=%s AND t.dep_datetime=%s AND t.airline_name=%s
+      ORDER BY t.purchase_datetime
+    """, (flight_no, dep_dt, airline), MANIFEST_COLUMNS, fmt,
+        f"manifest-{flight_no}-{dep_dt:%Y%m%d-%H%M}")
+
 
 # 2) Create new flight (form + submit)
 @app.get("/create_flight")
@@ -1260,13 +3955,12 @@ def create_flight_form():
     guard = _require_staff()
     if guard: return guard
     # Show only airplanes owned by this airline
-    c = conn.cursor()
+    c = read_conn.cursor()
     c.execute("SELECT airplane_id FROM airplane WHERE airline_name=%s ORDER BY airplane_id",
               (session['airline_name'],))
     planes = [r['airplane_id'] for r in c.fetchall()]
     c.close()
-    airports = get_airport_codes()  # returns list of Airport.code
-    return render_template("create_flight.html", airports=airports, planes=planes)
+    return render_template("create_flight.html", planes=planes)
 
 @app.post("/create_flight")
 def create_flight_submit():
@@ -1298,11 +3992,23 @@ def create_flight_submit():
     if dep == arr:
         flash("Departure and arrival airports must differ.", "error")
         return redirect(url_for("create_flight_form"))
+
+    airports = set(get_airport_codes())
+    if dep not in airports or arr not in airports:
+        flash(f"Unknown airport code {dep if dep not in airports else arr}.", "error")
+        return redirect(url_for("create_flight_form"))
     
     if arr_dt_obj <= dep_dt_obj:
         flash("Arrival time must be after departure time.", "error")
         return redirect(url_for("create_flight_form"))
 
+    # Real (UTC) times and duration are stored so searches never redo tz math
+    dep_utc, arr_utc, duration = flight_utc_times(dep_dt_obj, arr_dt_obj,
+                                                  _airport_tz(dep), _airport_tz(arr))
+    if duration <= 0:
+        flash("Arrival time must be after departure time (in the airports' local times).", "error")
+        return redirect(url_for("create_flight_form"))
+
     # Store as 'YYYY-MM-DD HH:MM:SS' for MySQL
     depdt = dep_dt_obj.strftime("%Y-%m-%d %H:%M:%S")
     arrdt = arr_dt_obj.strftime("%Y-%m-%d %H:%M:%S")
@@ -1318,34 +4024,124 @@ def create_flight_submit():
         c.execute("""
           INSERT INTO flight
             (flight_no,dep_datetime,airline_name,airplane_id,
-             dep_airport_code,arr_airport_code,arr_datetime,status,base_price)
-          VALUES (%s,%s,%s,%s,%s,%s,%s,'on-time',%s)
-        """, (fno, depdt, a, plane, dep, arr, arrdt, price))
-        conn.commit(); flash("Flight created.","success")
+             dep_airport_code,arr_airport_code,arr_datetime,status,base_price,
+             dep_utc,arr_utc,duration_minutes)
+          VALUES (%s,%s,%s,%s,%s,%s,%s,'on-time',%s,%s,%s,%s)
+        """, (fno, depdt, a, plane, dep, arr, arrdt, price, dep_utc, arr_utc, duration))
+        # seat counter for the new flight, in the same transaction
+        c.execute("""
+          INSERT INTO FlightInventory
+            (flight_no, dep_datetime, airline_name, seat_capacity, seats_sold)
+          SELECT %s, %s, %s, seat_capacity, 0
+          FROM airplane WHERE airplane_id=%s AND airline_name=%s
+        """, (fno, depdt, a, plane, a))
+        conn.commit()
     except Exception:
         conn.rollback(); flash("Error creating flight.","error")
+        return redirect(url_for("staff_view_flights"))
     finally:
         c.close()
+
+    # The flight is committed; cache eviction can't turn that into an error
+    flash("Flight created.","success")
+    bump_versions(("airline", a))
+    invalidate_route_graph()
+    invalidate_fare_calendar(dep, arr)
+    invalidate_search(dep, arr, dep_dt_obj)
     return redirect(url_for("staff_view_flights"))
 
+# 2b) Bulk import flights (CSV or weekly recurrence)
+@app.get("/staff/import_flights")
+def staff_import_flights_form():
+    guard = _require_staff()
+    if guard: return guard
+    c = read_conn.cursor()
+    c.execute("SELECT airplane_id FROM airplane WHERE airline_name=%s ORDER BY airplane_id",
+              (session['airline_name'],))
+    planes = [r['airplane_id'] for r in c.fetchall()]
+    c.close()
+    return render_template("staff_import_flights.html",
+                           planes=planes, columns=IMPORT_COLUMNS, weekdays=_WEEKDAYS,
+                           result=None)
+
+@app.post("/staff/import_flights")
+def staff_import_flights():
+    guard = _require_staff()
+    if guard: return guard
+    a = session['airline_name']
+    dry_run = request.form.get('action') == 'validate'
+
+    if request.form.get('mode') == 'recurrence':
+        f = request.form
+        first_day = _parse_date(f.get('first_date', ''))
+        last_day = _parse_date(f.get('last_date', ''))
+        weekdays = {i for i, d in enumerate(_WEEKDAYS) if f.get(d)}
+        if not first_day or not last_day or last_day < first_day:
+            flash("Enter a valid first and last date.", "error")
+            return redirect(url_for("staff_import_flights_form"))
+        if not weekdays:
+            flash("Pick at least one weekday.", "error")
+            return redirect(url_for("staff_import_flights_form"))
+        raw_rows = expand_recurrence(
+            f.get('flight_no', '').strip().upper(), f.get('airplane_id', '').strip(),
+            f.get('dep_airport_code', '').strip().upper(), f.get('arr_airport_code', '').strip().upper(),
+            f.get('dep_time', '').strip(), f.get('arr_time', '').strip(),
+            f.get('arr_day_offset', 0, type=int), first_day, last_day, weekdays,
+            f.get('base_price', '').strip())
+        if len(raw_rows) > IMPORT_MAX_ROWS:
+            flash(f"That pattern produces more than {IMPORT_MAX_ROWS} flights.", "error")
+            return redirect(url_for("staff_import_flights_form"))
+        errors = []
+    else:
+        upload = request.files.get('csv_file')
+        text = upload.read().decode('utf-8-sig', errors='replace') if upload and upload.filename \
+               else request.form.get('csv_text', '')
+        if not text.strip():
+            flash("Upload a CSV file or paste CSV rows.", "error")
+            return redirect(url_for("staff_import_flights_form"))
+        raw_rows, errors = parse_flight_csv(text)
+
+    if errors:
+        result = {"rows": len(raw_rows), "valid": 0, "inserted": 0,
+                  "errors": errors, "dry_run": dry_run}
+    else:
+        result = import_flights(a, raw_rows, dry_run=dry_run)
+
+    if result["inserted"]:
+        flash(f"Imported {result['inserted']} flight(s).", "success")
+    elif not result["errors"] and dry_run:
+        flash(f"All {result['valid']} row(s) are valid. Nothing was imported yet.", "info")
+    elif result["errors"]:
+        flash("Nothing was imported; fix the rows below and try again.", "error")
+
+    c = conn.cursor()
+    c.execute("SELECT airplane_id FROM airplane WHERE airline_name=%s ORDER BY airplane_id", (a,))
+    planes = [r['airplane_id'] for r in c.fetchall()]
+    c.close()
+    return render_template("staff_import_flights.html",
+                           planes=planes, columns=IMPORT_COLUMNS, weekdays=_WEEKDAYS,
+                           result=result)
+
 # 3) Manage (change) status
 @app.get("/staff/manage_status")
 def staff_manage_status():
     guard = _require_staff()
     if guard: return guard
-    airline = session['airline_name']
+    return _render_manage_status(session['airline_name'], request.args)
 
-    from_date = request.args.get('from_date')
-    to_date   = request.args.get('to_date')
-    dep_code  = (request.args.get('dep_code') or '').strip().upper()
-    arr_code  = (request.args.get('arr_code') or '').strip().upper()
+def _render_manage_status(airline, args):
+    """The status page for the filters in args."""
+    from_date = args.get('from_date')
+    to_date   = args.get('to_date')
+    dep_code  = (args.get('dep_code') or '').strip().upper()
+    arr_code  = (args.get('arr_code') or '').strip().upper()
 
     today = datetime.now().date()
     fd = _parse_date(from_date) or today
     td = _parse_date(to_date) or (today + timedelta(days=30))
 
-    conditions = ["airline_name=%s", "DATE(dep_datetime) BETWEEN %s AND %s"]
-    params = [airline, fd, td]
+    conditions = ["airline_name=%s", "dep_datetime >= %s", "dep_datetime < %s"]
+    params = [airline, *_day_range(fd, td)]
     if dep_code:
         conditions.append("dep_airport_code=%s"); params.append(dep_code)
     if arr_code:
@@ -1363,10 +4159,9 @@ def staff_manage_status():
         ORDER BY dep_datetime ASC
         LIMIT 500
     """
-    c = conn.cursor(); c.execute(query, params); flights = c.fetchall(); c.close()
-    airports = get_airport_codes()
+    c = read_conn.cursor(); c.execute(query, params); flights = c.fetchall(); c.close()
     return render_template("staff_manage_status.html",
-                           flights=flights, airports=airports,
+                           flights=flights,
                            current_filters={'from_date':fd.isoformat(),'to_date':td.isoformat(),
                                             'dep_code':dep_code,'arr_code':arr_code})
 
@@ -1389,10 +4184,11 @@ def staff_update_status():
 
     c = conn.cursor()
     # make sure it belongs to this airline
-    c.execute("""SELECT 1 FROM Flight
+    c.execute("""SELECT dep_airport_code, arr_airport_code FROM Flight
                  WHERE flight_no=%s AND dep_datetime=%s AND airline_name=%s""",
               (flight_no, dep_dt, airline))
-    if not c.fetchone():
+    route = c.fetchone()
+    if not route:
         c.close(); flash('Cannot update: flight not found for your airline.','error')
         return redirect(url_for('staff_manage_status'))
 
@@ -1401,9 +4197,102 @@ def staff_update_status():
                  LIMIT 1""",
               (new_status, flight_no, dep_dt, airline))
     conn.commit(); c.close()
+    bump_versions(("airline", airline), ("flight_status",))
+    invalidate_search(route['dep_airport_code'], route['arr_airport_code'], dep_dt)
     flash(f'Updated {flight_no} @ {dep_dt_key} to "{new_status}".','success')
     return redirect(url_for('staff_manage_status'))
 
+# Bulk status change: either the ticked rows of the status page or every
+# departure matching a day / time window / route filter. Both run as one
+# locking SELECT (to report what changes) plus one UPDATE with the same
+# predicate, always scoped to the staff member's airline.
+BULK_STATUS_MAX_SELECTED = 500
+
+def _manage_status_redirect(f):
+    """Back to the status page with the filters the form carried (post/redirect/get)."""
+    filters = {k: f[k] for k in ('from_date', 'to_date', 'dep_code', 'arr_code') if f.get(k)}
+    return redirect(url_for('staff_manage_status', **filters))
+
+@app.post("/staff/update_status_bulk")
+def staff_update_status_bulk():
+    guard = _require_staff()
+    if guard: return guard
+    airline = session['airline_name']
+    f = request.form
+    new_status = f.get('status','').strip()
+    if new_status not in ('on-time','delayed'):
+        flash('Invalid status.','error')
+        return _manage_status_redirect(f)
+
+    conditions = ["airline_name=%s", "status<>%s"]
+    params = [airline, new_status]
+    if f.get('mode') == 'filter':
+        day = _parse_date(f.get('day',''))
+        try:
+            start = datetime.strptime(f.get('from_time') or '00:00', "%H:%M").time()
+            end = datetime.strptime(f.get('to_time') or '23:59', "%H:%M").time()
+        except ValueError:
+            day = None
+        if not day or end < start:
+            flash('Enter a valid day and time window.','error')
+            return _manage_status_redirect(f)
+        # Half-open: the window includes the whole of its last minute
+        conditions += ["dep_datetime >= %s", "dep_datetime < %s"]
+        params += [datetime.combine(day, start), datetime.combine(day, end) + timedelta(minutes=1)]
+        dep_code = f.get('bulk_dep_code','').strip().upper()
+        arr_code = f.get('bulk_arr_code','').strip().upper()
+        if dep_code:
+            conditions.append("dep_airport_code=%s"); params.append(dep_code)
+        if arr_code:
+            conditions.append("arr_airport_code=%s"); params.append(arr_code)
+    else:
+        keys = []
+        for sel in f.getlist('sel')[:BULK_STATUS_MAX_SELECTED]:
+            flight_no, _, dep_dt_key = sel.partition('|')
+            try:
+                keys.append((flight_no, datetime.strptime(dep_dt_key, "%Y-%m-%d %H:%M:%S")))
+            except ValueError:
+                continue
+        if not keys:
+            flash('Select at least one flight.','error')
+            return _manage_status_redirect(f)
+        conditions.append("(flight_no, dep_datetime) IN (" + ",".join(["(%s,%s)"] * len(keys)) + ")")
+        params += [v for key in keys for v in key]
+
+    where = " AND ".join(conditions)
+    c = conn.cursor()
+    try:
+        c.execute(f"""
+            SELECT flight_no, dep_airport_code, arr_airport_code, dep_datetime,
+                   DATE_FORMAT(dep_datetime,'%%M %%e, %%Y %%l:%%i %%p') AS dep_dt_disp
+            FROM Flight WHERE {where}
+            ORDER BY dep_datetime, flight_no
+            FOR UPDATE
+        """, params)
+        updated = c.fetchall()
+        if updated:
+            c.execute(f"UPDATE flight SET status=%s WHERE {where}", [new_status] + params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        flash('Error updating flight statuses.','error')
+        return _manage_status_redirect(f)
+    finally:
+        c.close()
+
+    if updated:
+        bump_versions(("airline", airline), ("flight_status",))
+    invalidate_search_many((r['dep_airport_code'], r['arr_airport_code'], r['dep_datetime'])
+                           for r in updated)
+    if updated:
+        flash(f'Updated {len(updated)} flight(s) to "{new_status}".','success')
+        # The "Just updated" table on the page we redirect to
+        flash([{k: r[k] for k in ('flight_no', 'dep_airport_code', 'arr_airport_code', 'dep_dt_disp')}
+               for r in updated[:BULK_STATUS_MAX_SELECTED]], 'bulk_updated')
+    else:
+        flash(f'No matching flights needed changing to "{new_status}".','success')
+    return _manage_status_redirect(f)
+
 # 4) Add airplane + list my airplanes
 @app.get("/staff/add_airplane")
 def add_airplane_form():
@@ -1485,6 +4374,7 @@ def add_airplane_submit():
             (airplane_id, a, seats, manufacturer, age),
         )
         conn.commit()
+        bump_versions(("airline", a))
         flash(f"Airplane {airplane_id} added.", "success")
     except Exception:
         conn.rollback()
@@ -1496,10 +4386,11 @@ def add_airplane_submit():
 
 
 @app.get("/staff/airplanes")
+@conditional_get(_staff_airline_versions)
 def list_my_airplanes():
     guard = _require_staff()
     if guard: return guard
-    c = conn.cursor()
+    c = read_conn.cursor()
     c.execute("""SELECT airplane_id, seat_capacity, manufacturer, age
                  FROM airplane WHERE airline_name=%s ORDER BY airplane_id""",
               (session['airline_name'],))
@@ -1507,28 +4398,65 @@ def list_my_airplanes():
     return render_template("list_airplanes.html", airplanes=rows)
 
 # 5) View flight ratings (avg + comments)
+STAFF_RATINGS_PAGE_SIZE = 300
+
 @app.get("/staff/ratings")
 def staff_ratings():
     guard = _require_staff()
     if guard: return guard
     a = session['airline_name']
-    c = conn.cursor()
-    c.execute("""
+    # Keyset paging: ?before=<dep_key>&before_no=<flight_no> continues after that row
+    before = request.args.get('before')
+    before_no = request.args.get('before_no', '')
+    clauses = ["f.airline_name=%s"]; params = [a]
+    if before:
+        try:
+            before_dt = datetime.strptime(before, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            flash("Invalid page marker.", "error")
+            return redirect(url_for("staff_ratings"))
+        clauses.append("(f.dep_datetime < %s OR (f.dep_datetime = %s AND f.flight_no < %s))")
+        params += [before_dt, before_dt, before_no]
+
+    c = read_conn.cursor()
+    # Walks idx_flight_airline_dep and probes FlightRatingStats by primary key
+    c.execute(f"""
       SELECT f.flight_no,
              DATE_FORMAT(f.dep_datetime,'%%Y-%%m-%%d %%H:%%i:%%s') AS dep_key,
              DATE_FORMAT(f.dep_datetime,'%%M %%e, %%Y %%l:%%i %%p') AS dep_disp,
              f.dep_airport_code, f.arr_airport_code,
-             ROUND(AVG(fr.rating),2) AS avg_rating, COUNT(fr.rating) AS num_reviews
+             ROUND(s.rating_sum / s.rating_count, 2) AS avg_rating,
+             COALESCE(s.rating_count, 0) AS num_reviews
       FROM Flight f
-      LEFT JOIN FlightRating fr
-        ON fr.flight_no=f.flight_no AND fr.dep_datetime=f.dep_datetime AND fr.airline_name=f.airline_name
-      WHERE f.airline_name=%s
-      GROUP BY f.flight_no, f.dep_datetime, f.dep_airport_code, f.arr_airport_code
-      ORDER BY f.dep_datetime DESC
-      LIMIT 300
-    """,(a,))
-    flights = c.fetchall(); c.close()
-    return render_template("staff_ratings.html", flights=flights)
+      LEFT JOIN FlightRatingStats s
+        ON s.flight_no=f.flight_no AND s.dep_datetime=f.dep_datetime AND s.airline_name=f.airline_name
+      WHERE {" AND ".join(clauses)}
+      ORDER BY f.dep_datetime DESC, f.flight_no DESC
+      LIMIT %s
+    """, params + [STAFF_RATINGS_PAGE_SIZE + 1])
+    flights = c.fetchall()
+    more = len(flights) > STAFF_RATINGS_PAGE_SIZE
+    flights = flights[:STAFF_RATINGS_PAGE_SIZE]
+
+    c.execute("""
+      SELECT dep_airport_code, arr_airport_code, rating_sum, rating_count AS num_reviews,
+             ROUND(rating_sum / rating_count, 2) AS avg_rating
+      FROM RouteRatingStats
+      WHERE airline_name=%s AND rating_count > 0
+      ORDER BY rating_count DESC
+    """, (a,))
+    routes = c.fetchall(); c.close()
+    # Airline tier: sum of its route rows
+    reviews = sum(r['num_reviews'] for r in routes)
+    overall = {
+        "num_reviews": reviews,
+        "avg_rating": round(sum(r['rating_sum'] for r in routes) / reviews, 2) if reviews else None,
+    }
+    next_page = None
+    if more:
+        next_page = {"before": flights[-1]['dep_key'], "before_no": flights[-1]['flight_no']}
+    return render_template("staff_ratings.html", flights=flights, routes=routes,
+                           overall=overall, next_page=next_page, paged=bool(before))
 
 @app.get("/staff/ratings/detail")
 def staff_ratings_detail():
@@ -1538,7 +4466,7 @@ def staff_ratings_detail():
     flight_no = request.args['flight_no']
     dep_dt_key= request.args['dep_dt_key']
     dep_dt    = datetime.strptime(dep_dt_key,"%Y-%m-%d %H:%M:%S")
-    c = conn.cursor()
+    c = read_conn.cursor()
     c.execute("""
       SELECT fr.rating, fr.comment, fr.customer_email, c.name AS customer_name
       FROM FlightRating fr JOIN Customer c ON c.email=fr.customer_email
@@ -1561,28 +4489,79 @@ def staff_reports():
     from_date = request.args.get('from_date')
     to_date   = request.args.get('to_date')
 
-    clauses = ["t.airline_name=%s"]; params=[a]
-    if from_date:
-        clauses.append("DATE(t.purchase_datetime) >= %s"); params.append(from_date)
-    if to_date:
-        clauses.append("DATE(t.purchase_datetime) <= %s"); params.append(to_date)
+    # Read the daily rollups: cost grows with the days in range, not tickets sold
+    clauses = ["airline_name=%s"]; params=[a]
+    fd = _parse_date(from_date) if from_date else None
+    td = _parse_date(to_date) if to_date else None
+    if fd:
+        clauses.append("sale_date >= %s"); params.append(fd)
+    if td:
+        clauses.append("sale_date <= %s"); params.append(td)
     where = " AND ".join(clauses)
 
-    c = conn.cursor()
-    c.execute(f"SELECT COUNT(*) AS total_tickets FROM Ticket t WHERE {where}", params)
+    c = read_conn.cursor()
+    c.execute(f"""
+      SELECT COALESCE(SUM(tickets),0) AS total_tickets, COALESCE(SUM(revenue),0) AS total_revenue
+      FROM SalesDaily WHERE {where}
+    """, params)
     totals = c.fetchone()
     c.execute(f"""
-      SELECT DATE_FORMAT(t.purchase_datetime,'%%Y-%%m') AS ym, COUNT(*) AS cnt
-      FROM Ticket t
+      SELECT DATE_FORMAT(sale_date,'%%Y-%%m') AS ym, SUM(tickets) AS cnt, SUM(revenue) AS revenue
+      FROM SalesDaily
       WHERE {where}
       GROUP BY ym ORDER BY ym
     """, params)
-    monthly = c.fetchall(); c.close()
+    monthly = c.fetchall()
+    c.execute(f"""
+      SELECT dep_airport_code, arr_airport_code, SUM(tickets) AS cnt, SUM(revenue) AS revenue
+      FROM SalesDaily
+      WHERE {where}
+      GROUP BY dep_airport_code, arr_airport_code
+      ORDER BY revenue DESC, cnt DESC
+      LIMIT 10
+    """, params)
+    routes = c.fetchall(); c.close()
 
     return render_template("staff_reports.html",
-                           totals=totals, monthly=monthly,
+                           totals=totals, monthly=monthly, routes=routes,
                            from_date=from_date or "", to_date=to_date or "")
 
+SALES_EXPORT_COLUMNS = ("ticket_id", "purchase_datetime", "flight_no", "dep_datetime",
+                        "dep_airport_code", "arr_airport_code", "customer_email", "price")
+
+@app.get("/staff/reports/export")
+def staff_reports_export():
+    """Every ticket sold in the report's date range, in purchase order."""
+    guard = _require_staff()
+    if guard: return guard
+    a = session['airline_name']
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        flash("Invalid export format.", "error")
+        return redirect(url_for("staff_reports"))
+
+    # Walks idx_ticket_airline_purchase in order: no temp table or filesort
+    clauses = ["t.airline_name=%s"]; params = [a]
+    fd = _parse_date(request.args.get('from_date') or '')
+    td = _parse_date(request.args.get('to_date') or '')
+    if fd:
+        clauses.append("t.purchase_datetime >= %s"); params.append(_day_range(fd)[0])
+    if td:
+        clauses.append("t.purchase_datetime < %s"); params.append(_day_range(td)[1])
+
+    return _export_response(f"""
+      SELECT t.ticket_id, t.purchase_datetime, t.flight_no, t.dep_datetime,
+             f.dep_airport_code, f.arr_airport_code, t.customer_email,
+             f.base_price AS price
+      FROM Ticket t
+      JOIN Flight f
+        ON f.flight_no = t.flight_no AND f.dep_datetime = t.dep_datetime
+       AND f.airline_name = t.airline_name
+      WHERE {' AND '.join(clauses)}
+      ORDER BY t.purchase_datetime, t.ticket_id
+    """, params, SALES_EXPORT_COLUMNS, fmt,
+        f"sales-{fd or 'start'}-{td or 'now'}")
+
 # 7) Manage staff phone numbers
 @app.get("/staff/phones")
 def staff_manage_phones():
@@ -1595,7 +4574,7 @@ def staff_manage_phones():
         flash("Unable to load staff username for phone numbers.", "error")
         return redirect(url_for("staff_home"))
 
-    c = conn.cursor()
+    c = read_conn.cursor()
     c.execute("SELECT phone_number FROM StaffPhoneNo WHERE username = %s", (username,))
     phones = c.fetchall()
     c.close()
@@ -1700,6 +4679,36 @@ def logout():
 		
 app.secret_key = 'some key that you will never guess'
 
+
+# ========================= Process Lifecycle =================================
+
+def _reset_after_fork():
+    # Runs in the child right after os.fork() (e.g. gunicorn with
+    # preload_app): nothing that owns a socket or a thread crosses over.
+    global _leg_executor, _leg_executor_lock, _hold_sweeper, _hold_sweeper_lock
+    db_pool.reset_after_fork()
+    if replica_set is not None:
+        for replica in replica_set.replicas:
+            replica["pool"].reset_after_fork()
+    _leg_executor, _leg_executor_lock = None, threading.Lock()
+    _hold_sweeper, _hold_sweeper_lock = None, threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def create_app(session_backend=None, warm=False):
+    """
+    Application factory for WSGI servers, e.g.
+        gunicorn -c gunicorn.conf.py "main:create_app(session_backend='sqlite')"
+    Importing main opens no connections; each process connects lazily on
+    its first request, or up front when warm_up() runs (warm=True here, or
+    gunicorn's post_worker_init hook after fork).
+    """
+    if session_backend is not None:
+        configure_sessions(session_backend)
+    if warm:
+        warm_up()
+    return app
+
 # Run the app on localhost port 5000
 # debug = True -> you don't have to restart flask
 # for changes to go through, TURN OFF FOR PRODUCTION
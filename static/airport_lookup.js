@@ -0,0 +1,37 @@
+// Airport typeahead. Enhances every <input data-airport-lookup list="...">:
+// as the user types, suggestions from /api/v1/airports (matched on code,
+// city or country) fill the input's <datalist>. Option values are airport
+// codes, so the form still submits a code.
+(function () {
+  const endpoint = document.currentScript.dataset.endpoint;
+
+  document.querySelectorAll('input[data-airport-lookup]').forEach(input => {
+    const list = input.list;
+    let timer = null;
+    let latest = 0;
+
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        const q = input.value.trim();
+        const seq = ++latest;
+        if (!q) { list.replaceChildren(); return; }
+        try {
+          const res = await fetch(`${endpoint}?q=${encodeURIComponent(q)}`);
+          if (!res.ok) return;
+          const { data } = await res.json();
+          // Ignore answers that arrive after a newer keystroke's
+          if (seq !== latest) return;
+          list.replaceChildren(...data.map(a => {
+            const opt = document.createElement('option');
+            opt.value = a.code;
+            opt.label = `${a.city}, ${a.country}`;
+            return opt;
+          }));
+        } catch (e) {
+          // Offline or aborted: the field still accepts a typed code
+        }
+      }, 120);
+    });
+  });
+})();
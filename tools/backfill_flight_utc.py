@@ -0,0 +1,74 @@
+"""
+Fill Flight.dep_utc / arr_utc / duration_minutes from each airport's
+timezone, then make those columns (and Airport.timezone) NOT NULL.
+
+    python tools/backfill_flight_utc.py
+
+Run once after applying db/migrations/007_airport_timezones.sql. Stops
+without changing anything if an airport has no timezone or an unknown
+one; set it with UPDATE Airport SET timezone = '<IANA name>' and rerun.
+Safe to rerun: only rows whose dep_utc is still NULL are filled.
+"""
+import os
+import sys
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from main import app, conn, flight_utc_times
+
+BATCH_ROWS = 5000
+
+
+def main(argv):
+    if argv:
+        print(__doc__)
+        return 2
+    with app.app_context():
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT code, timezone FROM Airport")
+            zones, bad = {}, []
+            for row in cursor.fetchall():
+                try:
+                    zones[row["code"]] = ZoneInfo(row["timezone"])
+                except Exception:
+                    bad.append(f"{row['code']} ({row['timezone'] or 'no timezone'})")
+            if bad:
+                print("Set a valid timezone for these airports first: " + ", ".join(bad))
+                return 1
+
+            filled = 0
+            while True:
+                cursor.execute("""SELECT flight_no, dep_datetime, airline_name,
+                                         dep_airport_code, arr_airport_code, arr_datetime
+                                  FROM Flight WHERE dep_utc IS NULL LIMIT %s""", (BATCH_ROWS,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                cursor.executemany("""UPDATE Flight SET dep_utc = %s, arr_utc = %s, duration_minutes = %s
+                                      WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s""",
+                                   [(*flight_utc_times(r["dep_datetime"], r["arr_datetime"],
+                                                       zones[r["dep_airport_code"]],
+                                                       zones[r["arr_airport_code"]]),
+                                     r["flight_no"], r["dep_datetime"], r["airline_name"])
+                                    for r in rows])
+                conn.commit()
+                filled += len(rows)
+
+            cursor.execute("ALTER TABLE Airport MODIFY timezone VARCHAR(64) NOT NULL")
+            cursor.execute("""ALTER TABLE Flight
+                                MODIFY dep_utc DATETIME NOT NULL,
+                                MODIFY arr_utc DATETIME NOT NULL,
+                                MODIFY duration_minutes INT NOT NULL""")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    print(f"Filled UTC times for {filled} flights.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+Rebuild the FlightRatingStats and RouteRatingStats aggregates behind
+staff_ratings from FlightRating.
+
+    python tools/backfill_rating_aggregates.py              # every airline
+    python tools/backfill_rating_aggregates.py Emirates     # one airline
+
+Run once after applying db/migrations/004_rating_aggregates.sql on a database
+that already has ratings, or after importing ratings outside the app.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from main import app, conn, rebuild_rating_aggregates
+
+
+def main(argv):
+    if len(argv) > 1:
+        print(__doc__)
+        return 2
+    with app.app_context():
+        cursor = conn.cursor()
+        try:
+            rows = rebuild_rating_aggregates(cursor, *argv)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    print(f"Rebuilt rating aggregates ({rows} flights).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
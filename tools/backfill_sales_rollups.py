@@ -0,0 +1,37 @@
+"""
+Rebuild the SalesDaily rollups that back staff_reports from Ticket.
+
+    python tools/backfill_sales_rollups.py              # every airline
+    python tools/backfill_sales_rollups.py Emirates     # one airline
+
+Run once after applying db/migrations/003_sales_daily.sql on a database
+that already has tickets, or after importing tickets outside the app.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from main import app, conn, rebuild_sales_rollups
+
+
+def main(argv):
+    if len(argv) > 1:
+        print(__doc__)
+        return 2
+    with app.app_context():
+        cursor = conn.cursor()
+        try:
+            rows = rebuild_sales_rollups(cursor, *argv)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    print(f"Rebuilt sales rollups ({rows} rows).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,144 @@
+"""
+Purchase latency under concurrency: the old four-statement-per-leg
+sequence vs the purchase_ticket procedure, against the same database.
+
+    python tools/bench_purchase.py --threads 16 --purchases 2000 --hot-flights 20
+
+Each worker has its own connection and buys round trips (two legs, one
+transaction) for synthetic customers on a small set of hot future
+flights, so buyers queue on the same seat counters. Every transaction is
+rolled back unless --commit is given, so runs do not consume seats.
+Expects data from tools/generate_data.py and db/migrations/005 applied.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pymysql
+
+from benchmark import percentile
+from generate_data import customer_email
+from main import DB_CONFIG, _fmt_time, purchase_ticket
+
+CARD = ("credit", "4111111111111111", "Bench Customer", "2035-12-31")
+
+
+def old_buy_leg(cur, flight, email):
+    """The pre-change leg: display-string lookup, duplicate check, seat UPDATE, two INSERTs."""
+    cur.execute("""SELECT dep_datetime, dep_airport_code, arr_airport_code, base_price
+                   FROM Flight
+                   WHERE flight_no = %s AND airline_name = %s
+                     AND DATE(dep_datetime) = %s
+                     AND DATE_FORMAT(dep_datetime,'%%l:%%i %%p') = %s
+                   LIMIT 1""",
+                (flight["flight_no"], flight["airline_name"],
+                 flight["dep_datetime"].date(), _fmt_time(flight["dep_datetime"])))
+    row = cur.fetchone()
+    key = (flight["flight_no"], row["dep_datetime"], flight["airline_name"])
+    cur.execute("""SELECT 1 FROM Ticket
+                   WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                     AND customer_email = %s LIMIT 1""", key + (email,))
+    if cur.fetchone():
+        return False
+    if not cur.execute("""UPDATE FlightInventory SET seats_sold = seats_sold + 1
+                          WHERE flight_no = %s AND dep_datetime = %s AND airline_name = %s
+                            AND seats_sold < seat_capacity""", key):
+        return False
+    cur.execute("""INSERT INTO Ticket
+                     (flight_no, dep_datetime, airline_name, customer_email,
+                      card_type, card_num, card_name, exp_date)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""", key + (email,) + CARD)
+    cur.execute("""INSERT INTO SalesDaily
+                     (airline_name, sale_date, dep_airport_code, arr_airport_code, tickets, revenue)
+                   VALUES (%s, CURDATE(), %s, %s, 1, %s)
+                   ON DUPLICATE KEY UPDATE tickets = tickets + 1,
+                                           revenue = revenue + VALUES(revenue)""",
+                (flight["airline_name"], row["dep_airport_code"], row["arr_airport_code"],
+                 row["base_price"]))
+    return True
+
+
+def new_buy_leg(cur, flight, email):
+    row = purchase_ticket(cur, flight["flight_no"], flight["dep_datetime"], flight["airline_name"],
+                          email, *CARD)
+    return row["outcome"] == "ok"
+
+
+def load_hot_flights(n):
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""SELECT f.flight_no, f.airline_name, f.dep_datetime
+                           FROM Flight f
+                           JOIN FlightInventory i
+                             ON i.flight_no = f.flight_no AND i.dep_datetime = f.dep_datetime
+                            AND i.airline_name = f.airline_name
+                           WHERE f.dep_datetime > DATE_ADD(NOW(), INTERVAL 1 DAY)
+                             AND i.seats_sold + 10 < i.seat_capacity
+                           ORDER BY f.dep_datetime
+                           LIMIT %s""", (n,))
+            flights = cur.fetchall()
+            cur.execute("SELECT COUNT(*) AS n FROM Customer WHERE email LIKE 'bench.customer%%'")
+            customers = cur.fetchone()["n"]
+    finally:
+        conn.close()
+    if len(flights) < 2 or not customers:
+        sys.exit("No synthetic data found; run tools/generate_data.py first.")
+    return flights, customers
+
+
+def run(label, buy_leg, args, flights, n_customers):
+    local = threading.local()
+
+    def one(i):
+        if not hasattr(local, "conn"):
+            local.conn = pymysql.connect(**DB_CONFIG)
+            local.rnd = random.Random(args.seed * 1000 + i)
+        rnd, conn = local.rnd, local.conn
+        out, ret = rnd.sample(flights, 2)
+        email = customer_email(rnd.randrange(n_customers))
+        t0 = time.perf_counter()
+        with conn.cursor() as cur:
+            ok = buy_leg(cur, out, email) and buy_leg(cur, ret, email)
+        if ok and args.commit:
+            conn.commit()
+        else:
+            conn.rollback()
+        return (time.perf_counter() - t0) * 1000.0, ok
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(one, range(args.threads)))          # connect + warm up
+        started = time.perf_counter()
+        samples = list(pool.map(one, range(args.purchases)))
+        wall = time.perf_counter() - started
+    ms = sorted(s[0] for s in samples)
+    print(f"{label:<10} p50 {percentile(ms, 50):8.2f}  p95 {percentile(ms, 95):8.2f}"
+          f"  p99 {percentile(ms, 99):8.2f} ms  {len(ms) / wall:8.1f} round trips/s"
+          f"  booked {sum(1 for _, ok in samples if ok)}/{len(samples)}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--threads", type=int, default=16)
+    p.add_argument("--purchases", type=int, default=1000, help="round trips per variant")
+    p.add_argument("--hot-flights", type=int, default=20)
+    p.add_argument("--commit", action="store_true", help="keep the tickets instead of rolling back")
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+
+    flights, n_customers = load_hot_flights(args.hot_flights)
+    print(f"{args.purchases} round trips x {args.threads} threads over {len(flights)} hot flights"
+          f" ({'commit' if args.commit else 'rollback'})")
+    run("old", old_buy_leg, args, flights, n_customers)
+    run("procedure", new_buy_leg, args, flights, n_customers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Drive the real routes and report latency percentiles and throughput per
+route as a JSON artifact that can be diffed across releases.
+
+    # in-process, through the Flask test client
+    python tools/benchmark.py --requests 500 --concurrency 8 --out bench.json
+
+    # against a running server (python main.py, gunicorn, ...)
+    python tools/benchmark.py --base-url http://127.0.0.1:5000
+
+Expects data from tools/generate_data.py (it logs in as the synthetic
+customers and staff). Routes run one after another; within a route,
+--concurrency workers share --requests calls. Redirects are not followed,
+so each sample times exactly one route.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pymysql
+
+from generate_data import BENCH_PASSWORD, customer_email
+from main import DB_CONFIG, _fmt_date, _fmt_time
+
+ROUTES = ("search_flights", "customer_upcoming_flights", "customer_past_flights",
+          "customer_confirm_purchase", "staff_reports", "staff_ratings")
+
+
+class TestClient:
+    """Flask test client wrapper with the same interface as HttpClient."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def get(self, path, params=None):
+        return self._client.get(path, query_string=params or {}).status_code
+
+    def post(self, path, data):
+        return self._client.post(path, data=data).status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """Cookie-keeping urllib client for a running server; never follows redirects."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def _open(self, req):
+        try:
+            with self._opener.open(req, timeout=60) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def get(self, path, params=None):
+        qs = ("?" + urllib.parse.urlencode(params)) if params else ""
+        return self._open(urllib.request.Request(self.base_url + path + qs))
+
+    def post(self, path, data):
+        body = urllib.parse.urlencode(data).encode()
+        return self._open(urllib.request.Request(self.base_url + path, data=body))
+
+
+def load_fixtures(sample=2000):
+    """Pick real routes, purchasable flights and report ranges from the database."""
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""SELECT flight_no, airline_name, dep_airport_code, arr_airport_code, dep_datetime
+                           FROM Flight
+                           WHERE dep_datetime > DATE_ADD(NOW(), INTERVAL 1 DAY)
+                           ORDER BY dep_datetime
+                           LIMIT %s""", (sample,))
+            future = cur.fetchall()
+            cur.execute("SELECT COUNT(*) AS n FROM Customer WHERE email LIKE 'bench.customer%%'")
+            customers = cur.fetchone()["n"]
+            cur.execute("SELECT COUNT(*) AS n FROM AirlineStaff WHERE email LIKE 'bench.staff%%'")
+            staff = cur.fetchone()["n"]
+    finally:
+        conn.close()
+    if not (future and customers and staff):
+        sys.exit("No synthetic data found; run tools/generate_data.py first.")
+    return future, customers, staff
+
+
+def percentile(sorted_ms, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return None
+    k = max(0, min(len(sorted_ms) - 1, math.ceil(p / 100.0 * len(sorted_ms)) - 1))
+    return sorted_ms[k]
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--base-url", help="benchmark a running server instead of the in-process test client")
+    p.add_argument("--requests", type=int, default=200, help="calls per route")
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--routes", default=",".join(ROUTES), help="comma-separated subset of: " + ", ".join(ROUTES))
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--out", default="bench_results.json")
+    args = p.parse_args()
+
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        p.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    future, n_customers, n_staff = load_fixtures()
+    if args.base_url:
+        make_client = lambda: HttpClient(args.base_url)
+    else:
+        from main import app
+        make_client = lambda: TestClient(app)
+
+    local = threading.local()
+    worker_ids = iter(range(10 ** 9))
+    id_lock = threading.Lock()
+
+    def clients():
+        """Per-worker anonymous, customer and staff clients (logged in once)."""
+        if not hasattr(local, "anon"):
+            with id_lock:
+                wid = next(worker_ids)
+            local.wid = wid
+            local.rnd = random.Random(args.seed * 1000 + wid)
+            local.anon = make_client()
+            local.customer = make_client()
+            local.customer.post("/loginAuth", {"email": customer_email(wid % n_customers),
+                                               "password": BENCH_PASSWORD})
+            local.staff = make_client()
+            local.staff.post("/loginAuth", {"email": f"bench.staff{wid % n_staff}@example.com",
+                                            "password": BENCH_PASSWORD})
+            local.purchases = 0
+        return local
+
+    today = date.today()
+
+    def call(route):
+        c = clients()
+        rnd = c.rnd
+        if route == "search_flights":
+            f = rnd.choice(future)
+            return c.anon.get("/search_flights", {
+                "trip": "oneway", "source": f["dep_airport_code"],
+                "destination": f["arr_airport_code"], "depart_date": f["dep_datetime"].date().isoformat()})
+        if route == "customer_upcoming_flights":
+            return c.customer.get("/customer/upcoming_flights")
+        if route == "customer_past_flights":
+            return c.customer.get("/customer/past_flights")
+        if route == "customer_confirm_purchase":
+            # each worker walks its own slice of flights so it never rebuys one
+            f = future[(c.wid * 7919 + c.purchases) % len(future)]
+            c.purchases += 1
+            # dep_key for current builds; dep_date/dep_time keep older builds comparable
+            return c.customer.post("/customer/confirm_purchase", {
+                "trip": "oneway", "flight_no": f["flight_no"], "airline_name": f["airline_name"],
+                "dep_key": f["dep_datetime"].isoformat(sep=" "),
+                "dep_date": _fmt_date(f["dep_datetime"]), "dep_time": _fmt_time(f["dep_datetime"]),
+                "card_type": "credit", "card_num": "4111111111111111", "card_name": "Bench Customer",
+                "exp_date": "12/35", "cvc": "123"})
+        if route == "staff_reports":
+            start = today - timedelta(days=rnd.choice((30, 90, 365, 730)))
+            return c.staff.get("/staff/reports", {"from_date": start.isoformat(), "to_date": today.isoformat()})
+        if route == "staff_ratings":
+            return c.staff.get("/staff/ratings")
+        raise ValueError(route)
+
+    def timed(route):
+        t0 = time.perf_counter()
+        try:
+            status = call(route)
+        except Exception:
+            status = None
+        return (time.perf_counter() - t0) * 1000.0, status
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        # log every worker in before anything is timed
+        list(pool.map(lambda _: clients(), range(args.concurrency * 4)))
+        for route in routes:
+            started = time.perf_counter()
+            samples = list(pool.map(lambda _: timed(route), range(args.requests)))
+            wall = time.perf_counter() - started
+            ms = sorted(s[0] for s in samples)
+            statuses = {}
+            for _, status in samples:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            results[route] = {
+                "count": len(samples),
+                "errors": sum(1 for _, s in samples if s is None or s >= 500),
+                "status_counts": statuses,
+                "p50_ms": round(percentile(ms, 50), 3),
+                "p95_ms": round(percentile(ms, 95), 3),
+                "p99_ms": round(percentile(ms, 99), 3),
+                "mean_ms": round(sum(ms) / len(ms), 3),
+                "max_ms": round(ms[-1], 3),
+                "throughput_rps": round(len(samples) / wall, 2),
+            }
+            r = results[route]
+            print(f"{route:<28} p50 {r['p50_ms']:8.2f}  p95 {r['p95_ms']:8.2f}  p99 {r['p99_ms']:8.2f} ms"
+                  f"  {r['throughput_rps']:8.1f} req/s  errors {r['errors']}")
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    artifact = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": commit,
+            "mode": "http" if args.base_url else "test_client",
+            "base_url": args.base_url,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "routes": results,
+    }
+    with open(args.out, "w") as fh:
+        json.dump(artifact, fh, indent=2, sort_keys=True)
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
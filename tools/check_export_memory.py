@@ -0,0 +1,98 @@
+"""
+Stream the staff sales export for the airline with the most tickets and
+fail if the process's peak RSS grows by more than --max-rss-mb while it
+runs, or if fewer than --min-rows tickets came out.
+
+Load a single airline with a million tickets first, e.g.
+
+    python tools/generate_data.py --reset --airlines 1 --tickets 1000000
+    python tools/check_export_memory.py --format csv
+    python tools/check_export_memory.py --format ndjson
+
+The export runs in-process through Flask's test client as a signed-in
+staff member of that airline; the body is consumed chunk by chunk and
+discarded, so any growth is the server side's. Exits 1 on failure.
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pymysql
+
+from main import DB_CONFIG, app
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def busiest_airline():
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""SELECT airline_name, COUNT(*) AS n FROM Ticket
+                           GROUP BY airline_name ORDER BY n DESC LIMIT 1""")
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    return (row["airline_name"], row["n"]) if row else (None, 0)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    p.add_argument("--min-rows", type=int, default=1000000)
+    p.add_argument("--max-rss-mb", type=float, default=64.0,
+                   help="allowed growth of peak RSS during the export")
+    args = p.parse_args()
+
+    airline, tickets = busiest_airline()
+    if airline is None:
+        print("No tickets in the database; run tools/generate_data.py first.")
+        return 1
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["email"] = "export-check@example.com"
+        sess["role"] = "staff"
+        sess["airline_name"] = airline
+
+    before = peak_rss_mb()
+    started = time.monotonic()
+    response = client.get("/staff/reports/export", query_string={"format": args.format},
+                          buffered=False)
+    if response.status_code != 200:
+        print(f"Export failed with HTTP {response.status_code}")
+        return 1
+    lines = 0
+    nbytes = 0
+    for chunk in response.iter_encoded():
+        lines += chunk.count(b"\n")
+        nbytes += len(chunk)
+    response.close()
+    elapsed = time.monotonic() - started
+    growth = peak_rss_mb() - before
+
+    rows = lines - (1 if args.format == "csv" else 0)
+    print(f"{airline}: {rows} of {tickets} tickets, {nbytes / 1e6:.1f} MB of {args.format} "
+          f"in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+    print(f"peak RSS {before:.1f} MB -> {before + growth:.1f} MB (+{growth:.1f} MB)")
+
+    failed = False
+    if rows < args.min_rows:
+        print(f"FAIL: expected at least {args.min_rows} rows")
+        failed = True
+    if growth > args.max_rss_mb:
+        print(f"FAIL: peak RSS grew by more than {args.max_rss_mb:.0f} MB")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+EXPLAIN the hot search/listing/report queries and fail if any of them
+can only be answered by a full table scan.
+
+Run against a database that has db/create_tables.sql (or
+db/migrations/001_search_indexes.sql) applied:
+
+    python tools/check_query_plans.py
+
+Exits 1 when a query has an access type of ALL with no usable index
+(possible_keys is NULL) -- i.e. the predicate is not sargable or the
+index is missing. On tiny sample data MySQL may still *choose* a scan
+even though an index applies; that case is reported but not failed.
+"""
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pymysql
+
+from main import DB_CONFIG, FLIGHT_SEARCH_SQL, _day_range
+
+
+def _checks():
+    day = date.today() + timedelta(days=7)
+    month = _day_range(date.today(), date.today() + timedelta(days=30))
+
+    yield ("search_flights", FLIGHT_SEARCH_SQL, ("JFK", "DXB", *_day_range(day)))
+
+    yield ("staff_view_flights / staff_manage_status", """
+        SELECT flight_no, dep_airport_code, arr_airport_code, status, base_price
+        FROM Flight
+        WHERE airline_name=%s AND dep_datetime >= %s AND dep_datetime < %s
+        ORDER BY dep_datetime ASC
+        LIMIT 500
+    """, ("Emirates", *month))
+
+    yield ("staff_reports", """
+        SELECT DATE_FORMAT(sale_date,'%%Y-%%m') AS ym, SUM(tickets) AS cnt
+        FROM SalesDaily
+        WHERE airline_name=%s AND sale_date >= %s AND sale_date <= %s
+        GROUP BY ym ORDER BY ym
+    """, ("Emirates", month[0].date(), month[1].date()))
+
+    yield ("staff_ratings", """
+        SELECT f.flight_no, s.rating_sum, s.rating_count
+        FROM Flight f
+        LEFT JOIN FlightRatingStats s
+          ON s.flight_no=f.flight_no AND s.dep_datetime=f.dep_datetime AND s.airline_name=f.airline_name
+        WHERE f.airline_name=%s
+        ORDER BY f.dep_datetime DESC, f.flight_no DESC
+        LIMIT 301
+    """, ("Emirates",))
+
+    yield ("customer flights (Ticket -> Flight join)", """
+        SELECT T.ticket_id, F.status
+        FROM Ticket T
+        JOIN Flight F
+             ON F.flight_no = T.flight_no
+             AND F.dep_datetime = T.dep_datetime
+             AND F.airline_name = T.airline_name
+        WHERE T.dep_datetime >= NOW() AND T.customer_email = %s
+        ORDER BY T.dep_datetime
+    """, ("customer@example.com",))
+
+
+def main():
+    conn = pymysql.connect(**DB_CONFIG)
+    failures = 0
+    try:
+        with conn.cursor() as cur:
+            for name, sql, params in _checks():
+                cur.execute("EXPLAIN " + sql, params)
+                for row in cur.fetchall():
+                    table, access = row.get("table"), row.get("type")
+                    if access == "ALL" and not row.get("possible_keys"):
+                        failures += 1
+                        print(f"FAIL  {name}: full scan of {table} (no usable index)")
+                    elif access == "ALL":
+                        print(f"warn  {name}: scan of {table} chosen over {row['possible_keys']} "
+                              f"(expected on small data)")
+                    else:
+                        print(f"ok    {name}: {table} via {row.get('key')} ({access})")
+    finally:
+        conn.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
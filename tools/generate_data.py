@@ -0,0 +1,231 @@
+"""
+Fill the schema from db/create_tables.sql with synthetic data at a
+configurable scale, for load tests and benchmarks.
+
+    python tools/generate_data.py --airports 300 --airlines 20 \
+        --flights 1000000 --tickets 5000000 --customers 200000
+
+Use a throwaway database: --reset deletes every row first. All synthetic
+customers log in with password BENCH_PASSWORD; each airline gets one
+staff account 'bench_staff_<n>' with the same password.
+
+Rows are streamed in multi-row INSERT batches (tickets and ratings are
+generated per flight as it is produced), so memory stays flat however
+many flights are requested. Derived tables (seat inventory, ...) are
+rebuilt at the end. Synthetic airports are all in UTC, so each flight's
+dep_utc / arr_utc equal its local times.
+"""
+import argparse
+import hashlib
+import os
+import random
+import string
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pymysql
+
+from main import (DB_CONFIG, _RECONCILE_INVENTORY_SQL, rebuild_rating_aggregates,
+                  rebuild_sales_rollups)
+
+BENCH_PASSWORD = "Bench#2025"
+CARD_TYPES = ("credit", "debit")
+MANUFACTURERS = ("Airbus", "Boeing", "Embraer")
+
+# Tables in dependency order; --reset clears them in reverse
+TABLES = ("Airline", "Airport", "Airplane", "AirlineStaff", "StaffPhoneNo",
+          "Customer", "Flight", "FlightInventory", "Ticket", "FlightRating",
+          "SalesDaily", "FlightRatingStats", "RouteRatingStats", "SeatHold")
+
+
+def customer_email(i):
+    return f"bench.customer{i}@example.com"
+
+
+def airport_code(i):
+    """4-letter synthetic codes ('XAAA', 'XAAB', ...) that never clash with real IATA ones."""
+    letters = string.ascii_uppercase
+    return "X" + letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26]
+
+
+class BatchWriter:
+    """Buffers rows per statement and flushes them as multi-row INSERTs."""
+
+    def __init__(self, conn, batch_size):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, sql, row):
+        buf = self.buffers.setdefault(sql, [])
+        buf.append(row)
+        if len(buf) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Buffers flush in the order their statements were first used,
+        # so parents (Flight) always land before children (Ticket).
+        for key in self.buffers:
+            rows = self.buffers[key]
+            if rows:
+                with self.conn.cursor() as cur:
+                    # pymysql rewrites INSERT ... VALUES executemany into one multi-row statement
+                    cur.executemany(key, rows)
+                self.conn.commit()
+                self.counts[key] = self.counts.get(key, 0) + len(rows)
+                rows.clear()
+
+
+INS_AIRLINE = "INSERT INTO Airline (airline_name) VALUES (%s)"
+INS_AIRPORT = ("INSERT INTO Airport (code, city, country, airport_type, timezone) "
+               "VALUES (%s, %s, %s, %s, %s)")
+INS_AIRPLANE = ("INSERT INTO Airplane (airplane_id, airline_name, seat_capacity, manufacturer, age) "
+                "VALUES (%s, %s, %s, %s, %s)")
+INS_STAFF = ("INSERT INTO AirlineStaff (username, password, airline_name, first_name, last_name, "
+             "date_of_birth, email) VALUES (%s, %s, %s, %s, %s, %s, %s)")
+INS_CUSTOMER = ("INSERT INTO Customer (email, name, password, building_no, street, city, state, "
+                "phone_number, passport_number, passport_expiration, passport_country, date_of_birth) "
+                "VALUES (%s, %s, %s, NULL, NULL, NULL, NULL, %s, %s, %s, %s, %s)")
+INS_FLIGHT = ("INSERT INTO Flight (flight_no, dep_datetime, airline_name, airplane_id, dep_airport_code, "
+              "arr_airport_code, arr_datetime, status, base_price, dep_utc, arr_utc, duration_minutes) "
+              "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)")
+INS_TICKET = ("INSERT INTO Ticket (flight_no, dep_datetime, airline_name, customer_email, card_type, "
+              "card_num, card_name, exp_date, purchase_datetime) "
+              "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)")
+INS_RATING = ("INSERT INTO FlightRating (customer_email, flight_no, dep_datetime, airline_name, rating, comment) "
+              "VALUES (%s, %s, %s, %s, %s, %s)")
+
+
+def generate(conn, args):
+    rnd = random.Random(args.seed)
+    out = BatchWriter(conn, args.batch)
+    now = datetime.now().replace(second=0, microsecond=0)
+    first_dep = now - timedelta(days=args.past_days)
+    span_minutes = (args.past_days + args.future_days) * 24 * 60
+
+    airports = [airport_code(i) for i in range(args.airports)]
+    for i, code in enumerate(airports):
+        out.add(INS_AIRPORT, (code, f"City {i}", f"Country {i % 50}", "both", "UTC"))
+
+    airlines = [f"Bench Air {i:03d}" for i in range(args.airlines)]
+    planes = {}          # airline -> [(airplane_id, capacity)]
+    for a_idx, airline in enumerate(airlines):
+        out.add(INS_AIRLINE, (airline,))
+        out.add(INS_STAFF, (f"bench_staff_{a_idx}", _md5(BENCH_PASSWORD), airline, "Bench", f"Staff{a_idx}",
+                            date(1985, 1, 1), f"bench.staff{a_idx}@example.com"))
+        planes[airline] = []
+        for p in range(args.planes_per_airline):
+            airplane_id = f"BP{a_idx:03d}-{p:04d}"
+            capacity = rnd.choice((120, 160, 180, 220, 300, 400))
+            planes[airline].append((airplane_id, capacity))
+            out.add(INS_AIRPLANE, (airplane_id, airline, capacity, rnd.choice(MANUFACTURERS), rnd.randrange(0, 20)))
+
+    for i in range(args.customers):
+        out.add(INS_CUSTOMER, (customer_email(i), f"Bench Customer {i}", _md5(BENCH_PASSWORD),
+                               f"+1555{i:07d}", f"BP{i:08d}", date(2035, 12, 31), "Benchland",
+                               date(1990, 1, 1) + timedelta(days=i % 9000)))
+    out.flush()
+
+    tickets_per_flight = args.tickets / max(args.flights, 1)
+    # only tickets on flights already flown can be rated
+    past_share = args.past_days / max(args.past_days + args.future_days, 1)
+    rating_share = args.ratings / max(args.tickets * past_share, 1)
+    # every plane flies a strictly increasing schedule, which keeps
+    # uq_plane_depart satisfied without tracking used slots
+    all_planes = [(airline, pid, cap) for airline in airlines for pid, cap in planes[airline]]
+    slot_minutes = max(span_minutes * len(all_planes) // max(args.flights, 1), 30)
+
+    for f_idx in range(args.flights):
+        airline, airplane_id, capacity = all_planes[f_idx % len(all_planes)]
+        slot = f_idx // len(all_planes)
+        dep = first_dep + timedelta(minutes=slot * slot_minutes + rnd.randrange(0, max(slot_minutes - 29, 1), 5))
+        duration = rnd.randrange(45, 16 * 60, 5)
+        arr = dep + timedelta(minutes=duration)
+        src, dst = rnd.sample(airports, 2)
+        flight_no = f"B{f_idx:09d}"
+        price = round(rnd.uniform(60, 1400), 2)
+        status = "delayed" if rnd.random() < 0.1 else "on-time"
+        out.add(INS_FLIGHT, (flight_no, dep, airline, airplane_id, src, dst, arr, status, price,
+                             dep, arr, duration))
+
+        n_tickets = min(capacity, _ticket_count(rnd, tickets_per_flight))
+        buyers = rnd.sample(range(args.customers), min(n_tickets, args.customers))
+        for c_idx in buyers:
+            purchase = min(dep - timedelta(minutes=rnd.randrange(60, 120 * 24 * 60)), now)
+            out.add(INS_TICKET, (flight_no, dep, airline, customer_email(c_idx),
+                                 rnd.choice(CARD_TYPES), f"4{c_idx:015d}", f"Bench Customer {c_idx}",
+                                 date(purchase.year + 4, 12, 31), purchase))
+            if dep < now and rnd.random() < rating_share:
+                out.add(INS_RATING, (customer_email(c_idx), flight_no, dep, airline,
+                                     rnd.randint(1, 5), None))
+
+        if f_idx and f_idx % 100000 == 0:
+            print(f"  {f_idx} flights ...", flush=True)
+
+    out.flush()
+    return out.counts
+
+
+def post_load(conn):
+    """Rebuild tables derived from Ticket/FlightRating."""
+    with conn.cursor() as cur:
+        cur.execute(_RECONCILE_INVENTORY_SQL.format(where=""))
+        rebuild_sales_rollups(cur)
+        rebuild_rating_aggregates(cur)
+    conn.commit()
+
+
+def _ticket_count(rnd, mean):
+    # normal approximation of a Poisson draw; exact shape doesn't matter here
+    return max(0, round(rnd.gauss(mean, mean ** 0.5))) if mean else 0
+
+
+def _md5(s):
+    return hashlib.md5(s.encode()).hexdigest()
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--airports", type=int, default=200)
+    p.add_argument("--airlines", type=int, default=20)
+    p.add_argument("--planes-per-airline", type=int, default=25)
+    p.add_argument("--customers", type=int, default=50000)
+    p.add_argument("--flights", type=int, default=100000)
+    p.add_argument("--tickets", type=int, default=1000000)
+    p.add_argument("--ratings", type=int, default=200000)
+    p.add_argument("--past-days", type=int, default=365)
+    p.add_argument("--future-days", type=int, default=180)
+    p.add_argument("--batch", type=int, default=5000, help="rows per multi-row INSERT")
+    p.add_argument("--seed", type=int, default=2025)
+    p.add_argument("--reset", action="store_true", help="delete all rows from every table first")
+    args = p.parse_args()
+
+    if args.airports > 26 ** 3:
+        p.error("--airports is limited to 17576 synthetic codes")
+
+    conn = pymysql.connect(**DB_CONFIG)
+    try:
+        if args.reset:
+            with conn.cursor() as cur:
+                for table in reversed(TABLES):
+                    cur.execute(f"DELETE FROM {table}")
+            conn.commit()
+
+        started = time.monotonic()
+        counts = generate(conn, args)
+        post_load(conn)
+        elapsed = time.monotonic() - started
+    finally:
+        conn.close()
+
+    for sql, n in counts.items():
+        print(f"{sql.split()[2]:<14} {n:>10}")
+    print(f"done in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Recompute FlightInventory seat counters from Ticket.
+
+    python tools/reconcile_inventory.py                          # every flight
+    python tools/reconcile_inventory.py EK202 "2025-12-05 22:30:00" Emirates
+
+Run after importing tickets outside the app, or whenever a counter is
+suspected to have drifted. Missing counter rows are created.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from main import app, conn, reconcile_seat_inventory
+
+
+def main(argv):
+    if argv and len(argv) != 3:
+        print(__doc__)
+        return 2
+    with app.app_context():
+        cursor = conn.cursor()
+        try:
+            affected = reconcile_seat_inventory(cursor, *argv)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    # ON DUPLICATE KEY UPDATE reports 1 per insert and 2 per changed row
+    print(f"Reconciled seat inventory ({affected} rows affected).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
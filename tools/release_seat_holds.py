@@ -0,0 +1,26 @@
+"""
+Release expired seat holds and give their seats back to FlightInventory.
+
+    python tools/release_seat_holds.py
+
+The app already runs this sweep every SEAT_HOLD_SWEEP_SECONDS in each
+process that has placed a hold; run it from cron as well when the app may
+sit idle after a burst, so abandoned holds never linger past their TTL.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from main import app, sweep_expired_holds
+
+
+def main():
+    with app.app_context():
+        released = sweep_expired_holds()
+    print(f"Released {released} expired seat hold(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())